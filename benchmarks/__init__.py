@@ -0,0 +1,8 @@
+# benchmarks/__init__.py
+"""
+Timing benchmarks for the models, problems, optimizers and post-processing.
+
+Run with ``python -m benchmarks.run`` from the repository root; results are
+written as JSON to ``benchmarks/results`` and two result files can be
+compared with ``python -m benchmarks.compare``.
+"""
@@ -0,0 +1,87 @@
+# benchmarks/bench_models.py
+"""
+Throughput of the physics functions in utils/models.py and utils/membrane.py.
+"""
+import numpy as np
+
+from benchmarks.common import CATALYST_PARAMS as P, SEED
+from benchmarks.harness import benchmark
+from utils.membrane import MembraneModel, conductivity_table, springer_conductivity
+from utils.models import cost_function, eta_total
+
+ETA_KW = dict(j=P["j"], j0=P["j0_a"], a=P["a_a"], b=P["b_a"], T=P["T"], rho_cat=P["rho_cat_a"],
+              C_bulk=P["C_bulk_a"], D=P["D_a"], tau=P["tau_a"], alpha=P["alpha"], R=P["R"], n=P["n"], F=P["F"])
+
+
+def _anode_designs(n):
+    rng = np.random.default_rng(SEED)
+    delta = rng.uniform(P["delta_a_min"], P["delta_a_max"], n)
+    eps = rng.uniform(P["eps_a_min"], P["eps_a_max"], n)
+    S_cat = rng.uniform(P["Scat_a_min"], P["Scat_a_max"], n)
+    return delta, eps, S_cat
+
+
+@benchmark("models.cost_function.scalar")
+def cost_function_scalar():
+    return lambda: cost_function(P["rho_cat_a"], 1e-3, 0.4, P["A_cell"], P["c_cat_a"])
+
+
+@benchmark("models.cost_function.array", params=(1_000, 100_000), full_params=(1_000_000,), throughput=True)
+def cost_function_array(n):
+    delta, eps, _ = _anode_designs(n)
+    return lambda: cost_function(P["rho_cat_a"], delta, eps, P["A_cell"], P["c_cat_a"])
+
+
+@benchmark("models.eta_total.scalar")
+def eta_total_scalar():
+    return lambda: eta_total(S_cat=2e6, epsilon=0.4, delta=1e-3, **ETA_KW)
+
+
+@benchmark("models.eta_total.array", params=(1_000, 10_000), full_params=(100_000,), throughput=True)
+def eta_total_array(n):
+    # eta_total branches on scalars, so arrays are evaluated element by element
+    delta, eps, S_cat = _anode_designs(n)
+
+    def run():
+        for k in range(n):
+            eta_total(S_cat=S_cat[k], epsilon=eps[k], delta=delta[k], **ETA_KW)
+    return run
+
+
+@benchmark("models.membrane.evaluate_objectives", params=(1, 1_000, 100_000), throughput=True)
+def membrane_objectives(n):
+    model = MembraneModel()
+    rng = np.random.default_rng(SEED)
+    x = np.vstack([rng.uniform(50e-6, 300e-6, n), rng.uniform(0.5, 3.0, n)])
+    return lambda: model.evaluate_objectives(x)
+
+
+@benchmark("models.membrane.evaluate_objectives.ohmic", params=(1, 1_000, 100_000), throughput=True)
+def membrane_objectives_ohmic(n):
+    model = MembraneModel(voltage_model="ohmic")
+    rng = np.random.default_rng(SEED)
+    x = np.vstack([rng.uniform(50e-6, 300e-6, n), rng.uniform(0.5, 3.0, n)])
+    return lambda: model.evaluate_objectives(x)
+
+
+@benchmark("models.membrane.evaluate_load_profile", params=(100, 300), full_params=(3_000,), throughput=True)
+def membrane_load_profile(n):
+    # one year of hourly load, population of (t, j_scale) candidates
+    model = MembraneModel()
+    rng = np.random.default_rng(SEED)
+    hours = np.arange(8760)
+    load = np.clip(0.5 + 0.5 * np.sin(2 * np.pi * hours / 24) + 0.1 * rng.standard_normal(8760), 0.0, 1.0)
+    X = np.column_stack([rng.uniform(50e-6, 300e-6, n), rng.uniform(0.5, 3.0, n)])
+    return lambda: model.evaluate_load_profile(X, load)
+
+
+@benchmark("models.membrane.conductivity", params=("exact", "table"), repeat=5)
+def membrane_conductivity(method):
+    # 100k (T, λ) pairs: Springer exponential vs. bilinear lookup in the cached table
+    rng = np.random.default_rng(SEED)
+    T = rng.uniform(300.0, 370.0, 100_000)
+    lam = rng.uniform(5.0, 22.0, 100_000)
+    if method == "exact":
+        return lambda: springer_conductivity(T, lam)
+    table = conductivity_table()
+    return lambda: table(T, lam)
@@ -0,0 +1,125 @@
+# benchmarks/bench_optimizers.py
+"""
+End-to-end wall time of the optimizers at fixed seeds.
+"""
+import asyncio
+
+import numpy as np
+
+from benchmarks.common import CATALYST_PARAMS, SEED
+from benchmarks.harness import benchmark
+from utils import full_cell
+from utils import membrane_optimization
+from utils import optimization
+
+
+def _catalyst(method, **overrides):
+    kwargs = dict(CATALYST_PARAMS, **overrides)
+    return lambda: optimization.run_optimization("Pareto-based", method, pop_size=40, n_gen=30, **kwargs)
+
+
+def _membrane(method, **overrides):
+    return lambda: membrane_optimization.run_optimization(method=method, pop_size=100, n_gen=50, seed=SEED,
+                                                          **overrides)
+
+
+@benchmark("optimizers.catalyst.NSGA2", repeat=3)
+def catalyst_nsga2():
+    return _catalyst("NSGA2")
+
+
+@benchmark("optimizers.catalyst.NSGA2.short_circuit", repeat=3)
+def catalyst_nsga2_short_circuit():
+    return _catalyst("NSGA2", short_circuit=True)
+
+
+@benchmark("optimizers.catalyst.NSGA2.polarization", repeat=3)
+def catalyst_nsga2_polarization():
+    return _catalyst("NSGA2", j_points=np.linspace(0.1, CATALYST_PARAMS["j"], 50))
+
+
+@benchmark("optimizers.catalyst.NSGA2.islands", params=(1, 2, 4), repeat=3)
+def catalyst_nsga2_islands(n_islands):
+    """
+    pop_size 200 split over n_islands processes (1 = the single-population run).
+    """
+    kwargs = dict(CATALYST_PARAMS)
+    return lambda: optimization.run_optimization("Pareto-based", "NSGA2", pop_size=200, n_gen=30,
+                                                 n_islands=n_islands, **kwargs)
+
+
+@benchmark("optimizers.catalyst.SPEA2", repeat=3)
+def catalyst_spea2():
+    return _catalyst("SPEA2")
+
+
+@benchmark("optimizers.catalyst.MOEA/D", repeat=3)
+def catalyst_moead():
+    return _catalyst("MOEA/D")
+
+
+@benchmark("optimizers.catalyst.MOEA/D.memo", repeat=3)
+def catalyst_moead_memo():
+    # exact keys: same front as optimizers.catalyst.MOEA/D, repeated designs from the cache
+    return _catalyst("MOEA/D", memo=dict(resolution=0))
+
+
+@benchmark("optimizers.catalyst.NSGA2.fidelity", params=("constant", "linear"), repeat=3)
+def catalyst_nsga2_fidelity(schedule):
+    return _catalyst("NSGA2", fidelity=dict(schedule=schedule))
+
+
+@benchmark("optimizers.catalyst.WeightedSum", repeat=3)
+def catalyst_weighted_sum():
+    kwargs = dict(CATALYST_PARAMS)
+    return lambda: optimization.run_optimization("Scalarization", "Weighted Sum",
+                                                 scalar_params={"w1": 0.5, "w2": 0.5}, **kwargs)
+
+
+@benchmark("optimizers.full_cell", params=("NSGA2", "coevolution"), repeat=3)
+def full_cell_optimization(method):
+    return lambda: full_cell.run_full_cell_optimization(CATALYST_PARAMS, method=method, pop_size=40, n_gen=20,
+                                                        n_workers=2, seed=SEED)
+
+
+@benchmark("optimizers.membrane.NSGA2", repeat=3)
+def membrane_nsga2():
+    return _membrane("NSGA2")
+
+
+@benchmark("optimizers.membrane.SPEA2", repeat=3)
+def membrane_spea2():
+    return _membrane("SPEA2")
+
+
+@benchmark("optimizers.membrane.MOEAD", repeat=3)
+def membrane_moead():
+    return _membrane("MOEAD")
+
+
+@benchmark("optimizers.membrane.MOEAD.memo", repeat=3)
+def membrane_moead_memo():
+    return _membrane("MOEAD", memo=dict(resolution=0))
+
+
+@benchmark("optimizers.membrane.NSGA2.fidelity", repeat=3)
+def membrane_nsga2_fidelity():
+    return _membrane("NSGA2", fidelity=True)
+
+
+@benchmark("optimizers.catalyst.NSGA2.async", params=(1, 4), repeat=3)
+def catalyst_nsga2_async(n_runs):
+    """
+    n_runs concurrent NSGA2 runs of run_optimization_async on the shared process pool.
+    """
+    async def one():
+        async for update in optimization.run_optimization_async("Pareto-based", "NSGA2", pop_size=40, n_gen=30,
+                                                                **CATALYST_PARAMS):
+            pass
+        return update["result"]
+
+    async def many():
+        return await asyncio.gather(*(one() for _ in range(n_runs)))
+
+    asyncio.run(one())   # start the shared pool and import the models in its workers outside the timed region
+    return lambda: asyncio.run(many())
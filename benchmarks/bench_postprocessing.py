@@ -0,0 +1,98 @@
+# benchmarks/bench_postprocessing.py
+"""
+Post-processing used by the pages: design-space table, front metrics,
+Pareto filtering, design ranking and plot construction.
+"""
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import make_pem_problem, random_designs, random_front
+from benchmarks.harness import benchmark
+from utils.decision import rank_designs
+from utils.pareto import pareto_indices, pareto_mask
+from utils.visualization import (compute_hypervolume, create_full_dataframe, density_plot, heatmap_plot,
+                                 scatter_matrix_plot)
+
+
+@benchmark("postprocessing.create_full_dataframe", params=(1_000, 10_000), full_params=(100_000, 1_000_000),
+           throughput=True)
+def full_dataframe(n):
+    problem = make_pem_problem()
+    X = random_designs(problem, n)
+    F = np.zeros((n, problem.n_obj))
+    return lambda: create_full_dataframe(problem, X, F)
+
+
+# The front is filtered with utils.pareto before pymoo's Hypervolume, so the
+# cost is the O(n log n) filter plus the hypervolume of the (small) front.
+@benchmark("postprocessing.hypervolume", params=(1_000, 10_000), full_params=(100_000, 1_000_000),
+           throughput=True)
+def hypervolume(n):
+    F = random_front(n)
+    ref = tuple(1.1 * F.max(axis=0))
+    return lambda: compute_hypervolume(F, ref_point=ref)
+
+
+@benchmark("postprocessing.pareto_mask.2d", params=(10_000, 100_000), full_params=(1_000_000, 10_000_000),
+           throughput=True)
+def pareto_mask_2d(n):
+    F = random_front(n)
+    return lambda: pareto_mask(F)
+
+
+# 4 objectives as in the membrane problem; cost grows with n times the front size
+@benchmark("postprocessing.pareto_mask.4d", params=(1_000, 10_000), full_params=(100_000, 200_000),
+           throughput=True)
+def pareto_mask_4d(n):
+    F = random_front(n, n_obj=4)
+    return lambda: pareto_mask(F)
+
+
+@benchmark("postprocessing.pareto_indices.chunked", params=(100_000,), full_params=(1_000_000,),
+           throughput=True)
+def pareto_indices_chunked(n):
+    F = random_front(n, n_obj=3)
+    return lambda: pareto_indices(F, chunk_size=100_000)
+
+
+@benchmark("postprocessing.rank_designs", params=(10_000,), full_params=(100_000, 1_000_000), throughput=True)
+def rank_designs_all(n):
+    F = random_front(n)
+    return lambda: [rank_designs(F, method) for method in ("knee", "topsis", "compromise")]
+
+
+def _design_table(n):
+    F = random_front(n)
+    G = np.random.default_rng(0).random((n, 6))
+    return pd.DataFrame(np.column_stack([F, G]), columns=["Cost", "Overpotential"] + [f"G{i + 1}" for i in range(6)])
+
+
+# Figure construction plus JSON serialization, i.e. what streamlit sends to the browser
+@benchmark("postprocessing.scatter_matrix_plot", params=(1_000, 100_000), full_params=(1_000_000,), throughput=True)
+def scatter_matrix(n):
+    df = _design_table(n)
+    return lambda: scatter_matrix_plot(df, color="Cost", objectives=["Cost", "Overpotential"]).to_json()
+
+
+@benchmark("postprocessing.density_plot", params=(100_000,), full_params=(1_000_000, 10_000_000), throughput=True)
+def density(n):
+    df = _design_table(n)
+    return lambda: density_plot(df, "Cost", "Overpotential", objectives=["Cost", "Overpotential"]).to_json()
+
+
+@benchmark("postprocessing.heatmap_plot.binned", params=(100_000,), full_params=(1_000_000, 10_000_000), throughput=True)
+def heatmap_binned(n):
+    df = _design_table(n)
+    return lambda: heatmap_plot(df, "Cost", "Overpotential", "G1", agg="feasible")
+
+
+@benchmark("postprocessing.heatmap_plot.parquet", params=(100_000,), full_params=(1_000_000, 10_000_000), throughput=True)
+def heatmap_parquet(n):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    path = os.path.join(tempfile.mkdtemp(), "designs.parquet")
+    pq.write_table(pa.Table.from_pandas(_design_table(n)), path)
+    return lambda: heatmap_plot(path, "Cost", "Overpotential", "G1")
@@ -0,0 +1,118 @@
+# benchmarks/bench_problems.py
+"""
+Cost of the pymoo problem evaluations.
+"""
+import atexit
+
+import numpy as np
+
+from benchmarks.common import CATALYST_PARAMS, SEED, make_pem_problem, random_designs
+from benchmarks.harness import benchmark
+from utils.full_cell import FullCellProblem
+from utils.membrane import MembraneModel
+from utils.membrane_optimization import MembraneOptimizationProblem
+from utils.catalysts import catalyst_table
+from utils.optimization import MaterialChoiceProblem, PolarizationProblem, RobustProblem
+from utils.async_optimization import _evaluate, shared_executor
+from utils.shm import SharedMemoryEvaluator
+
+
+@benchmark("problems.PEMProblem._evaluate")
+def pem_evaluate_single():
+    problem = make_pem_problem()
+    x = random_designs(problem, 1)[0]
+    return lambda: problem._evaluate(x, {})
+
+
+@benchmark("problems.PEMProblem.evaluate", params=(100, 1_000), full_params=(10_000,), throughput=True)
+def pem_evaluate_population(n):
+    problem = make_pem_problem()
+    X = random_designs(problem, n)
+    return lambda: problem.evaluate(X, return_values_of=["F", "G"])
+
+
+@benchmark("problems.PEMProblem.evaluate.short_circuit", params=(100, 1_000), full_params=(10_000,),
+           throughput=True)
+def pem_evaluate_population_short_circuit(n):
+    problem = make_pem_problem(short_circuit=True)
+    X = random_designs(problem, n)
+    return lambda: problem.evaluate(X, return_values_of=["F", "G"])
+
+
+@benchmark("problems.PolarizationProblem.evaluate", params=(40, 400), full_params=(4_000,), throughput=True)
+def polarization_evaluate(n):
+    # 50-point polarization curve per design
+    base = make_pem_problem()
+    problem = PolarizationProblem(base, np.linspace(0.1, base.j, 50))
+    X = random_designs(problem, n)
+    return lambda: problem.evaluate(X, return_values_of=["F", "G"])
+
+
+@benchmark("problems.PEMProblem.temperature_map", params=(40, 400), full_params=(4_000,), throughput=True)
+def temperature_map(n):
+    # designs x 61 temperatures, Arrhenius j0 with T_ref = T
+    problem = make_pem_problem(T_ref=CATALYST_PARAMS["T"])
+    X = random_designs(problem, n)
+    T_grid = np.linspace(313.0, 373.0, 61)
+    return lambda: problem.temperature_map(X, T_grid)
+
+
+@benchmark("problems.MaterialChoiceProblem.evaluate", params=(100, 1_000), full_params=(10_000,), throughput=True)
+def material_choice_evaluate(n):
+    # every anode/cathode combination of the library present in the population
+    problem = MaterialChoiceProblem(make_pem_problem(), catalyst_table("anode"), catalyst_table("cathode"))
+    X = random_designs(problem, n)
+    return lambda: problem.evaluate(X, return_values_of=["F", "G"])
+
+
+@benchmark("problems.RobustProblem.evaluate", params=(40, 400), full_params=(4_000,), throughput=True)
+def robust_evaluate(n):
+    # 64-draw Sobol ensemble over three uncertain parameters
+    uncertain = {"D_c": ("loguniform", 1e-5, 4e-5), "j0_a": ("loguniform", 1e-3, 1e-1), "tau_a": ("uniform", 1.2, 2.1)}
+    problem = RobustProblem(make_pem_problem(), uncertain, n_samples=64)
+    X = random_designs(problem, n)
+    return lambda: problem.evaluate(X, return_values_of=["F", "G"])
+
+
+@benchmark("problems.MembraneOptimizationProblem._evaluate", params=(100, 300, 1_000), full_params=(10_000,),
+           throughput=True)
+def membrane_evaluate(n):
+    problem = MembraneOptimizationProblem(MembraneModel())
+    rng = np.random.default_rng(SEED)
+    X = rng.uniform(problem.xl, problem.xu, size=(n, problem.n_var))
+    return lambda: problem._evaluate(X, {})
+
+
+@benchmark("problems.FullCellProblem.evaluate", params=(100, 1_000), full_params=(10_000,), throughput=True)
+def full_cell_evaluate(n):
+    problem = FullCellProblem(make_pem_problem())
+    X = random_designs(problem, n)
+    return lambda: problem.evaluate(X, return_values_of=["F", "G"])
+
+
+
+# Transport of a vectorized problem's populations to 2 worker processes: pickled
+# arrays (and problem) per batch through the shared process pool vs. the
+# shared-memory ring (problem sent once, X and [F | G] written in place).
+@benchmark("problems.transport.pickle", params=(10_000, 100_000), throughput=True)
+def transport_pickle(n):
+    problem = FullCellProblem(make_pem_problem())
+    X = random_designs(problem, n)
+    executor = shared_executor(2)
+    executor.submit(_evaluate, problem, X[:2], ["F", "G"]).result()   # start the workers
+    half = n // 2
+
+    def run():
+        futures = [executor.submit(_evaluate, problem, X[start:start + half], ["F", "G"]) for start in (0, half)]
+        return [future.result() for future in futures]
+    return run
+
+
+@benchmark("problems.transport.shm", params=(10_000, 100_000), throughput=True)
+def transport_shm(n):
+    problem = FullCellProblem(make_pem_problem())
+    X = random_designs(problem, n)
+    evaluator = SharedMemoryEvaluator(problem, n_workers=2, max_rows=n // 2)
+    atexit.register(evaluator.close)
+    evaluator.evaluate(X[:2])   # start the workers
+    return lambda: evaluator.evaluate(X)
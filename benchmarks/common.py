@@ -0,0 +1,48 @@
+# benchmarks/common.py
+"""
+Shared inputs for the benchmarks.
+"""
+import numpy as np
+
+from utils.optimization import PEMProblem
+
+# Defaults of pages/1_Catalyst_layer.py (IrO2 anode, Pt cathode) with the
+# effective-surface minimums lowered to 1e2 so part of the design space is feasible.
+CATALYST_PARAMS = dict(
+    A_cell=50.0, j=2.0, R=8.314, T=353.0, alpha=0.5, n=2, F=96485.0,
+    C_bulk_a=0.056, D_a=0.26, tau_a=1.2,
+    C_bulk_c=0.001, D_c=2e-5, tau_c=1.27,
+    eta_max=2.0,
+    rho_cat_a=11.66, c_cat_a=100.0, j0_a=1e-2, a_a=0.1, b_a=0.05,
+    rho_cat_c=21.45, c_cat_c=60.0, j0_c=1e-2, a_c=0.08, b_c=0.04,
+    eps_a_min=0.301, eps_a_max=0.600, delta_a_min=1e-4, delta_a_max=30e-4,
+    Scat_a_min=100e4, Scat_a_max=300e4, L_a_min=0.001, L_a_max=0.02, SA_a_min=1e2,
+    eps_c_min=0.300, eps_c_max=0.700, delta_c_min=1e-4, delta_c_max=30e-4,
+    Scat_c_min=50e4, Scat_c_max=200e4, L_c_min=0.001, L_c_max=0.02, SA_c_min=1e2,
+    j_min=0.1, j_max=6.0,
+)
+
+SEED = 1
+
+
+def make_pem_problem(**overrides):
+    params = dict(CATALYST_PARAMS)
+    params.update(overrides)
+    return PEMProblem(**params)
+
+
+def random_designs(problem, n, seed=SEED):
+    """
+    n uniformly sampled decision vectors inside the problem bounds.
+    """
+    rng = np.random.default_rng(seed)
+    return rng.uniform(problem.xl, problem.xu, size=(n, problem.n_var))
+
+
+def random_front(n, n_obj=2, seed=SEED):
+    """
+    n objective vectors with a non-trivial non-dominated subset (points near the unit simplex).
+    """
+    rng = np.random.default_rng(seed)
+    F = rng.dirichlet(np.ones(n_obj), size=n)
+    return F + 0.1 * rng.random((n, n_obj))
@@ -0,0 +1,55 @@
+# benchmarks/compare.py
+"""
+Compare two benchmark result files and flag regressions.
+
+Usage:
+    python -m benchmarks.compare OLD.json NEW.json [--threshold 0.10]
+
+Exits with status 1 if any benchmark got slower than the threshold (relative
+change of the minimum per-call time).
+"""
+import argparse
+import sys
+
+from benchmarks.harness import format_seconds, load_results
+
+
+def _key(entry):
+    return entry["name"], entry["param"]
+
+
+def compare(old, new, threshold=0.10):
+    """
+    Return rows (name, param, old_min, new_min, ratio, flag) for benchmarks present in both files.
+    """
+    old_map = {_key(e): e for e in old["results"] if "min" in e}
+    rows = []
+    for entry in new["results"]:
+        if "min" not in entry or _key(entry) not in old_map:
+            continue
+        t_old = old_map[_key(entry)]["min"]
+        t_new = entry["min"]
+        ratio = t_new / t_old
+        flag = "SLOWER" if ratio > 1 + threshold else "faster" if ratio < 1 - threshold else ""
+        rows.append((entry["name"], entry["param"], t_old, t_new, ratio, flag))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative change reported as a regression")
+    args = parser.parse_args(argv)
+
+    old, new = load_results(args.old), load_results(args.new)
+    print(f"old: {old['meta']['commit']}  new: {new['meta']['commit']}")
+    rows = compare(old, new, args.threshold)
+    for name, param, t_old, t_new, ratio, flag in rows:
+        label = name if param is None else f"{name}[{param}]"
+        print(f"{label:<60s} {format_seconds(t_old)} -> {format_seconds(t_new)}  x{ratio:5.2f} {flag}")
+    return 1 if any(r[5] == "SLOWER" for r in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
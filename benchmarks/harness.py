@@ -0,0 +1,154 @@
+# benchmarks/harness.py
+"""
+Minimal benchmark registry and timer.
+
+A benchmark is a function decorated with ``@benchmark``. It receives one
+parameter (e.g. a population size), does its setup, and returns the
+zero-argument callable that is actually timed. Timing follows ``timeit``:
+the callable is looped ``number`` times per sample (auto-ranged to ~0.2 s)
+and ``repeat`` samples are taken.
+"""
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+from datetime import datetime
+
+BENCHMARKS = []
+
+
+def benchmark(name, params=(None,), full_params=(), throughput=False, repeat=5):
+    """
+    Register a benchmark.
+
+    Parameters:
+      - name        : dotted benchmark name, the first part is used as group
+      - params      : parameter values run by default (and in --quick mode, the first only)
+      - full_params : extra parameter values only run with --full (large sizes)
+      - throughput  : if True, the parameter is an item count and items/s is reported
+      - repeat      : number of timing samples
+    """
+    def wrap(func):
+        BENCHMARKS.append(dict(name=name, func=func, params=tuple(params),
+                               full_params=tuple(full_params),
+                               throughput=throughput, repeat=repeat))
+        return func
+    return wrap
+
+
+def _quiet():
+    # Several code paths print progress or penalty messages; keep them out of the timings' output.
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def time_callable(fn, repeat=5):
+    """
+    Time fn() and return (number, per-call times in seconds).
+    """
+    timer = timeit.Timer(fn)
+    with _quiet():
+        number, total = timer.autorange()
+        # calls that take seconds each are sampled less often; the auto-range run counts as one sample
+        if total / number > 2.0:
+            return number, [total / number] + [s / number for s in timer.repeat(repeat=min(repeat, 2) - 1, number=number)]
+        samples = timer.repeat(repeat=repeat, number=number)
+    return number, [s / number for s in samples]
+
+
+def run_benchmarks(selected=None, mode="default", log=print):
+    """
+    Run all registered benchmarks whose name contains one of the strings in `selected`.
+
+    mode: "quick" (first parameter only), "default" or "full" (adds full_params).
+    Returns a list of result dicts.
+    """
+    results = []
+    for bench in BENCHMARKS:
+        if selected and not any(s in bench["name"] for s in selected):
+            continue
+        params = list(bench["params"])
+        if mode == "quick":
+            params = params[:1]
+        elif mode == "full":
+            params += list(bench["full_params"])
+        for param in params:
+            label = bench["name"] if param is None else f"{bench['name']}[{param}]"
+            try:
+                with _quiet():
+                    fn = bench["func"]() if param is None else bench["func"](param)
+                number, times = time_callable(fn, repeat=1 if mode == "quick" else bench["repeat"])
+            except MemoryError as e:
+                log(f"{label:<60s} skipped ({e!r})")
+                results.append(dict(name=bench["name"], param=param, error=repr(e)))
+                continue
+            entry = dict(
+                name=bench["name"],
+                group=bench["name"].split(".")[0],
+                param=param,
+                number=number,
+                times=times,
+                min=min(times),
+                median=statistics.median(times),
+                mean=statistics.fmean(times),
+                stdev=statistics.stdev(times) if len(times) > 1 else 0.0,
+            )
+            if bench["throughput"] and param:
+                entry["throughput"] = param / entry["min"]
+            results.append(entry)
+            extra = f"  {entry['throughput']:.3g} items/s" if "throughput" in entry else ""
+            log(f"{label:<60s} {format_seconds(entry['min'])}{extra}")
+    return results
+
+
+def format_seconds(t):
+    if t < 1e-6:
+        return f"{t * 1e9:8.1f} ns"
+    if t < 1e-3:
+        return f"{t * 1e6:8.1f} us"
+    if t < 1.0:
+        return f"{t * 1e3:8.1f} ms"
+    return f"{t:8.2f} s "
+
+
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return out.stdout.strip() + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def environment_info():
+    import numpy as np
+    import pymoo
+    return dict(
+        commit=git_revision(),
+        timestamp=datetime.now().isoformat(timespec="seconds"),
+        python=sys.version.split()[0],
+        numpy=np.__version__,
+        pymoo=pymoo.__version__,
+        platform=platform.platform(),
+        machine=platform.machine(),
+        cpu_count=os.cpu_count(),
+    )
+
+
+def save_results(results, path, mode):
+    data = dict(meta=dict(environment_info(), mode=mode, created=time.time()), results=results)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+    return path
+
+
+def load_results(path):
+    with open(path, "r") as f:
+        return json.load(f)
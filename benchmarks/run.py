@@ -0,0 +1,37 @@
+# benchmarks/run.py
+"""
+Run the benchmark suite and store the results as JSON.
+
+Usage (from the repository root):
+    python -m benchmarks.run                 # default sizes
+    python -m benchmarks.run --quick         # smallest size, one sample each
+    python -m benchmarks.run --full          # adds the large (up to 1M) sizes
+    python -m benchmarks.run -k optimizers   # only benchmarks whose name contains "optimizers"
+"""
+import argparse
+import os
+
+from benchmarks import bench_models, bench_problems, bench_optimizers, bench_postprocessing  # noqa: F401 (registration)
+from benchmarks.harness import git_revision, run_benchmarks, save_results
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument("--quick", action="store_true", help="smallest size only, one sample")
+    size.add_argument("--full", action="store_true", help="include the large sizes")
+    parser.add_argument("-k", dest="selected", action="append", help="substring filter on benchmark names")
+    parser.add_argument("-o", "--output", help="output JSON file (default: benchmarks/results/<commit>.json)")
+    args = parser.parse_args(argv)
+
+    mode = "quick" if args.quick else "full" if args.full else "default"
+    results = run_benchmarks(args.selected, mode=mode)
+    path = args.output or os.path.join(RESULTS_DIR, f"{git_revision()}.json")
+    save_results(results, path, mode)
+    print(f"\nResults written to {path}")
+
+
+if __name__ == "__main__":
+    main()
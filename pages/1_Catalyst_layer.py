@@ -2,13 +2,19 @@
 
 import os
 import json
+import time
+import uuid
 import numpy as np
 import pandas as pd
 import plotly.express as px
 import streamlit as st
 from datetime import datetime
 
-from utils.optimization import run_optimization
+from utils.catalysts import catalyst_names, catalyst_table, electrode_params, make_catalyst
+from utils.decision import rank_designs
+from utils.jobs import ACTIVE_STATES, shared_job_manager
+from utils.optimization import run_optimization, unwrap_problem
+from utils.visualization import compute_hypervolume, compute_c_metric, compute_euclidean_distance, run_profile_plot
 
 st.set_page_config(page_title="PEM Electrolyzer Optimization", layout="wide")
 st.write("powered by S2D2 Lab | Penn State")
@@ -28,6 +34,11 @@ if st.sidebar.button("Clear Cache"):
 RESULTS_DIR = "results_logs"
 os.makedirs(RESULTS_DIR, exist_ok=True)
 
+# optimizations run as background jobs in a worker pool shared by all sessions
+job_manager = shared_job_manager()
+if "session_owner" not in st.session_state:
+    st.session_state["session_owner"] = uuid.uuid4().hex[:8]
+
 ###############################################################################
 # Visualization & Metrics
 ###############################################################################
@@ -37,27 +48,9 @@ def create_dataframe(X, F, var_names, obj_names):
     df_objs = pd.DataFrame(F, columns=obj_names)
     return pd.concat([df_vars, df_objs], axis=1)
 
-def compute_hypervolume(F, ref_point=(1e5,1e5)):
-    from pymoo.indicators import Hypervolume
-    if F is None or len(F)==0:
-        return None
-    hv = Hypervolume(ref_point=ref_point)
-    return hv.do(F)
-
-def compute_c_metric(F, F2=None):
-    from pymoo.indicators import CMetric
-    if F is None or len(F)==0:
-        return None
-    if F2 is None:
-        F2=F
-    c_val = CMetric().do(F, F2)
-    return c_val
-
-def compute_euclidean_distance(F, reference=(0,0)):
-    if F is None or len(F)==0:
-        return None
-    dists = np.linalg.norm(F - np.array(reference), axis=1)
-    return np.mean(dists)
+def material_names(res, X):
+    # the MaterialChoiceProblem may sit under a scalarization or MOEA/D penalty wrapper
+    return unwrap_problem(res.problem, "material_names").material_names(X)
 
 ###############################################################################
 # Method Category
@@ -98,6 +91,22 @@ j      = st.sidebar.number_input("Current Density j (A/cm²)", value=2.0)
 R      = 8.314 # J/(mol*K)
 T      = st.sidebar.number_input("Temperature (K) ", value=353.0)
 st.sidebar.write(f" {T-273.15:.2f} °C")
+use_polarization = st.sidebar.checkbox("Evaluate over a polarization curve", value=False,
+                                       help="Evaluate each design at N current densities between the minimum j and j")
+if use_polarization:
+    n_j_points = st.sidebar.number_input("Number of j points", value=50, min_value=2, max_value=500)
+    polarization_objective = st.sidebar.selectbox("Curve objective", ["overpotential", "energy"],
+                                                  help="overpotential: mean over the curve; energy: sum of j*eta*A_cell")
+use_arrhenius = st.sidebar.checkbox("Temperature-dependent j0 (Arrhenius)", value=False,
+                                    help="j0 values are taken at the reference temperature and scaled to T")
+if use_arrhenius:
+    T_ref = st.sidebar.number_input("j0 reference temperature (K)", value=353.0)
+    Eact_a = st.sidebar.number_input("Anode activation energy (J/mol)", value=76000.0)
+    Eact_c = st.sidebar.number_input("Cathode activation energy (J/mol)", value=76000.0)
+    optimize_T = st.sidebar.checkbox("Optimize temperature as a decision variable", value=False)
+    T_min, T_max = st.sidebar.slider("Temperature range (K)", 293.0, 393.0, (313.0, 373.0))
+else:
+    optimize_T = False
 # n_e    = st.sidebar.number_input("Number of Electrons (n)", value=2)
 n_e=int(2)
 F_const= 96485.0 # Faraday Constant
@@ -127,24 +136,14 @@ F_const= 96485.0 # Faraday Constant
 # a_c      = st.sidebar.number_input("Cathode Tafel a (V)",value=0.08)
 # b_c      = st.sidebar.number_input("Cathode Tafel b (V)",value=0.04)
 
+explore_materials = st.sidebar.checkbox("Explore all catalyst combinations", value=False,
+                                        help="Catalyst choice becomes an integer decision variable; one run covers every anode/cathode pair")
+
 st.sidebar.header("Anode Catalyst Selection")
-anode_catalyst = st.sidebar.selectbox("Anode Catalyst", ["IrO2", "RuO2", "Custom"])
-if anode_catalyst == "IrO2":
-    rho_cat_a = 11.66 #Cathode Catalyst Density (g/cm³)"
-    c_cat_a = 100.0 #Anode Catalyst Cost ($/g)
-    j0_a = 1e-2 #Cathode exchange current densit j0 (A/cm²_active) **0.1 to 10 mA/cm²**
-    # S_cat_a = 100000.0
-    
-    a_a      = 0.1
-    b_a      = 0.05
-elif anode_catalyst == "RuO2":
-    rho_cat_a = 6.97 #Cathode Catalyst Density (g/cm³)" 
-    c_cat_a = 80.0 #Anode Catalyst Cost ($/g)
-    j0_a = 1e-2 #Cathode j0 (A/cm²_active)
-    
-    # S_cat_a = 100000.0
-    a_a      =0.1
-    b_a      =0.05
+anode_catalyst = st.sidebar.selectbox("Anode Catalyst", catalyst_names("anode") + ["Custom"])
+custom_anode = None
+if anode_catalyst != "Custom":
+    anode_params = electrode_params(catalyst_table("anode")[catalyst_names("anode").index(anode_catalyst)], "a")
 else:
     rho_cat_a = st.sidebar.number_input("Anode Catalyst Density (g/cm³)", value=10.0)
     c_cat_a = st.sidebar.number_input("Anode Catalyst Cost ($/g)", value=50.0)
@@ -153,25 +152,14 @@ else:
     S_cat_a = st.sidebar.number_input("Anode Specific Surface Area (cm²_active/g)", value=100000.0)
     a_a      = st.sidebar.number_input("Anode Tafel a (V)",value=0.1)
     b_a      = st.sidebar.number_input("Anode Tafel b (V)",value=0.05)
+    custom_anode = make_catalyst("Custom", "anode", rho_cat_a, c_cat_a, j0_a, a_a, b_a)
+    anode_params = electrode_params(custom_anode[0], "a")
 
 st.sidebar.header("Cathode Catalyst Selection")
-cathode_catalyst = st.sidebar.selectbox("Cathode Catalyst", ["Pt", "Pt-Ru", "Custom"])
-if cathode_catalyst == "Pt":
-    rho_cat_c = 21.45 #Cathode Catalyst Density (g/cm³)"
-    c_cat_c = 60.0 #Anode Catalyst Cost ($/g) **$27.30 to $59.00 per gram**
-    j0_c = 1e-2 # "Cathode j0 (A/cm²_active 
-    # S_cat_c = 100000.0
-    
-    a_c      = 0.08
-    b_c      = 0.04
-elif cathode_catalyst == "Pt-Ru":
-    rho_cat_c = 16.0 #Cathode Catalyst Density (g/cm³)" #10 to 15 g/cm³
-    c_cat_c = 55.0 # Anode Catalyst Cost ($/g)
-    j0_c = 1e-2 # "Cathode j0 (A/cm²_active **0.1 to 450 mA/cm²**
-    S_cat_c = 100000.0
-    
-    a_c      = 0.08
-    b_c      = 0.04
+cathode_catalyst = st.sidebar.selectbox("Cathode Catalyst", catalyst_names("cathode") + ["Custom"])
+custom_cathode = None
+if cathode_catalyst != "Custom":
+    cathode_params = electrode_params(catalyst_table("cathode")[catalyst_names("cathode").index(cathode_catalyst)], "c")
 else:
     rho_cat_c = st.sidebar.number_input("Cathode Catalyst Density (g/cm³)", value=21.45)
     c_cat_c = st.sidebar.number_input("Cathode Catalyst Cost ($/g)", value=60.0)
@@ -179,6 +167,8 @@ else:
     S_cat_c = st.sidebar.number_input("Cathode Specific Surface Area (cm²active/g)", value=100000.0)
     a_c      = st.sidebar.number_input("Cathode Tafel a (V)",value=0.08)
     b_c      = st.sidebar.number_input("Cathode Tafel b (V)",value=0.04)
+    custom_cathode = make_catalyst("Custom", "cathode", rho_cat_c, c_cat_c, j0_c, a_c, b_c)
+    cathode_params = electrode_params(custom_cathode[0], "c")
 
 
 with st.sidebar.expander("More Customizations"):
@@ -233,82 +223,177 @@ st.sidebar.write("-----")
 st.sidebar.header("Algorithm Settings (Pareto-based only)")
 pop_size=st.sidebar.number_input("Population Size",value=40,min_value=10)
 n_gen=   st.sidebar.number_input("Number of Gens",value=30,min_value=10)
+profile_run = st.sidebar.checkbox("Profile run (per-generation timings)", value=False)
+short_circuit = st.sidebar.checkbox("Skip overpotential for designs failing cheap constraints", value=False)
+run_in_background = st.sidebar.checkbox("Run as background job", value=True,
+                                        help="The page stays responsive and shows progress; the run survives widget changes")
+
+st.sidebar.header("Robust Optimization")
+use_robust = st.sidebar.checkbox("Optimize under parameter scatter", value=False,
+                                 help="Evaluate every design over an ensemble of parameter draws and optimize a robust overpotential")
+if use_robust:
+    nominal = dict(D_a=D_a, D_c=D_c, tau_a=tau_a, tau_c=tau_c, C_bulk_a=C_bulk_a, C_bulk_c=C_bulk_c,
+                   j0_a=anode_params["j0_a"], j0_c=cathode_params["j0_c"])
+    uncertain_names = st.sidebar.multiselect("Uncertain parameters", list(nominal), default=["D_c", "j0_a"])
+    spread = st.sidebar.number_input("Scatter factor (log-uniform between value/f and value·f)", value=3.0, min_value=1.0)
+    n_samples = st.sidebar.selectbox("Ensemble size", [16, 32, 64, 128, 256], index=2)
+    sampler = st.sidebar.selectbox("Sampler", ["sobol", "mc"], help="sobol: scrambled quasi-Monte Carlo")
+    robust_measure = st.sidebar.selectbox("Robust overpotential", ["mean_std", "cvar", "mean", "worst"])
+    robust_k = st.sidebar.number_input("k in mean + k·std", value=1.0, min_value=0.0)
+    robust_alpha = st.sidebar.slider("CVaR level α", 0.5, 0.99, 0.9)
+
+st.sidebar.header("Design Recommendation")
+decision_labels = {"Knee point": "knee", "TOPSIS": "topsis", "Compromise programming": "compromise"}
+decision_method = decision_labels[st.sidebar.selectbox("Recommend designs by", list(decision_labels),
+                                                       help="Applied to the normalized Pareto front, so $ and V are not mixed")]
+cost_weight = st.sidebar.slider("Weight of cost vs. overpotential", 0.0, 1.0, 0.5,
+                                disabled=decision_method == "knee")
+cp_p = st.sidebar.selectbox("Compromise metric", [1, 2, np.inf], index=1,
+                            format_func=lambda p: "Chebyshev (p=∞)" if np.isinf(p) else f"L{p}",
+                            disabled=decision_method != "compromise")
 
 ###############################################################################
 # RUN
 ###############################################################################
+res = None
 if st.button("Run Optimization"):
-    with st.spinner("Running..."):
-        run_kwargs= dict(
-            category=method_category,
-            method=method_name,
-            # Problem parameters
-            A_cell=A_cell,
-            j=j,
-            R=R,
-            T=T,
-            alpha=alpha,
-            n=n_e,
-            F=F_const,
-            # anode side
-            C_bulk_a=C_bulk_a,
-            D_a=D_a,
-            tau_a=tau_a,
-            # cathode side
-            C_bulk_c=C_bulk_c,
-            D_c=D_c,
-            tau_c=tau_c,
-            eta_max=eta_max,
-            # catalyst anode
-            rho_cat_a=rho_cat_a,
-            c_cat_a=c_cat_a,
-            j0_a=j0_a,
-            a_a=a_a,
-            b_a=b_a,
-            # catalyst cathode
-            rho_cat_c=rho_cat_c,
-            c_cat_c=c_cat_c,
-            j0_c=j0_c,
-            a_c=a_c,
-            b_c=b_c,
-            # constraints
-            eps_a_min=eps_a_min, eps_a_max=eps_a_max,
-            delta_a_min=delta_a_min, delta_a_max=delta_a_max,
-            Scat_a_min=Scat_a_min, Scat_a_max=Scat_a_max,
-            L_a_min=L_a_min, L_a_max=L_a_max,
-            SA_a_min=SA_a_min,
-
-            eps_c_min=eps_c_min, eps_c_max=eps_c_max,
-            delta_c_min=delta_c_min, delta_c_max=delta_c_max,
-            Scat_c_min=Scat_c_min, Scat_c_max=Scat_c_max,
-            L_c_min=L_c_min, L_c_max=L_c_max,
-            SA_c_min=SA_c_min,
-
-            j_min=j_min, j_max=j_max,
-
-            # 21 constraints => n_constr=21 in PEMProblem
-            # plus we define if tau is a direct param
-            # tau_a=tau_a, tau_c=tau_c,
-
-            # pass scalar_params
-            scalar_params=scalar_params
-        )
-
-        # If Pareto-based => pass pop_size/n_gen
-        if method_category=="Pareto-based":
-            try:
-                res = run_optimization(**run_kwargs, pop_size=pop_size, n_gen=n_gen)
-            except Exception as e:
-                st.error(f"Error in Pareto-based: {e}")
-                st.stop()
-        else:
-            # scalar => WeightedSum or GoalSeeking
+    run_kwargs= dict(
+        category=method_category,
+        method=method_name,
+        # Problem parameters
+        A_cell=A_cell,
+        j=j,
+        R=R,
+        T=T,
+        alpha=alpha,
+        n=n_e,
+        F=F_const,
+        # anode side
+        C_bulk_a=C_bulk_a,
+        D_a=D_a,
+        tau_a=tau_a,
+        # cathode side
+        C_bulk_c=C_bulk_c,
+        D_c=D_c,
+        tau_c=tau_c,
+        eta_max=eta_max,
+        # catalyst anode and cathode (rho_cat, c_cat, j0, a, b)
+        **anode_params,
+        **cathode_params,
+        # constraints
+        eps_a_min=eps_a_min, eps_a_max=eps_a_max,
+        delta_a_min=delta_a_min, delta_a_max=delta_a_max,
+        Scat_a_min=Scat_a_min, Scat_a_max=Scat_a_max,
+        L_a_min=L_a_min, L_a_max=L_a_max,
+        SA_a_min=SA_a_min,
+
+        eps_c_min=eps_c_min, eps_c_max=eps_c_max,
+        delta_c_min=delta_c_min, delta_c_max=delta_c_max,
+        Scat_c_min=Scat_c_min, Scat_c_max=Scat_c_max,
+        L_c_min=L_c_min, L_c_max=L_c_max,
+        SA_c_min=SA_c_min,
+
+        j_min=j_min, j_max=j_max,
+        short_circuit=short_circuit,
+
+        # 21 constraints => n_constr=21 in PEMProblem
+        # plus we define if tau is a direct param
+        # tau_a=tau_a, tau_c=tau_c,
+
+        # pass scalar_params
+        scalar_params=scalar_params
+    )
+
+    if use_robust and uncertain_names:
+        uncertain = {name: ("loguniform", nominal[name] / spread, nominal[name] * spread) for name in uncertain_names}
+        run_kwargs.update(robust=dict(uncertain=uncertain, n_samples=n_samples, sampler=sampler,
+                                      measure=robust_measure, k=robust_k, alpha=robust_alpha))
+
+    if explore_materials:
+        run_kwargs.update(catalyst_tables=(catalyst_table("anode", extra=custom_anode),
+                                           catalyst_table("cathode", extra=custom_cathode)))
+
+    if use_arrhenius:
+        run_kwargs.update(T_ref=T_ref, Eact_a=Eact_a, Eact_c=Eact_c)
+        if optimize_T:
+            run_kwargs.update(T_bounds=(T_min, T_max))
+
+    if use_polarization:
+        run_kwargs.update(j_points=np.linspace(max(j_min, 1e-3), j, int(n_j_points)),
+                          polarization_objective=polarization_objective)
+
+    # If Pareto-based => pass pop_size/n_gen
+    if method_category=="Pareto-based":
+        run_kwargs.update(pop_size=pop_size, n_gen=n_gen)
+    else:
+        # evaluations of earlier runs; reused when only the weights/goals changed
+        run_kwargs.update(archive=st.session_state.get("catalyst_archive"))
+    run_kwargs.update(profile=profile_run)
+
+    if run_in_background:
+        job_id = job_manager.submit("utils.optimization:run_optimization", run_kwargs,
+                                    kind=f"Catalyst {method_name}", owner=st.session_state["session_owner"])
+        # the settings that decide how the result is displayed travel with the job,
+        # so it is shown as configured even if the sidebar changes meanwhile
+        settings = dict(method_category=method_category, explore_materials=explore_materials,
+                        optimize_T=optimize_T, use_arrhenius=use_arrhenius, use_polarization=use_polarization,
+                        T_range=(T_min, T_max) if use_arrhenius else None,
+                        short_circuit=short_circuit, profile_run=profile_run)
+        st.session_state["catalyst_job"] = dict(id=job_id, settings=settings)
+    else:
+        st.session_state.pop("catalyst_job", None)
+        with st.spinner("Running..."):
             try:
                 res = run_optimization(**run_kwargs)
             except Exception as e:
-                st.error(f"Error in Scalarization: {e}")
+                st.error(f"Error in {method_category}: {e}")
                 st.stop()
 
+
+@st.fragment(run_every=1.0)
+def job_progress(job_id):
+    """
+    Progress of a background job, refreshed every second; reruns the page once it has finished.
+    """
+    job = job_manager.status(job_id)
+    if job["status"] not in ACTIVE_STATES:
+        st.rerun()
+    st.progress(job["progress"], text=f"Job {job_id}: {job['status']}, generation {job['n_gen']}")
+    partial = job_manager.partial(job_id)
+    if partial is not None and partial["F"] is not None and np.ndim(partial["F"]) == 2 and partial["F"].shape[1] == 2:
+        fig = px.scatter(x=partial["F"][:, 0], y=partial["F"][:, 1], labels=dict(x="Cost", y="Overpotential"),
+                         title=f"Current front (generation {partial['n_gen']})")
+        st.plotly_chart(fig, use_container_width=True)
+    if st.button("Cancel job", key=f"cancel_{job_id}"):
+        job_manager.cancel(job_id)
+
+
+job = st.session_state.get("catalyst_job")
+if res is None and job is not None:
+    status = job_manager.status(job["id"])
+    if status is None:
+        st.session_state.pop("catalyst_job")
+    elif status["status"] in ACTIVE_STATES:
+        job_progress(job["id"])
+    elif status["status"] == "failed":
+        st.error(f"Error in {job['settings']['method_category']}: {status['message'].splitlines()[0]}")
+    else:
+        res = job_manager.result(job["id"])
+        settings = job["settings"]
+        method_category, explore_materials = settings["method_category"], settings["explore_materials"]
+        optimize_T, use_arrhenius = settings["optimize_T"], settings["use_arrhenius"]
+        use_polarization, short_circuit = settings["use_polarization"], settings["short_circuit"]
+        profile_run = settings["profile_run"]
+        if use_arrhenius:
+            T_min, T_max = settings["T_range"]
+        if status["status"] == "cancelled":
+            st.warning(f"Job {job['id']} was cancelled after generation {status['n_gen']}; showing the result so far.")
+
+if res is not None:
+    render_start = time.perf_counter()
+    if getattr(res, "archive", None) is not None:
+        st.session_state["catalyst_archive"] = res.archive
+    extra_vars = (["T"] if optimize_T else []) + (["anode_idx", "cathode_idx"] if explore_materials else [])
     if res.X is None or res.F is None:
         st.error("No feasible solutions or solver failure.")
     else:
@@ -316,9 +401,11 @@ if st.button("Run Optimization"):
         if method_category=="Scalarization":
             # single best solution
             st.write("**Best Single-Objective Solution**")
-            var_names= ["delta_a","eps_a","S_cat_a","delta_c","eps_c","S_cat_c"]
+            var_names= ["delta_a","eps_a","S_cat_a","delta_c","eps_c","S_cat_c"] + extra_vars
             for var,val in zip(var_names, res.X):
                 st.write(f" - **{var}**: {val:.6f}")
+            if explore_materials:
+                st.write(" - **Materials**: {} / {}".format(*material_names(res, res.X)[0]))
             st.write("Objective Value:", res.F[0])
         else:
             # Pareto front
@@ -329,20 +416,42 @@ if st.button("Run Optimization"):
                 st.write("X:",X)
                 st.write("F:",F)
             else:
-                var_names=["delta_a","eps_a","S_cat_a","delta_c","eps_c","S_cat_c"]
+                var_names=["delta_a","eps_a","S_cat_a","delta_c","eps_c","S_cat_c"] + extra_vars
                 obj_names=["Cost","Overpotential"]
                 df = create_dataframe(X,F,var_names,obj_names)
+                if explore_materials:
+                    df["Materials"] = [f"{a} / {c}" for a, c in material_names(res, X)]
+
+                top3 = rank_designs(F, decision_method, weights=(cost_weight, 1.0 - cost_weight), p=cp_p, n=3)
+                method_label = {v: k for k, v in decision_labels.items()}[decision_method]
 
                 st.subheader("Pareto Front (Objectives)")
                 fig_obj = px.scatter(df, x="Cost", y="Overpotential",
-                                     hover_data=df.columns)
+                                     color="Materials" if explore_materials else None,
+                                     hover_data=df.columns, render_mode="webgl")
+                fig_obj.add_scatter(x=F[top3[:1], 0], y=F[top3[:1], 1], mode="markers", name="Recommended",
+                                    marker=dict(symbol="star", size=16, color="red"))
                 st.plotly_chart(fig_obj, use_container_width=True)
 
                 st.subheader("Decision Variables")
-                fig_par = px.parallel_coordinates(df,color="Cost",
+                fig_par = px.parallel_coordinates(df.drop(columns="Materials", errors="ignore"),color="Cost",
                     labels={col:col for col in df.columns})
                 st.plotly_chart(fig_par,use_container_width=True)
 
+                if use_arrhenius and not use_polarization:
+                    st.subheader("Temperature Sensitivity of the Pareto Set")
+                    problem_run = unwrap_problem(res.problem, "temperature_map")
+                    T_grid = np.linspace(T_min, T_max, 61)
+                    # MaterialChoiceProblem maps every design with its own materials (full rows)
+                    tmap = problem_run.temperature_map(X if explore_materials else X[:, :6], T_grid)
+                    order = np.argsort(F[:, 0])
+                    eta_map = np.where(tmap["feasible"], tmap["eta"], np.nan)[order]
+                    fig_T = px.imshow(eta_map, x=T_grid, aspect="auto", origin="lower",
+                                      labels=dict(x="Temperature (K)", y="Pareto design (by cost)",
+                                                  color="Overpotential (V)"))
+                    st.plotly_chart(fig_T, use_container_width=True)
+                    st.caption("Blank cells: design infeasible at that temperature.")
+
                 st.subheader("Performance Metrics")
                 metric_choice= st.selectbox("Choose a metric:",
                                             ["None","Hypervolume","C-Metric","Euclidean Distance"])
@@ -360,14 +469,32 @@ if st.button("Run Optimization"):
                 st.subheader("All Pareto Solutions")
                 st.dataframe(df)
 
-                sums = F[:,0]+F[:,1]
-                idx_sorted=np.argsort(sums)
-                top3=idx_sorted[:3]
-                st.markdown("### Top 3 Solutions by Cost+Overpotential")
+                st.markdown(f"### Top 3 Solutions by {method_label}")
                 for rank, idx in enumerate(top3):
                     st.markdown(f"**Rank {rank+1}** => Cost={F[idx,0]:.4f}, Overpot={F[idx,1]:.4f}")
                     st.json({var_names[i]: X[idx][i] for i in range(len(var_names))})
 
+    problem_run = unwrap_problem(res.problem, "short_circuit_rate")
+    # the vectorized wrappers (T_bounds, materials, robust) never call PEMProblem._evaluate
+    if short_circuit and problem_run is not None and problem_run.n_evaluated:
+        st.caption(f"{problem_run.short_circuit_rate:.0%} of evaluations skipped the overpotential model.")
+
+    if profile_run:
+        res.profile.add_phase("render", time.perf_counter() - render_start)
+        with st.expander("Run profile"):
+            st.json(res.profile.summary())
+            st.plotly_chart(run_profile_plot(res.profile), use_container_width=True)
+
+
+###############################################################################
+# BACKGROUND JOBS
+###############################################################################
+st.sidebar.header("Background Jobs")
+my_jobs = job_manager.jobs(owner=st.session_state["session_owner"], limit=10)
+st.sidebar.caption(f"{job_manager.n_active()} job(s) queued or running on this server, "
+                   f"{job_manager.max_workers} at a time")
+if my_jobs:
+    st.sidebar.dataframe(pd.DataFrame(my_jobs)[["id", "kind", "status", "progress"]], hide_index=True)
 
 ###############################################################################
 # SAVE, LOAD, CLEAR
@@ -431,17 +558,17 @@ if st.session_state["results_data"] is not None:
 
 
 #----------------
-from utils.visualization import  create_full_dataframe, design_space_scatter_matrix, design_space_parallel_coordinates, compute_hypervolume, compute_c_metric, compute_euclidean_distance
+from utils.visualization import  create_full_dataframe, design_space_scatter_matrix, design_space_parallel_coordinates, compute_hypervolume, compute_c_metric, compute_euclidean_distance, density_plot, MAX_PLOT_POINTS
 from utils.optimization import PEMProblem
 # After your optimization run is complete and you have "res"
-if res.X is not None and res.F is not None:
+if res is not None and res.X is not None and res.F is not None and isinstance(res.problem, PEMProblem) and res.F.ndim == 2:
     st.success("Optimization complete!")
     # Display best solution or Pareto front as you already do...
     
     # --- Now, re-create the problem instance for visualization.
     # You can re-use the same run_kwargs that were used for the optimization.
     # For demonstration, we assume run_kwargs is available or you can reassemble it.
-    problem_vis = PEMProblem(**run_kwargs)  # Make sure run_kwargs contains the same keys used by PEMProblem.
+    problem_vis = res.problem  # the PEMProblem the run was made with
     
     # Create a full DataFrame that includes constraint values.
     df_full = create_full_dataframe(problem_vis, res.X, res.F)
@@ -451,12 +578,20 @@ if res.X is not None and res.F is not None:
     
     # Create a scatter matrix (you can choose which columns to include)
     dims = ["Cost", "Overpotential"] + [col for col in df_full.columns if col.startswith("G")]
-    fig_scatter = design_space_scatter_matrix(df_full, dimensions=dims, color="Cost")
+    fig_scatter = design_space_scatter_matrix(df_full, dimensions=dims, color="Cost",
+                                              objectives=["Cost", "Overpotential"])
     st.subheader("Scatter Matrix Plot")
     st.plotly_chart(fig_scatter, use_container_width=True)
+
+    # the scatter matrix shows a decimated sample of large tables; the density covers every row
+    if len(df_full) > MAX_PLOT_POINTS:
+        st.subheader("Objective Density (all designs)")
+        st.plotly_chart(density_plot(df_full, "Cost", "Overpotential", objectives=["Cost", "Overpotential"]),
+                        use_container_width=True)
     
     # Create a parallel coordinates plot
-    fig_parallel = design_space_parallel_coordinates(df_full, dimensions=dims, color="Cost")
+    fig_parallel = design_space_parallel_coordinates(df_full, dimensions=dims, color="Cost",
+                                                     objectives=["Cost", "Overpotential"])
     st.subheader("Parallel Coordinates Plot")
     st.plotly_chart(fig_parallel, use_container_width=True)
 
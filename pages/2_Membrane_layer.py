@@ -1,11 +1,25 @@
 # streamlit_app.py
+import os
+import tempfile
+import time
+import uuid
 import streamlit as st
 import numpy as np
 import matplotlib.pyplot as plt
+from utils.decision import knee_point
+from utils.jobs import ACTIVE_STATES, shared_job_manager
+from utils.membrane import mechanical_min_thickness
 from utils.membrane_optimization import run_optimization
+from utils.visualization import run_profile_plot
+from utils.load_profile import read_load_profile
 
 st.title("PEM Electrolyzer Membrane Design Optimization")
 
+# optimizations run as background jobs in a worker pool shared by all sessions
+job_manager = shared_job_manager()
+if "session_owner" not in st.session_state:
+    st.session_state["session_owner"] = uuid.uuid4().hex[:8]
+
 st.sidebar.header("Optimization Settings")
 
 # Choose optimization method
@@ -16,6 +30,9 @@ method_choice = st.sidebar.selectbox("Select Optimization Method", options=metho
 pop_size = st.sidebar.slider("Population Size", min_value=50, max_value=300, value=100, step=10)
 n_gen = st.sidebar.slider("Number of Generations", min_value=10, max_value=200, value=100, step=10)
 seed = st.sidebar.number_input("Random Seed", value=1, step=1)
+profile_run = st.sidebar.checkbox("Profile run (per-generation timings)", value=False)
+run_in_background = st.sidebar.checkbox("Run as background job", value=True,
+                                        help="The page stays responsive and shows progress; the run survives widget changes")
 
 st.sidebar.header("Decision Variable Bounds")
 t_lb = st.sidebar.number_input("Lower bound for membrane thickness (m)", value=50e-6, format="%.6e")
@@ -30,10 +47,48 @@ bounds = {
     'j_ub': j_ub
 }
 
+st.sidebar.header("Load Profile (optional)")
+load_file = st.sidebar.file_uploader("Load profile (.npy or .parquet, fraction of rated load per step)",
+                                     type=["npy", "parquet"])
+load_profile = None
+if load_file is not None:
+    normalize_load = st.sidebar.checkbox("Scale profile to a peak of 1.0", value=False)
+    dt_hours = st.sidebar.number_input("Time step (h)", value=1.0, min_value=1e-3)
+    suffix = os.path.splitext(load_file.name)[1]
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+        tmp.write(load_file.getbuffer())
+    try:
+        # in-memory copy (the upload is in memory anyway), so the temp file can go on every rerun
+        load_profile = np.array(read_load_profile(tmp.name, normalize=normalize_load))
+    finally:
+        os.unlink(tmp.name)
+    st.sidebar.write(f"{len(load_profile)} steps; the current density bounds apply to the rated j.")
+else:
+    dt_hours = 1.0
+
 st.sidebar.header("Mechanical Durability Constraint")
-# Display (but not change) the default minimum thickness from mechanical considerations.
 default_t_mech_min = 158e-6
-st.sidebar.write(f"Mechanical durability constraint: t ≥ {default_t_mech_min:.2e} m")
+use_stress_model = st.sidebar.checkbox("Compute t_mech_min from the stress model", value=False)
+if use_stress_model:
+    # t_mech_min = r * sqrt(k * ΔP * SF / σ_tensile), worst case over the listed pressures
+    delta_P_input = st.sidebar.text_input("Pressure difference ΔP (bar, comma separated for several cases)", "10, 30")
+    try:
+        delta_P = [float(v) * 1e5 for v in delta_P_input.split(",")]
+    except ValueError:
+        st.sidebar.error("Invalid pressure input; using 30 bar.")
+        delta_P = [30e5]
+    r_span = st.sidebar.number_input("Unsupported span radius r (mm)", value=1.0, min_value=1e-3) * 1e-3
+    SF = st.sidebar.number_input("Safety factor SF", value=2.0, min_value=1.0)
+    sigma_tensile = st.sidebar.number_input("Tensile strength σ_tensile (MPa)", value=25.0, min_value=1e-3) * 1e6
+    k_stress = st.sidebar.number_input("Stress geometry factor k", value=0.3, min_value=1e-6)
+    t_mech_min = float(np.max(mechanical_min_thickness(delta_P, r_span, SF, sigma_tensile, k_stress)))
+else:
+    t_mech_min = st.sidebar.number_input("Minimum thickness t_mech_min (m)", value=default_t_mech_min, format="%.6e")
+st.sidebar.write(f"Mechanical durability constraint: t ≥ {t_mech_min:.2e} m")
+
+st.sidebar.header("Lifetime Constraint")
+L_min = st.sidebar.number_input("Minimum lifetime L_min (hours, 0 = off)", value=0.0, min_value=0.0)
+beta_L = st.sidebar.number_input("Lifetime loss per current density β_L (hours per A/cm²)", value=0.0, min_value=0.0)
 
 st.sidebar.header("Scalarization Parameters")
 scalar_params = {}
@@ -170,25 +225,88 @@ c_ionomer = st.sidebar.number_input("Cost of ionomer ($/kg)", value=300.0)
 rho = st.sidebar.number_input("Density of membrane (kg/m³)", value=2000.0)
 c_manuf = st.sidebar.number_input("Manufacturing cost ($/m²)", value=20.0)
 c_E = st.sidebar.number_input("Environmental impact factor (kg CO₂-eq/kg)", value=10.0)
+voltage_model = st.sidebar.selectbox("Cell voltage model", options=["empirical", "ohmic"],
+                                     help="ohmic: V_oc + activation + j·t/σ_mem with the Springer conductivity σ_mem(T, λ)")
+voltage_params = {"voltage_model": voltage_model}
+if voltage_model == "ohmic":
+    T_cell = st.sidebar.number_input("Cell temperature (°C)", value=80.0, min_value=0.0, max_value=120.0) + 273.15
+    lam = st.sidebar.number_input("Membrane water content λ", value=14.0, min_value=1.0, max_value=25.0)
+    j0_mem = st.sidebar.number_input("Exchange current density j0 (A/cm²)", value=1e-3, format="%.2e")
+    voltage_params.update({"T": T_cell, "lam": lam, "j0": j0_mem})
 
 model_params = {
     "c_ionomer": c_ionomer,
     "rho": rho,
     "c_manuf": c_manuf,
     "c_E": c_E,
-    "t_mech_min": default_t_mech_min
+    "t_mech_min": t_mech_min,
+    "L_min": L_min,
+    "beta_L": beta_L,
+    **voltage_params
 }
 
+res = None
 if st.button("Run Optimization"):
-    st.write("Running optimization, please wait...")
-    res = run_optimization(method=method_choice,
-                           model_params=model_params,
-                           bounds=bounds,
-                           scalar_params=scalar_params,
-                           pop_size=pop_size,
-                           n_gen=n_gen,
-                           seed=seed)
+    run_kwargs = dict(method=method_choice,
+                      model_params=model_params,
+                      bounds=bounds,
+                      scalar_params=scalar_params,
+                      pop_size=pop_size,
+                      n_gen=n_gen,
+                      seed=seed,
+                      profile=profile_run,
+                      load_profile=load_profile,
+                      dt_hours=dt_hours)
+    if run_in_background:
+        job_id = job_manager.submit("utils.membrane_optimization:run_optimization", run_kwargs,
+                                    kind=f"Membrane {method_choice}", owner=st.session_state["session_owner"])
+        # kept with the job so the result is shown as configured, whatever the sidebar shows later
+        settings = dict(method_choice=method_choice, has_load_profile=load_profile is not None, profile_run=profile_run)
+        st.session_state["membrane_job"] = dict(id=job_id, settings=settings)
+    else:
+        st.session_state.pop("membrane_job", None)
+        st.write("Running optimization, please wait...")
+        try:
+            res = run_optimization(**run_kwargs)
+        except ValueError as e:
+            st.error(str(e))
+            st.stop()
+
+
+@st.fragment(run_every=1.0)
+def job_progress(job_id):
+    """
+    Progress of a background job, refreshed every second; reruns the page once it has finished.
+    """
+    job = job_manager.status(job_id)
+    if job["status"] not in ACTIVE_STATES:
+        st.rerun()
+    st.progress(job["progress"], text=f"Job {job_id}: {job['status']}, generation {job['n_gen']}")
+    if st.button("Cancel job", key=f"cancel_{job_id}"):
+        job_manager.cancel(job_id)
+
+
+job = st.session_state.get("membrane_job")
+has_load_profile = load_profile is not None
+if res is None and job is not None:
+    status = job_manager.status(job["id"])
+    if status is None:
+        st.session_state.pop("membrane_job")
+    elif status["status"] in ACTIVE_STATES:
+        job_progress(job["id"])
+    elif status["status"] == "failed":
+        st.error(status["message"].splitlines()[0])
+    else:
+        res = job_manager.result(job["id"])
+        method_choice = job["settings"]["method_choice"]
+        has_load_profile = job["settings"]["has_load_profile"]
+        profile_run = job["settings"]["profile_run"]
+        if status["status"] == "cancelled":
+            st.warning(f"Job {job['id']} was cancelled after generation {status['n_gen']}; showing the result so far.")
+
+if res is not None:
     st.write("Optimization Completed!")
+    render_start = time.perf_counter()
     
     # Retrieve objective values from the result
     F = res.F
@@ -198,7 +316,19 @@ if st.button("Run Optimization"):
     st.write("Each row corresponds to [membrane thickness (m), current density (A/cm²)]:")
     st.write(X)
     
-    if method_choice in ["NSGA2", "MOEAD", "SPEA2"]:
+    if has_load_profile and method_choice in ["NSGA2", "MOEAD", "SPEA2"]:
+        st.subheader("Pareto Front over the Load Profile")
+        st.write("Columns: [Specific Energy (kWh/kg), -H2 Produced (kg), Lifetime Used, Capital Cost]")
+        st.write(F)
+
+        fig, ax = plt.subplots()
+        sc = ax.scatter(F[:, 3], F[:, 0], c=-F[:, 1], cmap="viridis")
+        ax.set_xlabel("Capital Cost ($/m²)")
+        ax.set_ylabel("Specific Energy (kWh/kg H2)")
+        cbar = plt.colorbar(sc, ax=ax)
+        cbar.set_label("H2 produced (kg)")
+        st.pyplot(fig)
+    elif method_choice in ["NSGA2", "MOEAD", "SPEA2"]:
         st.subheader("Pareto Front (Objective Values)")
         st.write("Columns: [-Efficiency, -Lifetime, Capital Cost, Environmental Impact]")
         st.write(F)
@@ -225,3 +355,15 @@ if st.button("Run Optimization"):
         st.write(f"Decision vector: {X[best_idx, :]}")
         st.write(f"Objective value: {F[best_idx, 0]}")
 
+    if method_choice in ["NSGA2", "MOEAD", "SPEA2"] and F is not None and len(F) > 1:
+        st.subheader("Recommended Design (knee point of the normalized front)")
+        knee = knee_point(F)
+        st.write(f"Decision vector: {X[knee, :]}")
+        st.write(f"Objective values: {F[knee, :]}")
+
+    if profile_run:
+        res.profile.add_phase("render", time.perf_counter() - render_start)
+        with st.expander("Run profile"):
+            st.json(res.profile.summary())
+            st.plotly_chart(run_profile_plot(res.profile), use_container_width=True)
+
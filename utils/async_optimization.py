@@ -0,0 +1,192 @@
+# utils/async_optimization.py
+"""
+asyncio driver for pymoo algorithms, for embedding the optimizers in services.
+
+optimize_async() steps an algorithm through pymoo's ask/tell interface:
+
+  - mating and survival (ask/tell) run in a worker thread, so the event loop
+    never blocks
+  - every population evaluation is sent to a process pool, optionally split
+    into chunks; by default one bounded pool (shared_executor) is shared by
+    all optimizations of the process, so many concurrent runs cannot
+    oversubscribe the machine
+  - an update is yielded after every generation; leaving the `async for`
+    early or cancelling the consuming task stops the run
+
+pymoo draws its random numbers from the global numpy/random generators, so
+each run keeps its own generator state and swaps it in around ask/tell:
+concurrent runs give the same results as when run one after another.
+
+run_optimization_async in utils/optimization.py and
+utils/membrane_optimization.py build on it.
+"""
+import asyncio
+import copy
+import os
+import random
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from multiprocessing import get_context
+
+import numpy as np
+from pymoo.core.individual import Individual
+from pymoo.core.population import Population
+from pymoo.core.problem import Problem
+
+from utils.seeds import lineage
+
+MAX_WORKERS = max(1, min(4, os.cpu_count() or 1))
+
+# guards the global random state while one run's ask/tell is using it
+_RNG_LOCK = threading.Lock()
+
+
+def spawn_context():
+    """
+    multiprocessing context of all worker processes of the package (this
+    pool, job workers, islands, shared-memory evaluators, sweeps): spawn,
+    because the Streamlit server and the HTTP service are multi-threaded and
+    forking a threaded process can deadlock the child.
+    """
+    return get_context("spawn")
+
+
+@lru_cache(maxsize=None)
+def shared_executor(max_workers=MAX_WORKERS):
+    """
+    The process pool shared by all async optimizations (and parameter
+    sweeps) of this process, created on first use.
+    """
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=spawn_context())
+
+
+def _evaluate(problem, X, values_of):
+    """
+    Worker side: evaluate rows X of problem; dict of the requested arrays.
+    """
+    out = problem.evaluate(X, return_values_of=values_of, return_as_dictionary=True)
+    return {key: out[key] for key in values_of if out.get(key) is not None}
+
+
+class _Precomputed(Problem):
+    """
+    Stand-in for problem that returns values computed elsewhere (vectorized
+    even if problem is elementwise), so the algorithm's evaluator can store
+    them and count the evaluations.
+    """
+    def __init__(self, problem, out):
+        super().__init__(n_var=problem.n_var, n_obj=problem.n_obj, n_ieq_constr=problem.n_ieq_constr,
+                         n_eq_constr=problem.n_eq_constr, xl=problem.xl, xu=problem.xu)
+        self.out = out
+
+    def _evaluate(self, X, out, *args, **kwargs):
+        out.update(self.out)
+
+
+class _RunState:
+    """
+    Random generator state of one run, swapped in around ask/tell.
+    """
+    def __init__(self):
+        self.np_state = np.random.get_state()
+        self.py_state = random.getstate()
+
+    def call(self, func, *args, **kwargs):
+        with _RNG_LOCK:
+            np_saved, py_saved = np.random.get_state(), random.getstate()
+            np.random.set_state(self.np_state)
+            random.setstate(self.py_state)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.np_state, self.py_state = np.random.get_state(), random.getstate()
+                np.random.set_state(np_saved)
+                random.setstate(py_saved)
+
+
+def _setup(algorithm, problem, termination, seed):
+    algorithm.setup(problem, termination=termination, seed=seed, verbose=False)
+    return _RunState()
+
+
+def _update(algorithm):
+    opt = algorithm.opt
+    has_opt = opt is not None and len(opt) > 0
+    # n_iter already points at the next generation after tell()
+    return dict(n_gen=int(algorithm.n_iter - 1),
+                n_eval=int(algorithm.evaluator.n_eval),
+                progress=float(min(getattr(algorithm.termination, "perc", 0.0), 1.0)),
+                X=opt.get("X") if has_opt else None,
+                F=opt.get("F") if has_opt else None)
+
+
+async def _evaluate_pending(loop, executor, problem, algorithm, infills, chunk_size):
+    """
+    Evaluate the not yet evaluated individuals of infills on executor and
+    store the values through the algorithm's evaluator (eval counts as usual).
+    """
+    if isinstance(infills, Individual):
+        infills = Population.create(infills)   # loop-wise algorithms ask for single offspring
+    evaluator = algorithm.evaluator
+    values_of = evaluator.evaluate_values_of
+    I = [i for i, ind in enumerate(infills) if not all(key in ind.evaluated for key in values_of)]
+    if not I:
+        return
+    X = infills[I].get("X")
+    step = chunk_size or len(X)
+    futures = [loop.run_in_executor(executor, _evaluate, problem, X[start:start + step], values_of)
+               for start in range(0, len(X), step)]
+    try:
+        parts = await asyncio.gather(*futures)
+    finally:
+        for future in futures:
+            future.cancel()   # no-op for finished ones; drops queued chunks on cancellation
+    out = {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+    evaluator.eval(_Precomputed(problem, out), infills[I], skip_already_evaluated=False, algorithm=algorithm)
+
+
+async def optimize_async(problem, algorithm, termination, seed=1, finalize=None, executor=None, chunk_size=None):
+    """
+    Run algorithm on problem as an async iterator of per-generation updates.
+
+    Parameters:
+      - problem, algorithm, termination : as for pymoo.optimize.minimize (the
+        algorithm is copied, the problem must be picklable)
+      - seed       : random seed (same results as minimize(..., seed=seed))
+      - finalize   : optional finalize(res) post-processing the pymoo Result
+      - executor   : concurrent.futures executor for the evaluations
+                     (default: shared_executor())
+      - chunk_size : split each population into chunks of this many rows,
+                     evaluated in parallel (default: one task per generation)
+
+    Yields:
+      dict(n_gen, n_eval, progress, X, F) with the current optimum after every
+      generation; the last one also has the final Result under "result".
+    """
+    loop = asyncio.get_running_loop()
+    executor = executor if executor is not None else shared_executor()
+    algorithm = copy.deepcopy(algorithm)
+    rng = _RunState().call(_setup, algorithm, problem, copy.deepcopy(termination), seed)
+    n_gen = algorithm.n_iter
+
+    while algorithm.has_next():
+        infills = await asyncio.to_thread(rng.call, algorithm.ask)
+        if infills is not None:
+            await _evaluate_pending(loop, executor, problem, algorithm, infills, chunk_size)
+            await asyncio.to_thread(rng.call, algorithm.tell, infills=infills)
+        else:
+            await asyncio.to_thread(rng.call, algorithm.tell)
+
+        # loop-wise algorithms (MOEA/D) ask for one offspring at a time; report whole generations
+        done = not algorithm.has_next()
+        if algorithm.n_iter == n_gen and not done:
+            continue
+        n_gen = algorithm.n_iter
+        update = _update(algorithm)
+        if done:
+            res = algorithm.result()
+            res.algorithm = algorithm
+            res.seed_lineage = lineage(seed)
+            update["result"] = finalize(res) if finalize is not None else res
+        yield update
@@ -0,0 +1,63 @@
+# utils/catalysts.py
+"""
+Catalyst material library.
+
+Material properties are read once from utils/data/catalysts.csv into a
+structured NumPy array (one record per material), so problems can gather the
+properties of a whole population with integer indexing.
+"""
+import csv
+import os
+from functools import lru_cache
+
+import numpy as np
+
+CATALYST_FILE = os.path.join(os.path.dirname(__file__), "data", "catalysts.csv")
+
+# Material properties as used by PEMProblem (suffixed _a / _c there)
+PROPERTY_FIELDS = ("rho_cat", "c_cat", "j0", "a", "b", "Eact")
+
+CATALYST_DTYPE = np.dtype([("name", "U32"), ("electrode", "U8")] + [(f, "f8") for f in PROPERTY_FIELDS])
+
+
+@lru_cache(maxsize=None)
+def load_catalysts(path=CATALYST_FILE):
+    """
+    All materials of the library file as a read-only structured array (CATALYST_DTYPE).
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(line for line in f if not line.startswith("#")))
+    table = np.array([tuple(row[name] for name in CATALYST_DTYPE.names) for row in rows], dtype=CATALYST_DTYPE)
+    table.setflags(write=False)
+    return table
+
+
+def catalyst_table(electrode, path=CATALYST_FILE, extra=None):
+    """
+    Materials for one electrode ("anode" or "cathode"), optionally followed by
+    extra records (e.g. a user-defined material from make_catalyst).
+    """
+    table = load_catalysts(path)
+    table = table[table["electrode"] == electrode]
+    if extra is not None:
+        table = np.concatenate([table, np.asarray(extra, dtype=CATALYST_DTYPE)])
+    return table
+
+
+def catalyst_names(electrode, path=CATALYST_FILE):
+    return [str(name) for name in catalyst_table(electrode, path)["name"]]
+
+
+def make_catalyst(name, electrode, rho_cat, c_cat, j0, a, b, Eact=76000.0):
+    """
+    A one-record table for a material that is not in the library.
+    """
+    return np.array([(name, electrode, rho_cat, c_cat, j0, a, b, Eact)], dtype=CATALYST_DTYPE)
+
+
+def electrode_params(record, suffix):
+    """
+    PEMProblem keyword arguments for one material record, e.g. suffix "a" ->
+    {"rho_cat_a": ..., "c_cat_a": ..., "j0_a": ..., "a_a": ..., "b_a": ..., "Eact_a": ...}
+    """
+    return {f"{field}_{suffix}": float(record[field]) for field in PROPERTY_FIELDS}
@@ -0,0 +1,145 @@
+# utils/checkpoint.py
+"""
+Checkpoints of running optimizations.
+
+A checkpoint holds the whole pymoo algorithm (population, archive / current
+optimum, termination, generation counter) plus the state of the global
+numpy and random generators pymoo draws from, pickled and zlib-compressed
+into one file:
+
+    b"H2CK" | format version (1 byte) | zlib(pickle(state))
+
+Files are written to a temporary name, fsynced and renamed over the target,
+so a crash during a write leaves the previous checkpoint intact.
+
+  - Checkpointer    : generation callback writing a checkpoint at most every
+                      `interval` s (and when a run is cancelled), chaining
+                      another callback
+  - save_checkpoint / load_checkpoint
+  - resume_run      : continue a checkpointed run to its termination;
+                      resumed runs are bit-identical to uninterrupted ones
+
+Both run_optimization functions take checkpoint=path and resume_from=path.
+"""
+import os
+import pickle
+import random
+import time
+import zlib
+
+import numpy as np
+from pymoo.core.callback import Callback
+
+MAGIC = b"H2CK"
+FORMAT_VERSION = 1
+CHECKPOINT_INTERVAL = 30.0
+
+
+def atomic_write(data, path):
+    """
+    Write bytes to path via a temporary file and an atomic rename.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def save_checkpoint(algorithm, path, meta=None):
+    """
+    Write the algorithm and the global RNG states to path; returns the file size.
+    meta is a dict stored alongside (e.g. the method, to finalize on resume).
+    Meant to be called from a generation callback (see Checkpointer).
+    """
+    callback = algorithm.callback
+    algorithm.callback = None   # the caller's callbacks (job reporter, ...) are reattached on resume
+    # called from a generation callback, before pymoo counts the finished generation
+    algorithm.n_iter += 1
+    try:
+        state = dict(algorithm=algorithm, n_gen=int(algorithm.n_iter - 1), time=time.time(),
+                     np_random=np.random.get_state(), py_random=random.getstate(), meta=meta or {})
+        data = MAGIC + bytes([FORMAT_VERSION]) + zlib.compress(pickle.dumps(state, pickle.HIGHEST_PROTOCOL), 1)
+    finally:
+        algorithm.n_iter -= 1
+        algorithm.callback = callback
+    atomic_write(data, path)
+    return len(data)
+
+
+def load_checkpoint(path):
+    """
+    The state dict of a checkpoint file: algorithm, n_gen, time, np_random,
+    py_random, meta.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:4] != MAGIC:
+        raise ValueError(f"{path} is not an optimization checkpoint")
+    if data[4] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported checkpoint format {data[4]} in {path}")
+    return pickle.loads(zlib.decompress(data[5:]))
+
+
+class Checkpointer:
+    """
+    Generation callback that checkpoints the algorithm.
+
+    Parameters:
+      - path     : checkpoint file (overwritten each time)
+      - interval : minimum time (s) between checkpoints; the cost of a
+                   checkpoint is spread over that much run time
+      - meta     : dict stored with every checkpoint
+      - callback : callback(algorithm) called first (e.g. a job reporter)
+
+    A run stopped by its termination being forced (cancelled job) is
+    checkpointed right away, so it can be resumed. n_saved and save_time
+    count the writes.
+    """
+    def __init__(self, path, interval=CHECKPOINT_INTERVAL, meta=None, callback=None):
+        self.path = path
+        self.interval = interval
+        self.meta = meta or {}
+        self.callback = callback
+        self.n_saved = 0
+        self.save_time = 0.0
+        self._last = time.perf_counter()
+
+    def __call__(self, algorithm):
+        if self.callback is not None:
+            self.callback(algorithm)
+        now = time.perf_counter()
+        if now - self._last < self.interval and not algorithm.termination.force_termination:
+            return
+        save_checkpoint(algorithm, self.path, self.meta)
+        self._last = time.perf_counter()
+        self.n_saved += 1
+        self.save_time += self._last - now
+
+
+def resume_run(checkpoint, callback=None):
+    """
+    Continue the run of a checkpoint (path or load_checkpoint() state) until
+    its termination criterion is met.
+
+    The RNG states are restored and a forced stop (cancellation) is lifted.
+    callback(algorithm) replaces the callback of the interrupted run.
+
+    Returns:
+      (pymoo Result, meta dict of the checkpoint)
+    """
+    state = load_checkpoint(checkpoint) if isinstance(checkpoint, (str, os.PathLike)) else checkpoint
+    algorithm = state["algorithm"]
+    np.random.set_state(state["np_random"])
+    random.setstate(state["py_random"])
+    algorithm.callback = callback if callback is not None else Callback()
+    termination = algorithm.termination
+    if termination.force_termination:
+        termination.force_termination = False
+        termination.update(algorithm)
+    res = algorithm.run()
+    res.algorithm = algorithm
+    return res, state["meta"]
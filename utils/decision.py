@@ -0,0 +1,128 @@
+# utils/decision.py
+"""
+Decision support on a Pareto front F (n, m), all objectives minimized
+(negate maximized objectives first, as the problems already do).
+
+  - knee_point            : design with the largest bulge towards the ideal point
+  - topsis                : closeness to the ideal vs. the anti-ideal design
+  - compromise_programming: weighted L_p distance to the ideal point
+  - rank_designs          : indices of the n best designs for one of the above
+
+Objectives are normalized per column before they are compared, so $ and V (or
+any other units) can be mixed. Everything is vectorized over the rows of F,
+so fronts of 1e5+ designs are ranked in milliseconds.
+"""
+import numpy as np
+
+DECISION_METHODS = ("knee", "topsis", "compromise")
+
+
+def _weights(weights, m):
+    """
+    Objective weights normalized to sum 1 (equal weights if None).
+    """
+    if weights is None:
+        return np.full(m, 1.0 / m)
+    w = np.asarray(weights, dtype=float)
+    if w.shape != (m,) or np.any(w < 0) or w.sum() <= 0:
+        raise ValueError(f"Expected {m} non-negative weights with a positive sum, got {weights}")
+    return w / w.sum()
+
+
+def normalize_front(F):
+    """
+    Scale every objective of F to [0, 1] between its best (ideal) and worst
+    (nadir) value on the front; constant objectives map to 0.
+    """
+    F = np.asarray(F, dtype=float)
+    ideal = F.min(axis=0)
+    span = F.max(axis=0) - ideal
+    return (F - ideal) / np.where(span > 0, span, 1.0)
+
+
+def knee_point(F, return_scores=False):
+    """
+    Index of the knee of the front.
+
+    In normalized objectives a hyperplane is laid through the extreme designs
+    (the best design of each objective); the knee is the design farthest below
+    it, i.e. the one where improving any objective costs the most in the
+    others. If the extremes do not span a hyperplane (e.g. duplicated
+    extremes), the plane sum(f) = 1 is used instead.
+
+    Returns:
+      index, or (index, scores) with the signed distance of every design below
+      the hyperplane (larger is more knee-like)
+    """
+    Fn = normalize_front(F)
+    m = Fn.shape[1]
+    E = Fn[np.argmin(Fn, axis=0)]
+    try:
+        w = np.linalg.solve(E, np.ones(m))
+        if not np.all(np.isfinite(w)) or np.any(w <= 0):
+            raise np.linalg.LinAlgError
+    except np.linalg.LinAlgError:
+        w = np.ones(m)
+    scores = (1.0 - Fn @ w) / np.linalg.norm(w)
+    idx = int(np.argmax(scores))
+    return (idx, scores) if return_scores else idx
+
+
+def topsis(F, weights=None, return_scores=False):
+    """
+    Index of the best design by TOPSIS.
+
+    Columns are vector-normalized and weighted; the closeness of a design is
+    d_worst / (d_best + d_worst), with d_best and d_worst its Euclidean
+    distances to the ideal (column minima) and anti-ideal (column maxima) points.
+
+    Returns:
+      index, or (index, closeness in [0, 1], larger is better)
+    """
+    F = np.asarray(F, dtype=float)
+    norm = np.linalg.norm(F, axis=0)
+    V = F / np.where(norm > 0, norm, 1.0) * _weights(weights, F.shape[1])
+    d_best = np.linalg.norm(V - V.min(axis=0), axis=1)
+    d_worst = np.linalg.norm(V - V.max(axis=0), axis=1)
+    total = d_best + d_worst
+    scores = np.divide(d_worst, total, out=np.ones_like(total), where=total > 0)
+    idx = int(np.argmax(scores))
+    return (idx, scores) if return_scores else idx
+
+
+def compromise_programming(F, weights=None, p=2, return_scores=False):
+    """
+    Index of the design closest to the ideal point in the weighted L_p metric
+    on normalized objectives (p=1: weighted sum, p=2: Euclidean,
+    p=np.inf: Chebyshev / min-max).
+
+    Returns:
+      index, or (index, distances, smaller is better)
+    """
+    Fn = normalize_front(F)
+    D = Fn * _weights(weights, Fn.shape[1])
+    if np.isinf(p):
+        scores = D.max(axis=1)
+    else:
+        scores = np.sum(D ** p, axis=1) ** (1.0 / p)
+    idx = int(np.argmin(scores))
+    return (idx, scores) if return_scores else idx
+
+
+def rank_designs(F, method="knee", weights=None, p=2, n=3):
+    """
+    Indices of the n best designs of F for a decision method (see DECISION_METHODS),
+    best first. The knee method ignores weights.
+    """
+    if method == "knee":
+        _, scores = knee_point(F, return_scores=True)
+        order = np.argsort(-scores, kind="stable")
+    elif method == "topsis":
+        _, scores = topsis(F, weights, return_scores=True)
+        order = np.argsort(-scores, kind="stable")
+    elif method == "compromise":
+        _, scores = compromise_programming(F, weights, p, return_scores=True)
+        order = np.argsort(scores, kind="stable")
+    else:
+        raise ValueError(f"Unknown decision method: {method}")
+    return order[:n]
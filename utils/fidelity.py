@@ -0,0 +1,263 @@
+# utils/fidelity.py
+"""
+Multi-fidelity evaluation: a cheap screening model in front of the full model.
+
+Every population is first evaluated with a fast approximation; only the most
+promising part of it (feasible first, then by non-dominated rank under the
+fast objectives) is promoted to the full model. The other designs keep their
+screening values. At the end the returned front is re-evaluated with the
+full model, so the reported X/F/G are always full-fidelity.
+
+Fast models (regular-grid tables interpolated by membrane.BilinearTable, the
+interpolator behind the conductivity table):
+
+  - CatalystScreening  : PEMProblem. eta_total of each electrode depends on the
+                         design only through g = S_cat (1 - eps)^2 delta
+                         (exchange current) and h = eps / delta (limiting
+                         current), so it is tabulated once over (g, h) from
+                         eta_total_array; cost and constraints are exact
+  - MembraneScreening  : MembraneOptimizationProblem. The four objectives
+                         tabulated over the (t, j) box; constraints exact
+
+MultiFidelityProblem(full, fast, promote=0.25, schedule="constant", n_gen=None)
+wraps them; schedule is "constant" (promote share of every population),
+"linear" (rising from promote to 1 over n_gen generations) or a callable
+progress -> share. stats() reports evaluation counts, the time per
+evaluation of both models and the screening error measured on every promoted
+design.
+
+Both run_optimization functions take fidelity=True or
+fidelity=dict(promote=..., schedule=..., n_grid=...) for NSGA2 / SPEA2 and
+return the statistics as res.fidelity.
+"""
+import time
+
+import numpy as np
+from pymoo.core.problem import Problem
+
+from utils.membrane import BilinearTable
+from utils.models import eta_total_array
+from utils.pareto import nondominated_ranks, pareto_mask
+
+N_GRID = 257
+PROMOTE = 0.25
+SCHEDULES = ("constant", "linear")
+
+
+class CatalystScreening:
+    """
+    Fast (F, G) of a PEMProblem for a population X (n, 6): exact cost and
+    constraints, overpotential from one (log g, ln(h/h* - 1)) table per
+    electrode spanning the problem bounds (n_grid x n_grid nodes).
+    """
+    def __init__(self, problem, n_grid=N_GRID):
+        self.problem = problem
+        p = problem
+        common = dict(alpha=p.alpha, R=p.R, n=p.n, F=p.F, T_ref=p.T_ref)
+        self.tables, self.h_star = [], []
+        for e, cols in (("a", (0, 1, 2)), ("c", (3, 4, 5))):
+            (d_lo, e_lo, s_lo), (d_hi, e_hi, s_hi) = np.asarray(p.xl)[list(cols)], np.asarray(p.xu)[list(cols)]
+            log_g = np.linspace(np.log(s_lo * d_lo * (1 - e_hi) ** 2), np.log(s_hi * d_hi * (1 - e_lo) ** 2), n_grid)
+            # the limiting current reaches j at h* = j / (n F D/tau C_bulk); eta_conc = RT/nF ln(1 - h*/h)
+            # is smooth in v = ln(h/h* - 1), so the second axis is v (designs below h* violate the
+            # exact j_lim constraint and are clipped to the first node)
+            h_star = p.j / (p.n * p.F * getattr(p, f"D_{e}") / getattr(p, f"tau_{e}") * getattr(p, f"C_bulk_{e}"))
+            v = np.linspace(np.log(max(e_lo / d_hi / h_star - 1, 1e-9)), np.log(max(e_hi / d_lo / h_star - 1, 2e-9)),
+                            n_grid)
+            # any (eps, delta, S_cat) with the grid's g and h gives the same eta; take eps = 0.5
+            eps = 0.5
+            delta = eps / (h_star * (1 + np.exp(v)))[None, :]
+            S_cat = np.exp(log_g)[:, None] / ((1 - eps) ** 2 * delta)
+            eta = eta_total_array(p.j, getattr(p, f"j0_{e}"), S_cat, eps, delta, p.T, getattr(p, f"rho_cat_{e}"),
+                                  getattr(p, f"C_bulk_{e}"), getattr(p, f"D_{e}"), getattr(p, f"tau_{e}"),
+                                  Eact=getattr(p, f"Eact_{e}"), **common)
+            self.h_star.append(h_star)
+            self.tables.append(BilinearTable(log_g, v, eta))
+
+    def eta_array(self, X):
+        eta = 0.0
+        for table, h_star, (d, e, s) in zip(self.tables, self.h_star, ((0, 1, 2), (3, 4, 5))):
+            delta, eps, S_cat = X[:, d], X[:, e], X[:, s]
+            g = np.maximum(S_cat * (1 - eps) ** 2 * delta, 1e-300)
+            v = np.log(np.maximum(eps / delta / h_star - 1, 1e-300))
+            eta = eta + table(np.log(g), v)[:, 0]
+        return eta
+
+    def __call__(self, X):
+        p = self.problem
+        X = np.asarray(X, dtype=float)
+        eta = self.eta_array(X)
+        n = len(X)
+        G = np.column_stack([
+            p.design_constraints(X),
+            np.full(n, p.j_min - p.j),
+            np.full(n, p.j - p.j_max),
+            eta - p.eta_max,
+            p.j - p.limiting_current(X),
+        ])
+        if p.short_circuit:
+            # same outputs as PEMProblem for designs infeasible before eta is known
+            skip = np.max(np.delete(G, 20, axis=1), axis=1) > 0
+            eta[skip], G[skip, 20] = p.ETA_PENALTY, 0.0
+        return np.column_stack([p.cost_array(X), eta]), G
+
+
+class MembraneScreening:
+    """
+    Fast (F, G) of a MembraneOptimizationProblem for a population X (n, 2): the
+    four objectives from an n_grid x n_grid (t, j) table over the problem
+    bounds, exact constraints.
+    """
+    def __init__(self, problem, n_grid=N_GRID):
+        self.problem = problem
+        t = np.linspace(problem.xl[0], problem.xu[0], n_grid)
+        j = np.linspace(problem.xl[1], problem.xu[1], n_grid)
+        T, J = np.meshgrid(t, j, indexing="ij")
+        F = problem.model.evaluate_objectives(np.array([T, J]))   # (4, n_grid, n_grid)
+        self.table = BilinearTable(t, j, np.moveaxis(F, 0, -1))
+
+    def __call__(self, X):
+        X = np.asarray(X, dtype=float)
+        return self.table(X[:, 0], X[:, 1]), self.problem.constraints(X)
+
+
+class MultiFidelityProblem(Problem):
+    """
+    Vectorized problem screening every population with fast(X) -> (F, G) and
+    evaluating the promoted share of it with `full`.
+
+    Parameters:
+      - full     : full-fidelity pymoo problem
+      - fast     : screening model, fast(X) -> (F, G) with the shapes of full
+      - promote  : share of each population evaluated with the full model
+      - schedule : "constant", "linear" (promote -> 1 over n_gen populations)
+                   or a callable progress (0..1) -> share
+      - n_gen    : generations of the run (progress of the schedule); one
+                   population is evaluated per generation (NSGA2, SPEA2)
+    """
+    def __init__(self, full, fast, promote=PROMOTE, schedule="constant", n_gen=None):
+        if not callable(schedule) and schedule not in SCHEDULES:
+            raise ValueError(f"Unknown promotion schedule: {schedule} (use {', '.join(SCHEDULES)} or a callable)")
+        if not 0.0 <= promote <= 1.0:
+            raise ValueError(f"promote must be a share between 0 and 1, got {promote}")
+        super().__init__(n_var=full.n_var, n_obj=full.n_obj, n_ieq_constr=full.n_ieq_constr,
+                         xl=full.xl, xu=full.xu)
+        self.full = full
+        self.fast = fast
+        self.promote = promote
+        self.schedule = schedule
+        self.n_gen = n_gen
+        self.n_batches = 0
+        self.n_fast = self.n_full = 0
+        self.fast_time = self.full_time = 0.0
+        self._abs_error = np.zeros(full.n_obj)
+        self._max_error = np.zeros(full.n_obj)
+        self._n_compared = self._n_promoted = 0
+        self._feasibility_agree = 0
+
+    @property
+    def base(self):
+        return self.full
+
+    def share(self):
+        """
+        Share of the next population promoted to the full model.
+        """
+        progress = min(self.n_batches / self.n_gen, 1.0) if self.n_gen else 0.0
+        if callable(self.schedule):
+            return float(np.clip(self.schedule(progress), 0.0, 1.0))
+        if self.schedule == "linear":
+            return self.promote + (1.0 - self.promote) * progress
+        return self.promote
+
+    def evaluate_full(self, X):
+        """
+        Full-fidelity F and G of X (counted in the statistics).
+        """
+        t0 = time.perf_counter()
+        out = self.full.evaluate(X, return_values_of=["F", "G"], return_as_dictionary=True)
+        self.full_time += time.perf_counter() - t0
+        self.n_full += len(X)
+        return (np.reshape(out["F"], (len(X), self.n_obj)),
+                np.reshape(out["G"], (len(X), self.n_ieq_constr)))
+
+    def _evaluate(self, X, out, *args, **kwargs):
+        X = np.atleast_2d(X)
+        n = len(X)
+        t0 = time.perf_counter()
+        F, G = self.fast(X)
+        F, G = np.array(F, dtype=float), np.array(G, dtype=float)
+        self.fast_time += time.perf_counter() - t0
+        self.n_fast += n
+
+        k = min(n, max(1, int(np.ceil(self.share() * n))))
+        # promising first: feasible designs by non-dominated rank, then by violation
+        cv = np.sum(np.maximum(G, 0.0), axis=1)
+        rank = np.zeros(n, dtype=int)
+        feasible = cv <= 0
+        if np.any(feasible):
+            rank[feasible] = nondominated_ranks(F[feasible])
+        promoted = np.lexsort((rank, cv))[:k]
+
+        F_full, G_full = self.evaluate_full(X[promoted])
+        feasible_full = np.all(G_full <= 0, axis=1)
+        self._feasibility_agree += int(np.sum(feasible[promoted] == feasible_full))
+        self._n_promoted += k
+        # objective error on designs both models call feasible (penalty values are no error measure)
+        both = feasible_full & feasible[promoted]
+        if np.any(both):
+            error = np.abs(F_full[both] - F[promoted][both])
+            self._abs_error += error.sum(axis=0)
+            self._max_error = np.maximum(self._max_error, error.max(axis=0))
+            self._n_compared += len(error)
+        F[promoted], G[promoted] = F_full, G_full
+        self.n_batches += 1
+        out["F"] = F
+        out["G"] = G
+
+    def stats(self):
+        """
+        Evaluation counts and times of both models, the speedup of one
+        screening evaluation over a full one, and the screening error on the
+        promoted designs: mean / max absolute error per objective (designs
+        feasible under both models) and the share of designs whose feasibility
+        the screening predicted right.
+        """
+        fast_per_eval = self.fast_time / self.n_fast if self.n_fast else 0.0
+        full_per_eval = self.full_time / self.n_full if self.n_full else 0.0
+        n, n_promoted = self._n_compared, self._n_promoted
+        return dict(n_fast=self.n_fast, n_full=self.n_full, fast_time=self.fast_time, full_time=self.full_time,
+                    fast_per_eval=fast_per_eval, full_per_eval=full_per_eval,
+                    speedup=full_per_eval / fast_per_eval if fast_per_eval else 0.0,
+                    mean_abs_error=(self._abs_error / n).tolist() if n else None,
+                    max_abs_error=self._max_error.tolist() if n else None,
+                    feasibility_agreement=self._feasibility_agree / n_promoted if n_promoted else None)
+
+
+def fidelity_problem(full, fast_model, fidelity, n_gen=None):
+    """
+    MultiFidelityProblem for a run_optimization `fidelity` argument (True or a
+    dict with promote, schedule and n_grid); fast_model(n_grid) builds the
+    screening model.
+    """
+    options = dict(fidelity) if isinstance(fidelity, dict) else {}
+    fast = fast_model(options.pop("n_grid", N_GRID))
+    return MultiFidelityProblem(full, fast, n_gen=n_gen, **options)
+
+
+def full_fidelity_front(res, problem):
+    """
+    Re-evaluate the final designs of a multi-fidelity run with the full model
+    and keep the feasible non-dominated ones (X/F/G are None if there are none).
+    """
+    if res.X is not None:
+        X = np.atleast_2d(res.X)
+        F, G = problem.evaluate_full(X)
+        feasible = np.all(G <= 0, axis=1)
+        if np.any(feasible):
+            X, F, G = X[feasible], F[feasible], G[feasible]
+            front = pareto_mask(F)
+            res.X, res.F, res.G = X[front], F[front], G[front]
+        else:
+            res.X, res.F, res.G = None, None, None
+    return res
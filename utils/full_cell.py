@@ -0,0 +1,254 @@
+# utils/full_cell.py
+"""
+Coupled full-cell (catalyst layers + membrane) optimization.
+
+FullCellProblem joins the catalyst problem (PEMProblem, 6 variables) and the
+membrane model (thickness t) with a shared operating current density j into
+one vectorized 8-variable problem. coevolve() splits the search into the two
+sub-problems (catalyst + j, membrane + j) around collaborator designs taken
+from a shared archive and evolves them in parallel worker processes.
+"""
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from pymoo.algorithms.moo.nsga2 import NSGA2
+from pymoo.core.problem import Problem
+from pymoo.core.result import Result
+from pymoo.optimize import minimize
+from pymoo.termination import get_termination
+from pymoo.util.nds.non_dominated_sorting import NonDominatedSorting
+
+from utils.membrane import MembraneModel
+from utils.optimization import PEMProblem
+from utils.seeds import child_seed, lineage
+
+CATALYST_IDX = [0, 1, 2, 3, 4, 5]
+T_IDX = 6
+J_IDX = 7
+
+
+class FullCellProblem(Problem):
+    """
+    Decision Variables (8):
+      x = [delta_a, eps_a, S_cat_a, delta_c, eps_c, S_cat_c, t, j]
+      (catalyst layers as in PEMProblem, membrane thickness t in m, shared j in A/cm²)
+
+    Objectives:
+      F0: Cell voltage (V) = membrane model voltage V(t, j) + catalyst overpotential eta_a + eta_c
+          (with the ohmic membrane model its own activation term is left out)
+      F1: Cost per cell ($) = catalyst cost + membrane capital cost ($/m²) * A_cell
+      F2: Negative hydrogen production rate (-mol/s)
+
+    Constraints (24):
+      - the 18 anode/cathode design constraints of PEMProblem
+      - j_min <= j <= j_max, eta_a + eta_c <= eta_max, j <= j_lim   (4)
+      - t >= t_mech_min, L(t, j) >= L_min                           (2)
+
+    Parameters:
+      - catalyst : PEMProblem with the catalyst parameters and bounds (its j is not used)
+      - membrane : MembraneModel (default parameters if None)
+      - t_bounds : (t_min, t_max) in m
+      - j_bounds : (j_lb, j_ub) in A/cm², default (catalyst.j_min, catalyst.j_max)
+    """
+    def __init__(self, catalyst: PEMProblem, membrane: MembraneModel = None,
+                 t_bounds=(50e-6, 300e-6), j_bounds=None):
+        self.catalyst = catalyst
+        self.membrane = membrane if membrane is not None else MembraneModel()
+        if j_bounds is None:
+            j_bounds = (max(catalyst.j_min, 1e-3), catalyst.j_max)
+        # thicknesses below the analytic minimum of the membrane constraints are never feasible
+        t_lb = max(t_bounds[0], self.membrane.t_lower_bound(j_bounds[0]))
+        xl = np.concatenate([catalyst.xl, [t_lb, j_bounds[0]]])
+        xu = np.concatenate([catalyst.xu, [t_bounds[1], j_bounds[1]]])
+        super().__init__(n_var=8, n_obj=3, n_constr=24, xl=xl, xu=xu)
+
+    def evaluate_batch(self, X):
+        """
+        F (n, 3) and G (n, 24) for a population X (n, 8).
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        cat = self.catalyst
+        Xc = X[:, CATALYST_IDX]
+        t = X[:, T_IDX]
+        j = X[:, J_IDX]
+
+        eta = cat.eta_array(Xc, j=j[:, None])[:, 0]
+        V_cell = self.membrane.cell_voltage(t, j, activation=False) + eta
+        mem_cost = self.membrane.evaluate_objectives(np.vstack([t, j]))[2]
+        cost = cat.cost_array(Xc) + mem_cost * cat.A_cell * 1e-4   # $/m² * cm² -> $
+        r_H2 = self.membrane.h2_rate(t, j)
+
+        F = np.column_stack([V_cell, cost, -r_H2])
+        G = np.column_stack([
+            cat.design_constraints(Xc),
+            cat.j_min - j,
+            j - cat.j_max,
+            eta - cat.eta_max,
+            j - cat.limiting_current(Xc),
+            self.membrane.evaluate_constraints(np.vstack([t, j])).T,
+        ])
+        return F, G
+
+    def _evaluate(self, X, out, *args, **kwargs):
+        out["F"], out["G"] = self.evaluate_batch(X)
+
+
+class BlockProblem(Problem):
+    """
+    A block of the variables of a full problem, the others held fixed at `context`.
+    """
+    def __init__(self, full, free_idx, context):
+        self.full = full
+        self.free_idx = list(free_idx)
+        self.context = np.asarray(context, dtype=float)
+        super().__init__(n_var=len(self.free_idx), n_obj=full.n_obj, n_constr=full.n_constr,
+                         xl=full.xl[self.free_idx], xu=full.xu[self.free_idx])
+
+    def expand(self, X):
+        X_full = np.tile(self.context, (len(X), 1))
+        X_full[:, self.free_idx] = X
+        return X_full
+
+    def _evaluate(self, X, out, *args, **kwargs):
+        out["F"], out["G"] = self.full.evaluate_batch(self.expand(X))
+
+
+def _solve_block(full, free_idx, context, X0, pop_size, n_gen, seed):
+    """
+    Worker task: NSGA2 on one block; returns the final population in full coordinates.
+    """
+    block = BlockProblem(full, free_idx, context)
+    sampling = X0[:, block.free_idx] if X0 is not None and len(X0) >= pop_size else None
+    algorithm = NSGA2(pop_size=pop_size, sampling=sampling) if sampling is not None else NSGA2(pop_size=pop_size)
+    res = minimize(block, algorithm, get_termination("n_gen", n_gen), seed=seed, verbose=False)
+    X = block.expand(res.pop.get("X"))
+    F, G = full.evaluate_batch(X)
+    return X, F, G
+
+
+def _update_archive(X, F, G, archive_size):
+    """
+    Keep the feasible non-dominated designs (at most archive_size, spread along F0);
+    if nothing is feasible keep the least infeasible ones.
+    """
+    CV = np.sum(np.maximum(G, 0.0), axis=1)
+    feasible = CV <= 0
+    if not np.any(feasible):
+        keep = np.argsort(CV)[:archive_size]
+        return X[keep], F[keep], G[keep]
+    X, F, G = X[feasible], F[feasible], G[feasible]
+    front = NonDominatedSorting().do(F, only_non_dominated_front=True)
+    X, F, G = X[front], F[front], G[front]
+    if len(X) > archive_size:
+        order = np.argsort(F[:, 0])
+        keep = order[np.linspace(0, len(order) - 1, archive_size).round().astype(int)]
+        X, F, G = X[keep], F[keep], G[keep]
+    return X, F, G
+
+
+def _collaborators(F, n):
+    """
+    Indices of n archive members spread over the front: the best compromise
+    (smallest sum of normalized objectives) first, then the extremes of F0.
+    """
+    span = np.ptp(F, axis=0)
+    Fn = (F - F.min(axis=0)) / np.where(span > 0, span, 1.0)
+    picks = [int(np.argmin(Fn.sum(axis=1)))]
+    for idx in np.argsort(F[:, 0])[np.linspace(0, len(F) - 1, n).round().astype(int)]:
+        if len(picks) >= n:
+            break
+        if int(idx) not in picks:
+            picks.append(int(idx))
+    return picks
+
+
+def coevolve(problem: FullCellProblem, n_epochs=4, pop_size=40, n_gen=20, n_collaborators=2,
+             n_workers=2, archive_size=200, seed=1, time_budget=None):
+    """
+    Cooperative co-evolution of the catalyst and membrane sub-problems.
+
+    Each epoch picks n_collaborators designs from the archive. For each of them
+    two NSGA2 runs are scheduled on a process pool: the catalyst block
+    (6 catalyst variables + j, membrane t fixed) and the membrane block (t + j,
+    catalyst fixed). All final populations are merged into the archive of
+    feasible non-dominated full designs, which also seeds the next epoch. Each
+    task runs on the seed stream child_seed(seed, epoch, collaborator, block)
+    and tasks are merged in submission order, so the result does not depend
+    on n_workers or worker timing.
+
+    Parameters:
+      - n_workers   : worker processes (1 = run in this process)
+      - time_budget : optional wall-clock limit (s); no new epoch is started after it
+
+    Returns:
+      pymoo Result with X, F, G of the archive, plus res.epochs (per-epoch
+      archive size, wall time and task seeds) and res.seed_lineage.
+    """
+    t_start = time.time()
+    rng = np.random.default_rng(seed)
+    X = rng.uniform(problem.xl, problem.xu, size=(archive_size, problem.n_var))
+    F, G = problem.evaluate_batch(X)
+    X, F, G = _update_archive(X, F, G, archive_size)
+
+    epochs = []
+    pool = ProcessPoolExecutor(max_workers=n_workers) if n_workers > 1 else None
+    try:
+        for epoch in range(n_epochs):
+            if time_budget is not None and time.time() - t_start > time_budget:
+                break
+            t_epoch = time.time()
+            # seed each block run with the archive, topped up with random designs
+            X0 = np.vstack([X, rng.uniform(problem.xl, problem.xu, size=(pop_size, problem.n_var))])[:pop_size]
+            tasks, task_seeds = [], []
+            for k, idx in enumerate(_collaborators(F, n_collaborators)):
+                for b, free_idx in enumerate((CATALYST_IDX + [J_IDX], [T_IDX, J_IDX])):
+                    # own seed stream per (epoch, collaborator, block), independent of n_workers
+                    task_seed = child_seed(seed, epoch, k, b)
+                    task_seeds.append(task_seed)
+                    args = (problem, free_idx, X[idx], X0, pop_size, n_gen, task_seed)
+                    tasks.append(pool.submit(_solve_block, *args) if pool is not None else _solve_block(*args))
+            parts = [task.result() if pool is not None else task for task in tasks]
+            X = np.vstack([X] + [p[0] for p in parts])
+            F = np.vstack([F] + [p[1] for p in parts])
+            G = np.vstack([G] + [p[2] for p in parts])
+            X, F, G = _update_archive(X, F, G, archive_size)
+            epochs.append(dict(epoch=epoch + 1, archive=len(X), time=time.time() - t_epoch, seeds=task_seeds))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    res = Result()
+    feasible = np.all(G <= 0, axis=1)
+    if np.any(feasible):
+        res.X, res.F, res.G = X[feasible], F[feasible], G[feasible]
+    res.problem = problem
+    res.epochs = epochs
+    res.seed_lineage = lineage(seed, tasks=[e["seeds"] for e in epochs])
+    res.start_time, res.end_time = t_start, time.time()
+    res.exec_time = res.end_time - t_start
+    return res
+
+
+def run_full_cell_optimization(catalyst_params, membrane_params=None, t_bounds=(50e-6, 300e-6),
+                               j_bounds=None, method="coevolution", pop_size=40, n_gen=20,
+                               n_epochs=4, n_workers=2, seed=1, time_budget=None):
+    """
+    Build a FullCellProblem from PEMProblem keyword arguments (catalyst_params)
+    and MembraneModel keyword arguments (membrane_params) and optimize it.
+
+    method: "coevolution" (see coevolve) or "NSGA2" (joint search over all 8 variables,
+            n_gen generations in one process).
+    """
+    problem = FullCellProblem(PEMProblem(**catalyst_params),
+                              MembraneModel(**(membrane_params or {})),
+                              t_bounds=t_bounds, j_bounds=j_bounds)
+    if method == "coevolution":
+        return coevolve(problem, n_epochs=n_epochs, pop_size=pop_size, n_gen=n_gen,
+                        n_workers=n_workers, seed=seed, time_budget=time_budget)
+    elif method == "NSGA2":
+        res = minimize(problem, NSGA2(pop_size=pop_size), get_termination("n_gen", n_gen), seed=seed, verbose=False)
+        res.seed_lineage = lineage(seed)
+        return res
+    else:
+        raise ValueError(f"Unknown full-cell method: {method}")
@@ -0,0 +1,146 @@
+# utils/islands.py
+"""
+Island-model NSGA2 across processes.
+
+The population is split into n_islands sub-populations, each evolved by its
+own NSGA2 in a separate process. Every migration_interval generations each
+island sends copies of its n_migrants best individuals to the next island of
+a ring and merges the migrants it receives through NSGA2's survival (the
+worst individuals drop out). Migration is synchronous, so a run is
+reproducible for a given seed. At the end the final populations are merged
+and the feasible non-dominated designs are returned.
+
+Islands talk through multiprocessing queues (pipes with a feeder thread, so
+sending never blocks); one process per island runs for the whole search, so
+n_islands should not exceed the number of cores. Island k runs on the seed
+stream child_seed(seed, k) (utils/seeds.py).
+"""
+import queue
+import time
+import traceback
+
+import numpy as np
+from pymoo.algorithms.moo.nsga2 import NSGA2
+from pymoo.core.population import Population
+from pymoo.core.result import Result
+from pymoo.termination import get_termination
+
+from utils.async_optimization import spawn_context
+from utils.pareto import pareto_mask
+from utils.seeds import child_seeds, lineage
+
+MIN_ISLAND_SIZE = 4
+
+
+def _island(k, problem, algorithm_kwargs, pop_size, n_gen, seed, migration_interval, n_migrants,
+            inbox, outbox, results):
+    """
+    Worker process of island k: NSGA2 with migration; puts ("done", k, X, F, G,
+    n_eval, seconds) or ("error", k, message) on results.
+    """
+    try:
+        t0 = time.perf_counter()
+        algorithm = NSGA2(pop_size=pop_size, **algorithm_kwargs)
+        algorithm.setup(problem, termination=get_termination("n_gen", n_gen), seed=seed, verbose=False)
+        while algorithm.has_next():
+            algorithm.next()
+            gen = algorithm.n_iter - 1
+            if outbox is not None and gen % migration_interval == 0 and gen < n_gen:
+                # survival leaves the population sorted best first (rank, then crowding);
+                # the queue sends pickled copies
+                outbox.put(algorithm.pop[:n_migrants])
+                migrants = inbox.get()
+                merged = Population.merge(algorithm.pop, migrants)
+                algorithm.pop = algorithm.survival.do(problem, merged, n_survive=len(algorithm.pop),
+                                                      algorithm=algorithm)
+        pop = algorithm.pop
+        results.put(("done", k, pop.get("X"), pop.get("F"), pop.get("G"), algorithm.evaluator.n_eval,
+                     time.perf_counter() - t0))
+    except Exception:
+        results.put(("error", k, traceback.format_exc(limit=5)))
+
+
+def island_nsga2(problem, n_islands=4, pop_size=40, n_gen=30, migration_interval=5, n_migrants=2,
+                 seed=1, algorithm_kwargs=None, timeout=None):
+    """
+    Island-model NSGA2 on a (picklable) pymoo problem.
+
+    Parameters:
+      - n_islands          : number of islands (= worker processes)
+      - pop_size           : total population, split evenly over the islands
+                             (at least max(2 * n_migrants, MIN_ISLAND_SIZE) each)
+      - n_gen              : generations of every island
+      - migration_interval : generations between migrations
+      - n_migrants         : individuals sent to the next island per migration
+      - seed               : root seed; island k runs on child_seed(seed, k)
+      - algorithm_kwargs   : extra NSGA2 arguments (e.g. repair_kwargs(problem))
+      - timeout            : optional wall-clock limit (s) for the whole run
+
+    Returns:
+      pymoo Result with X, F, G of the merged feasible front (None if nothing
+      is feasible), plus res.islands (per-island seed, n_eval and time) and
+      res.seed_lineage.
+    """
+    if n_islands < 1:
+        raise ValueError(f"n_islands must be at least 1, got {n_islands}")
+    island_size = pop_size // n_islands
+    min_size = max(2 * n_migrants, MIN_ISLAND_SIZE)
+    if island_size < min_size:
+        raise ValueError(f"pop_size {pop_size} gives {island_size} individuals per island; "
+                         f"{n_islands} islands need pop_size >= {min_size * n_islands}")
+    t_start = time.time()
+    ctx = spawn_context()
+    seeds = child_seeds(seed, n_islands)
+    inboxes = [ctx.Queue() for _ in range(n_islands)]
+    results = ctx.Queue()
+    procs = []
+    for k in range(n_islands):
+        migrate = n_islands > 1 and migration_interval > 0
+        args = (k, problem, algorithm_kwargs or {}, island_size, n_gen, seeds[k], migration_interval, n_migrants,
+                inboxes[k] if migrate else None, inboxes[(k + 1) % n_islands] if migrate else None, results)
+        proc = ctx.Process(target=_island, args=args, daemon=True)
+        proc.start()
+        procs.append(proc)
+
+    finished = {}
+    try:
+        while len(finished) < n_islands:
+            if timeout is not None and time.time() - t_start > timeout:
+                raise TimeoutError(f"Island run exceeded {timeout} s")
+            try:
+                msg = results.get(timeout=0.5)
+            except queue.Empty:
+                dead = [k for k, proc in enumerate(procs) if k not in finished and proc.exitcode not in (None, 0)]
+                if dead:
+                    raise RuntimeError(f"Island {dead[0]} exited with code {procs[dead[0]].exitcode}")
+                continue
+            if msg[0] == "error":
+                raise RuntimeError(f"Island {msg[1]} failed:\n{msg[2]}")
+            finished[msg[1]] = msg[2:]
+    finally:
+        for proc in procs:
+            if proc.is_alive() and len(finished) < n_islands:
+                proc.terminate()
+            proc.join()
+
+    parts = [finished[k] for k in range(n_islands)]
+    X = np.vstack([p[0] for p in parts])
+    F = np.vstack([p[1] for p in parts])
+    G = np.vstack([p[2] for p in parts])
+
+    res = Result()
+    feasible = np.all(G <= 0, axis=1)
+    if np.any(feasible):
+        X, F, G = X[feasible], F[feasible], G[feasible]
+        # migrants leave copies of the same design on several islands
+        _, first = np.unique(X, axis=0, return_index=True)
+        first.sort()
+        X, F, G = X[first], F[first], G[first]
+        front = pareto_mask(F)
+        res.X, res.F, res.G = X[front], F[front], G[front]
+    res.problem = problem
+    res.islands = [dict(island=k, seed=seeds[k], n_eval=int(p[3]), time=p[4]) for k, p in enumerate(parts)]
+    res.seed_lineage = lineage(seed, islands=seeds)
+    res.start_time, res.end_time = t_start, time.time()
+    res.exec_time = res.end_time - t_start
+    return res
@@ -0,0 +1,319 @@
+# utils/jobs.py
+"""
+Background optimization jobs.
+
+Pages submit a job (an importable function plus its keyword arguments) to a
+JobManager instead of calling run_optimization in the Streamlit script
+thread. Jobs run in a capped pool of worker processes; their status,
+progress and result location are kept in a SQLite file, so every session
+(and every Streamlit server process sharing the file) can list and poll
+them. Each worker reports after every generation through the callback hook
+of run_optimization:
+
+  - progress (fraction of the termination criterion) and generation number
+  - a partial result (current optimum X, F) at most every `partial_interval` s
+  - cancellation: a cancel request stops the algorithm at the next generation,
+    the result obtained so far is kept
+  - a checkpoint of the algorithm (utils/checkpoint.py) when submitted with
+    checkpoint=True, so a cancelled or interrupted job can be resumed as a
+    new job (JobManager.resume)
+
+Job states: queued -> running -> done | failed | cancelled.
+"""
+import importlib
+import os
+import pickle
+import sqlite3
+import time
+import traceback
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from utils.async_optimization import spawn_context
+from utils.checkpoint import atomic_write
+
+JOBS_DIR = "results_logs/jobs"
+MAX_WORKERS = 2
+ACTIVE_STATES = ("queued", "running")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT,
+    owner TEXT,
+    status TEXT,
+    progress REAL DEFAULT 0,
+    n_gen INTEGER DEFAULT 0,
+    message TEXT DEFAULT '',
+    cancel INTEGER DEFAULT 0,
+    manager_pid INTEGER,
+    submitted REAL,
+    started REAL,
+    finished REAL
+)
+"""
+
+
+class JobStore:
+    """
+    Job table in a SQLite file (one short-lived connection per call, WAL mode,
+    safe to use from the manager and all worker processes).
+    """
+    def __init__(self, path):
+        self.path = path
+        with self._connect() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute(_SCHEMA)
+
+    def _connect(self):
+        con = sqlite3.connect(self.path, timeout=30)
+        con.row_factory = sqlite3.Row
+        return con
+
+    def create(self, kind, owner=None, manager_pid=None):
+        job_id = uuid.uuid4().hex[:12]
+        with self._connect() as con:
+            con.execute("INSERT INTO jobs (id, kind, owner, status, manager_pid, submitted) VALUES (?, ?, ?, ?, ?, ?)",
+                        (job_id, kind, owner, "queued", manager_pid, time.time()))
+        return job_id
+
+    def update(self, job_id, **fields):
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as con:
+            con.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def get(self, job_id):
+        with self._connect() as con:
+            row = con.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def list(self, owner=None, limit=20):
+        query = "SELECT * FROM jobs" + (" WHERE owner = ?" if owner is not None else "") + " ORDER BY submitted DESC LIMIT ?"
+        args = (owner, limit) if owner is not None else (limit,)
+        with self._connect() as con:
+            return [dict(row) for row in con.execute(query, args)]
+
+    def cancel_requested(self, job_id):
+        with self._connect() as con:
+            row = con.execute("SELECT cancel FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row is not None and row["cancel"])
+
+
+def _atomic_pickle(obj, path):
+    atomic_write(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL), path)
+
+
+def _portable_result(res):
+    """
+    The pymoo Result without the algorithm object (large, and not needed by the
+    pages). A problem class that cannot be pickled (e.g. defined inside a
+    function) is replaced by the problem it wraps (`.base`).
+    """
+    res.algorithm = None
+    try:
+        pickle.dumps(res.problem)
+    except Exception:
+        res.problem = getattr(res.problem, "base", None)
+    return res
+
+
+class JobReporter:
+    """
+    Generation callback used inside a worker: writes progress to the store, a
+    partial result file at most every `partial_interval` s, and stops the
+    algorithm when the job has been cancelled.
+    """
+    def __init__(self, store, job_id, partial_path, partial_interval=1.0):
+        self.store = store
+        self.job_id = job_id
+        self.partial_path = partial_path
+        self.partial_interval = partial_interval
+        self._last = 0.0
+
+    def __call__(self, algorithm):
+        if algorithm.termination.force_termination:
+            return   # cancelled; keep the progress reached before the stop
+        now = time.time()
+        progress = float(min(getattr(algorithm.termination, "perc", 0.0), 1.0))
+        # the last generation is always reported
+        if now - self._last < self.partial_interval and progress < 1.0:
+            return
+        self._last = now
+        self.store.update(self.job_id, progress=progress, n_gen=int(algorithm.n_iter))
+        opt = algorithm.opt
+        if opt is not None and len(opt) > 0:
+            _atomic_pickle(dict(X=opt.get("X"), F=opt.get("F"), n_gen=int(algorithm.n_iter)), self.partial_path)
+        if self.store.cancel_requested(self.job_id):
+            algorithm.termination.terminate()
+
+
+def _run_job(db_path, jobs_dir, job_id, target, kwargs, partial_interval):
+    """
+    Worker entry point: run target(**kwargs, callback=...) and store the result.
+    """
+    store = JobStore(db_path)
+    if store.cancel_requested(job_id):
+        store.update(job_id, status="cancelled", finished=time.time())
+        return
+    store.update(job_id, status="running", started=time.time())
+    try:
+        module_name, func_name = target.split(":")
+        func = getattr(importlib.import_module(module_name), func_name)
+        reporter = JobReporter(store, job_id, os.path.join(jobs_dir, f"{job_id}.partial.pkl"), partial_interval)
+        res = func(**kwargs, callback=reporter)
+        _atomic_pickle(_portable_result(res), os.path.join(jobs_dir, f"{job_id}.pkl"))
+    except Exception as e:
+        store.update(job_id, status="failed", finished=time.time(),
+                     message=f"{type(e).__name__}: {e}\n{traceback.format_exc(limit=5)}")
+        return
+    status = "cancelled" if store.cancel_requested(job_id) else "done"
+    store.update(job_id, status=status, progress=1.0 if status == "done" else store.get(job_id)["progress"],
+                 finished=time.time())
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except (OSError, TypeError):
+        return False
+    return True
+
+
+class JobManager:
+    """
+    Capped pool of worker processes plus the job store.
+
+    Parameters:
+      - jobs_dir         : directory of jobs.sqlite and the result files
+      - max_workers      : jobs running at the same time; further jobs wait queued
+      - partial_interval : minimum time (s) between progress/partial-result writes
+
+    Create one per server process and share it between sessions and pages
+    (shared_job_manager). Jobs of a manager that is no longer running are
+    marked failed when a new manager opens the same directory.
+    """
+    def __init__(self, jobs_dir=JOBS_DIR, max_workers=MAX_WORKERS, partial_interval=1.0):
+        os.makedirs(jobs_dir, exist_ok=True)
+        self.jobs_dir = jobs_dir
+        self.db_path = os.path.join(jobs_dir, "jobs.sqlite")
+        self.store = JobStore(self.db_path)
+        self.max_workers = max_workers
+        self.partial_interval = partial_interval
+        self.pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=spawn_context())
+        self.futures = {}
+        self._mark_orphans()
+
+    def _mark_orphans(self):
+        for job in self.store.list(limit=1000):
+            if job["status"] in ACTIVE_STATES and not _pid_alive(job["manager_pid"]):
+                self.store.update(job["id"], status="failed", finished=time.time(),
+                                  message="Interrupted: the server running this job stopped")
+
+    def submit(self, target, kwargs, kind=None, owner=None, checkpoint=False):
+        """
+        Queue target(**kwargs) and return the job id. target is "module:function"
+        and must accept a `callback` keyword (both run_optimization functions do);
+        kwargs must be picklable. checkpoint=True also passes
+        checkpoint=<jobs_dir>/<id>.ckpt (both run_optimization functions accept
+        it), so the job can be resumed.
+        """
+        job_id = self.store.create(kind or target, owner, manager_pid=os.getpid())
+        if checkpoint:
+            _atomic_pickle(dict(target=target, kwargs=kwargs, kind=kind, owner=owner), self._path(job_id, "args.pkl"))
+            kwargs = dict(kwargs, checkpoint=self._path(job_id, "ckpt"))
+        self.futures[job_id] = self.pool.submit(_run_job, self.db_path, self.jobs_dir, job_id, target, kwargs,
+                                                self.partial_interval)
+        return job_id
+
+    def _path(self, job_id, suffix):
+        return os.path.join(self.jobs_dir, f"{job_id}.{suffix}")
+
+    def resume(self, job_id):
+        """
+        Continue a cancelled or interrupted checkpointed job from its last
+        checkpoint, as a new job (returned id) checkpointing to its own file.
+        """
+        args_path, checkpoint = self._path(job_id, "args.pkl"), self._path(job_id, "ckpt")
+        if not (os.path.exists(args_path) and os.path.exists(checkpoint)):
+            raise ValueError(f"Job {job_id} has no checkpoint to resume from")
+        with open(args_path, "rb") as f:
+            args = pickle.load(f)
+        kwargs = dict(args["kwargs"], resume_from=checkpoint)
+        return self.submit(args["target"], kwargs, args["kind"], args["owner"], checkpoint=True)
+
+    def status(self, job_id):
+        """
+        Job record (dict with status, progress, n_gen, message, timestamps) or None.
+        """
+        job = self.store.get(job_id)
+        future = self.futures.get(job_id)
+        if job is not None and job["status"] in ACTIVE_STATES and future is not None and future.done():
+            # the worker process died without updating the store (e.g. killed)
+            if future.exception() is not None:
+                self.store.update(job_id, status="failed", finished=time.time(), message=str(future.exception()))
+                job = self.store.get(job_id)
+        return job
+
+    def cancel(self, job_id):
+        """
+        Request cancellation: a queued job never starts, a running one stops
+        after its current generation and keeps the result found so far.
+        """
+        self.store.update(job_id, cancel=1)
+        future = self.futures.get(job_id)
+        if future is not None and future.cancel():
+            self.store.update(job_id, status="cancelled", finished=time.time())
+
+    def result(self, job_id):
+        """
+        The pymoo Result of a finished (done or cancelled) job, or None.
+        """
+        path = os.path.join(self.jobs_dir, f"{job_id}.pkl")
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    def partial(self, job_id):
+        """
+        Latest partial result of a running job: dict(X, F, n_gen), or None.
+        """
+        path = os.path.join(self.jobs_dir, f"{job_id}.partial.pkl")
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    def jobs(self, owner=None, limit=20):
+        return self.store.list(owner, limit)
+
+    def n_active(self):
+        return sum(job["status"] in ACTIVE_STATES for job in self.store.list(limit=1000)
+                   if job["manager_pid"] == os.getpid())
+
+    def shutdown(self, wait=False):
+        self.pool.shutdown(wait=wait, cancel_futures=True)
+
+
+@lru_cache(maxsize=None)
+def shared_job_manager(jobs_dir=JOBS_DIR, max_workers=MAX_WORKERS):
+    """
+    The JobManager of this process for jobs_dir, created on first use; all
+    Streamlit sessions and pages of a server share its worker cap.
+    """
+    return JobManager(jobs_dir, max_workers)
+
+
+def wait(manager, job_id, timeout=None, poll=0.2):
+    """
+    Block until the job has finished (for scripts and tests); returns its record.
+    """
+    t0 = time.time()
+    while True:
+        job = manager.status(job_id)
+        if job is None or job["status"] not in ACTIVE_STATES:
+            return job
+        if timeout is not None and time.time() - t0 > timeout:
+            return job
+        time.sleep(poll)
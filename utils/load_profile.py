@@ -0,0 +1,63 @@
+# utils/load_profile.py
+"""
+Reading load profiles (e.g. 8760 hourly values of renewable power) for
+MembraneModel.evaluate_load_profile.
+
+Values are the fraction of rated load (0-1). ``.npy`` files are memory-mapped,
+so year-long or multi-year profiles are paged in chunk by chunk as the
+evaluation walks through them; Parquet files are read column-wise through
+Arrow's memory map.
+"""
+import os
+
+import numpy as np
+
+
+def read_load_profile(path, column=None, normalize=False):
+    """
+    Load a load profile as a 1-D float array.
+
+    Parameters:
+      - path      : .npy (memory-mapped, read-only) or .parquet file
+      - column    : Parquet column to use (default: the first column)
+      - normalize : if True, divide by the maximum so the peak is 1.0
+                    (returns an in-memory copy)
+
+    Returns:
+      numpy array (np.memmap for .npy files)
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".npy":
+        load = np.load(path, mmap_mode="r")
+    elif ext in (".parquet", ".pq"):
+        import pyarrow.parquet as pq
+        schema = pq.read_schema(path)
+        column = column or schema.names[0]
+        table = pq.read_table(path, columns=[column], memory_map=True)
+        load = table.column(column).to_numpy()
+    else:
+        raise ValueError(f"Unsupported load profile format: {ext} (use .npy or .parquet)")
+
+    if load.ndim != 1:
+        raise ValueError(f"Load profile must be 1-D, got shape {load.shape}")
+    if normalize:
+        peak = float(np.max(load))
+        load = np.asarray(load, dtype=float) / (peak if peak > 0 else 1.0)
+    return load
+
+
+def write_load_profile(path, load, column="load"):
+    """
+    Store a load profile as .npy or .parquet (by extension).
+    """
+    load = np.asarray(load, dtype=float).ravel()
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".npy":
+        np.save(path, load)
+    elif ext in (".parquet", ".pq"):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        pq.write_table(pa.table({column: load}), path)
+    else:
+        raise ValueError(f"Unsupported load profile format: {ext} (use .npy or .parquet)")
+    return path
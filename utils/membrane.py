@@ -1,6 +1,109 @@
 # membrane.py
+from functools import lru_cache
+
 import numpy as np
 
+R_GAS = 8.314      # J/(mol·K)
+FARADAY = 96485.0  # C/mol
+# floor of the Springer conductivity (S/cm): the correlation turns negative
+# below λ ≈ 0.63, where a dry membrane still conducts a little
+SIGMA_MIN = 1e-6
+
+
+def springer_conductivity(T, lam):
+    """
+    Membrane conductivity (S/cm) from the Springer et al. (1991) correlation:
+
+        sigma = (0.005139*λ - 0.00326) * exp(1268 * (1/303 - 1/T))
+
+    floored at SIGMA_MIN, so ohmic losses stay finite for a dry membrane.
+    T: temperature (K), lam: water content λ (mol H2O per mol SO3⁻); arrays broadcast.
+    """
+    T = np.asarray(T, dtype=float)
+    lam = np.asarray(lam, dtype=float)
+    return np.maximum((0.005139 * lam - 0.00326) * np.exp(1268.0 * (1.0 / 303.0 - 1.0 / T)), SIGMA_MIN)
+
+
+class BilinearTable:
+    """
+    Function tabulated on a regular (u, v) grid and evaluated by vectorized
+    bilinear interpolation: values has shape (n_u, n_v) or (n_u, n_v, k) and
+    __call__(u, v) returns (..., k). Inputs outside the grid are clipped to
+    its edges.
+    """
+    def __init__(self, u, v, values):
+        self.u = np.asarray(u, dtype=float)
+        self.v = np.asarray(v, dtype=float)
+        n_u, n_v = len(self.u), len(self.v)
+        self.values = np.asarray(values, dtype=float).reshape(n_u, n_v, -1)
+        self._flat = self.values.reshape(n_u * n_v, -1)
+        self._du = (self.u[-1] - self.u[0]) / (n_u - 1)
+        self._dv = (self.v[-1] - self.v[0]) / (n_v - 1)
+
+    def __call__(self, u, v):
+        n_u, n_v, n_out = self.values.shape
+        # fractional grid positions, kept just below the last node so i+1 / k+1 stay in range
+        fu = np.clip((np.asarray(u, dtype=float) - self.u[0]) / self._du, 0.0, n_u - 1 - 1e-9)
+        fv = np.clip((np.asarray(v, dtype=float) - self.v[0]) / self._dv, 0.0, n_v - 1 - 1e-9)
+        i = fu.astype(np.intp)
+        k = fv.astype(np.intp)
+        wu = (fu - i)[..., None]
+        wv = (fv - k)[..., None]
+        idx = i * n_v + k
+        if n_out == 1:
+            # one output: take() on the flat column is much faster than row indexing
+            f = self._flat[:, 0]
+            take = lambda j: f.take(j)[..., None]
+        else:
+            take = lambda j: self._flat[j]
+        lo = take(idx) + wv * (take(idx + 1) - take(idx))
+        hi = take(idx + n_v) + wv * (take(idx + n_v + 1) - take(idx + n_v))
+        return lo + wu * (hi - lo)
+
+
+class ConductivityTable(BilinearTable):
+    """
+    springer_conductivity() tabulated on a regular (T, λ) grid, see
+    BilinearTable.
+    """
+    def __init__(self, T_min=273.15, T_max=393.15, lam_min=0.0, lam_max=25.0, n_T=241, n_lam=101):
+        self.T = np.linspace(T_min, T_max, n_T)
+        self.lam = np.linspace(lam_min, lam_max, n_lam)
+        super().__init__(self.T, self.lam, springer_conductivity(self.T[:, None], self.lam[None, :]))
+
+    def __call__(self, T, lam):
+        return super().__call__(T, lam)[..., 0][()]
+
+
+@lru_cache(maxsize=8)
+def conductivity_table(T_min=273.15, T_max=393.15, lam_min=0.0, lam_max=25.0, n_T=241, n_lam=101):
+    """
+    Shared ConductivityTable for the given grid; built once per grid and reused by every model.
+    """
+    return ConductivityTable(T_min, T_max, lam_min, lam_max, n_T, n_lam)
+
+
+def mechanical_min_thickness(delta_P, r, SF=2.0, sigma_tensile=25e6, k=0.3):
+    """
+    Minimum thickness from the stress model sigma = k * ΔP * r² / t² <= sigma_tensile / SF:
+
+        t_mech_min = r * sqrt(k * ΔP * SF / sigma_tensile)
+
+    Parameters (scalars or arrays, broadcast against each other, e.g. one
+    entry per operating scenario):
+      - delta_P       : pressure difference across the membrane (Pa)
+      - r             : unsupported span radius (m)
+      - SF            : safety factor
+      - sigma_tensile : tensile strength (Pa)
+      - k             : geometry factor of the stress model
+
+    Returns the minimum thickness (m) for every combination.
+    """
+    delta_P, r, SF, sigma_tensile, k = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (delta_P, r, SF, sigma_tensile, k)))
+    return r * np.sqrt(k * delta_P * SF / sigma_tensile)
+
+
 class MembraneModel:
     """
     Mathematical model for PEM electrolyzer membrane design.
@@ -15,8 +118,19 @@ class MembraneModel:
       f3: capital cost = cost of membrane material + manufacturing cost.
       f4: environmental impact = material impact per unit area.
       
-    Constraint:
+    Constraints:
       Mechanical durability: t must be at least t_mech_min.
+      Lifetime: L(t, j) = L_base + k3*t[µm] - beta_L*j must be at least L_min.
+
+    Cell voltage:
+      voltage_model="empirical": V_base + k1*j + k2/t
+      voltage_model="ohmic":     V_oc + RT/(alpha_act F) ln(j/j0) + j*(t/sigma_mem(T, λ) + t_el/sigma_el)
+        with sigma_mem from the Springer correlation, looked up in a cached
+        (T, λ) table (see conductivity_table).
+
+    If delta_P and r are given, t_mech_min is computed from the stress model
+    (see mechanical_min_thickness) as the worst case over all combinations of
+    delta_P, r, SF, sigma_tensile and k_stress.
     """
     def __init__(self,
                  HHV_H2=285000.0,    # Higher Heating Value of H2 (J/mol)
@@ -31,7 +145,22 @@ class MembraneModel:
                  rho=2000.0,         # Density of membrane (kg/m³)
                  c_manuf=20.0,       # Manufacturing cost ($/m²)
                  c_E=10.0,           # Environmental impact factor (kg CO₂-eq per kg)
-                 t_mech_min=158e-6   # Minimum thickness from mechanical constraint (m)
+                 t_mech_min=158e-6,  # Minimum thickness from mechanical constraint (m)
+                 delta_P=None,       # Pressure difference(s) across the membrane (Pa)
+                 r=None,             # Unsupported span radius/radii (m)
+                 SF=2.0,             # Safety factor(s)
+                 sigma_tensile=25e6, # Tensile strength(s) (Pa)
+                 k_stress=0.3,       # Geometry factor of the stress model
+                 L_min=0.0,          # Minimum required lifetime (hours)
+                 beta_L=0.0,         # Lifetime loss per unit current density (hours per A/cm²)
+                 voltage_model="empirical",  # "empirical" or "ohmic"
+                 T=353.15,           # Cell temperature (K), ohmic model
+                 lam=14.0,           # Membrane water content λ, ohmic model
+                 V_oc=1.23,          # Open-circuit voltage (V), ohmic model
+                 alpha_act=0.5,      # Charge transfer coefficient, ohmic model
+                 j0=1e-3,            # Exchange current density (A/cm²), ohmic model
+                 t_el=0.0,           # Electrode/contact layer thickness (m), ohmic model
+                 sigma_el=1e3        # Electrode/contact layer conductivity (S/cm), ohmic model
                  ):
         self.HHV_H2 = HHV_H2
         self.alpha = alpha
@@ -46,6 +175,67 @@ class MembraneModel:
         self.c_manuf = c_manuf
         self.c_E = c_E
         self.t_mech_min = t_mech_min
+        if delta_P is not None and r is not None:
+            self.t_mech_min = float(np.max(mechanical_min_thickness(delta_P, r, SF, sigma_tensile, k_stress)))
+        self.L_min = L_min
+        self.beta_L = beta_L
+        if voltage_model not in ("empirical", "ohmic"):
+            raise ValueError(f"Unknown voltage_model: {voltage_model}")
+        self.voltage_model = voltage_model
+        self.T = T
+        self.lam = lam
+        self.V_oc = V_oc
+        self.alpha_act = alpha_act
+        self.j0 = j0
+        self.t_el = t_el
+        self.sigma_el = sigma_el
+        # sigma_mem at the model's own (T, λ) is looked up once, not per individual
+        self.sigma_mem = conductivity_table()(T, lam) if voltage_model == "ohmic" else None
+
+    # The sub-models below work element-wise on scalars or NumPy arrays.
+    def cell_voltage(self, t, j, T=None, lam=None, activation=True):
+        """
+        Cell voltage (V) of the selected voltage_model. T and lam override the
+        model's temperature and water content (ohmic model); activation=False
+        leaves out the activation term, e.g. when the catalyst model supplies it.
+        """
+        if self.voltage_model == "empirical":
+            return self.V_base + self.k1 * j + self.k2 / t
+        V = self.V_oc + self.ohmic_overpotential(t, j, T, lam)
+        if activation:
+            T = self.T if T is None else T
+            V = V + R_GAS * T / (self.alpha_act * FARADAY) * np.log(np.maximum(j / self.j0, 1.0))
+        return V
+
+    def ohmic_overpotential(self, t, j, T=None, lam=None):
+        """
+        Ohmic loss (V): j * (t/sigma_mem + t_el/sigma_el), thicknesses converted m -> cm.
+        T/lam arrays are looked up at their own shape (e.g. a (1, n_T) grid) before
+        they broadcast against t and j.
+        """
+        if T is None and lam is None and self.sigma_mem is not None:
+            sigma_mem = self.sigma_mem
+        else:
+            sigma_mem = conductivity_table()(self.T if T is None else T, self.lam if lam is None else lam)
+        return j * (t * 100.0 / sigma_mem + self.t_el * 100.0 / self.sigma_el)
+
+    def h2_rate(self, t, j):
+        """Hydrogen production rate (mol/s): alpha * j / (1 + beta*t)"""
+        return self.alpha * j / (1.0 + self.beta * t)
+
+    def lifetime(self, t, j):
+        """Lifetime (hours): L_base + k3 * t[µm] - beta_L * j"""
+        return self.L_base + self.k3 * (t * 1e6) - self.beta_L * j
+
+    def t_lower_bound(self, j_lb):
+        """
+        Smallest thickness (m) that can satisfy both constraints for some j >= j_lb.
+        The lifetime decreases with j, so j_lb is the most lenient operating point.
+        """
+        t_min = self.t_mech_min
+        if self.k3 > 0:
+            t_min = max(t_min, (self.L_min - self.L_base + self.beta_L * j_lb) / self.k3 * 1e-6)
+        return t_min
 
     def evaluate_objectives(self, x):
         """
@@ -65,18 +255,18 @@ class MembraneModel:
         j = x[1]
         
         # Compute cell voltage (V) using a simplified model.
-        V_cell = self.V_base + self.k1 * j + self.k2 / t
+        V_cell = self.cell_voltage(t, j)
         
         # Hydrogen production rate (mol/s) modeled as:
         # r_H2 = alpha * j / (1 + beta * t)
-        r_H2 = self.alpha * j / (1.0 + self.beta * t)
+        r_H2 = self.h2_rate(t, j)
         
         # Energy efficiency: η = (HHV_H2 * r_H2) / (V_cell * j)
         # (Assuming I_cell = j for unit area, so j cancels out partially)
         eta_energy = (self.HHV_H2 * r_H2) / (V_cell * j)
         
         # Lifetime (hours): assume it increases linearly with thickness (converted to microns)
-        L = self.L_base + self.k3 * (t * 1e6)
+        L = self.lifetime(t, j)
         
         # Capital cost per m²: material cost + manufacturing cost.
         # Material cost = c_ionomer * density * thickness.
@@ -99,10 +289,66 @@ class MembraneModel:
         
         Mechanical durability constraint:
           t >= t_mech_min.
+        Lifetime constraint:
+          L(t, j) >= L_min.
         For pymoo, constraints are formulated as g(x) <= 0.
         We define:
-          g(x) = t_mech_min - t <= 0.
+          g1(x) = t_mech_min - t <= 0,
+          g2(x) = L_min - L(t, j) <= 0.
+
+        x may be a single [t, j] or a (2, n) array of candidates (one column each).
         """
         t = x[0]
+        j = x[1]
         g1 = self.t_mech_min - t
-        return np.array([g1])
+        g2 = self.L_min - self.lifetime(t, j)
+        return np.array([g1, g2])
+
+    def evaluate_load_profile(self, X, load, dt_hours=1.0, chunk_size=2048):
+        """
+        Evaluate candidates over a time series of load.
+
+        Each candidate is x = [t, j_scale]: membrane thickness (m) and rated
+        current density (A/cm²). At step k the cell runs at
+        j_k = j_scale * load[k], with load the fraction of rated load (0-1),
+        e.g. 8760 hourly values of a renewable power profile.
+
+        The population is evaluated against `chunk_size` time steps at a time,
+        so memory stays at O(pop x chunk_size) for arbitrarily long profiles;
+        `load` may be a memory-mapped array (see utils/load_profile.py).
+
+        Returns a dict of (pop,) arrays:
+          - energy_kWh      : electrical energy, sum V_cell*j*dt (kWh per m²)
+          - h2_kg           : hydrogen produced, sum r_H2*3600*dt (kg per m²; r_H2 is
+                              per cm² like j, see evaluate_objectives)
+          - operating_hours : hours with j > 0
+          - lifetime_used   : fraction of the lifetime consumed, sum dt/L(t, j_k)
+                              over operating steps
+          - specific_energy : energy_kWh / h2_kg (kWh/kg)
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        t = X[:, 0:1]
+        j_scale = X[:, 1:2]
+        n = X.shape[0]
+        MW_H2 = 2.016e-3  # kg/mol
+
+        energy_Wh = np.zeros(n)   # Wh per cm²
+        h2_mol = np.zeros(n)      # mol per cm²
+        hours = np.zeros(n)
+        life_used = np.zeros(n)
+        for start in range(0, len(load), chunk_size):
+            load_c = np.asarray(load[start:start + chunk_size], dtype=float)[None, :]
+            j = j_scale * load_c                                  # (pop, chunk)
+            on = j > 0
+            V = self.cell_voltage(t, np.where(on, j, 1.0))
+            energy_Wh += np.sum(np.where(on, V * j, 0.0), axis=1) * dt_hours
+            h2_mol += np.sum(self.h2_rate(t, j), axis=1) * 3600.0 * dt_hours
+            hours += np.sum(on, axis=1) * dt_hours
+            life_used += np.sum(np.where(on, dt_hours / self.lifetime(t, j), 0.0), axis=1)
+
+        energy_kWh = energy_Wh * 1e4 / 1e3   # W/cm² -> W/m², Wh -> kWh
+        h2_kg = h2_mol * 1e4 * MW_H2         # per cm² -> per m², same basis as energy_kWh
+        with np.errstate(divide="ignore", invalid="ignore"):
+            specific_energy = np.where(h2_kg > 0, energy_kWh / h2_kg, np.inf)
+        return dict(energy_kWh=energy_kWh, h2_kg=h2_kg, operating_hours=hours,
+                    lifetime_used=life_used, specific_energy=specific_energy)
@@ -1,4 +1,7 @@
 # membrane_optimization.py
+import time
+from contextlib import nullcontext
+
 import numpy as np
 from pymoo.core.problem import Problem
 from utils.membrane import MembraneModel
@@ -11,19 +14,45 @@ class MembraneOptimizationProblem(Problem):
             xl = np.array([50e-6, 0.5])
         if xu is None:
             xu = np.array([300e-6, 3.0])
-        super().__init__(n_var=2, n_obj=4, n_constr=1, xl=xl, xu=xu)
+        super().__init__(n_var=2, n_obj=4, n_constr=2, xl=xl, xu=xu)
         self.model = model
 
     def _evaluate(self, X, out, *args, **kwargs):
         F = np.zeros((X.shape[0], 4))
-        G = np.zeros((X.shape[0], 1))
         for i in range(X.shape[0]):
             x = X[i, :]
             F[i, :] = self.model.evaluate_objectives(x)
-            # Constraint: t >= t_mech_min  ->  t_mech_min - t <= 0.
-            G[i, 0] = self.model.t_mech_min - x[0]
         out["F"] = F
-        out["G"] = G
+        # Constraints: t_mech_min - t <= 0 and L_min - L(t, j) <= 0 for the whole population.
+        out["G"] = self.constraints(X)
+
+    def constraints(self, X):
+        return self.model.evaluate_constraints(X.T).T
+
+# Time-series variant: candidates evaluated against a load profile.
+class LoadProfileProblem(MembraneOptimizationProblem):
+    """
+    Decision variables: x[0] = t (m), x[1] = j_scale, the rated current density
+    (A/cm²) that the load profile (fraction of rated load per step) is scaled by.
+
+    Objectives over the whole profile (see MembraneModel.evaluate_load_profile):
+      f1: specific energy (kWh/kg H2)
+      f2: negative hydrogen produced (-kg H2)
+      f3: fraction of the membrane lifetime consumed
+      f4: capital cost ($/m²)
+    Constraints: t >= t_mech_min and L(t, j_scale) >= L_min (lifetime at rated load).
+    """
+    def __init__(self, model: MembraneModel, load, dt_hours=1.0, chunk_size=2048, **kwargs):
+        super().__init__(model, **kwargs)
+        self.load = load
+        self.dt_hours = dt_hours
+        self.chunk_size = chunk_size
+
+    def _evaluate(self, X, out, *args, **kwargs):
+        res = self.model.evaluate_load_profile(X, self.load, self.dt_hours, self.chunk_size)
+        cost = self.model.evaluate_objectives(X.T)[2]
+        out["F"] = np.column_stack([res["specific_energy"], -res["h2_kg"], res["lifetime_used"], cost])
+        out["G"] = self.constraints(X)
 
 # Scalarization: Weighted Sum transformation.
 class WeightedSumProblem(MembraneOptimizationProblem):
@@ -38,11 +67,8 @@ class WeightedSumProblem(MembraneOptimizationProblem):
         # Weighted sum: scalar objective = sum(w_i * f_i)
         F_scalar = np.sum(self.weights * F_multi, axis=1).reshape(-1, 1)
         # No multiobjective now, but we preserve constraints
-        G = np.zeros((X.shape[0], 1))
-        for i in range(X.shape[0]):
-            G[i, 0] = self.model.t_mech_min - X[i, 0]
         out["F"] = F_scalar
-        out["G"] = G
+        out["G"] = self.constraints(X)
 
 # Scalarization: Goal Seeking transformation.
 class GoalSeekingProblem(MembraneOptimizationProblem):
@@ -56,38 +82,40 @@ class GoalSeekingProblem(MembraneOptimizationProblem):
             F_multi[i, :] = self.model.evaluate_objectives(X[i, :])
         # Goal seeking: scalar objective = sum((f_i - goal_i)^2)
         F_scalar = np.sum((F_multi - self.goals) ** 2, axis=1).reshape(-1, 1)
-        G = np.zeros((X.shape[0], 1))
-        for i in range(X.shape[0]):
-            G[i, 0] = self.model.t_mech_min - X[i, 0]
         out["F"] = F_scalar
-        out["G"] = G
+        out["G"] = self.constraints(X)
 
-def run_optimization(method="NSGA2", model_params=None, bounds=None,
-                     scalar_params=None, pop_size=100, n_gen=100, seed=1):
+def tighten_bounds(model: MembraneModel, xl, xu):
     """
-    Run the optimization using pymoo.
-    
-    Parameters:
-      method: one of ["NSGA2", "MOEAD", "SPEA2", "WeightedSum", "GoalSeeking"]
-      model_params: dictionary of parameters for MembraneModel (if None, use defaults)
-      bounds: dictionary with keys 't_lb', 't_ub', 'j_lb', 'j_ub' (if None, use defaults)
-      scalar_params: dictionary for scalarization methods:
-           for WeightedSum, provide 'weights': list of 4 numbers,
-           for GoalSeeking, provide 'goals': list of 4 numbers.
-      pop_size: population size
-      n_gen: number of generations
-      seed: random seed
-      
-    Returns:
-      Optimization result from pymoo.optimize.minimize.
+    Lower bounds with t raised to the analytic minimum of the constraints.
+    Raises ValueError if no thickness inside the bounds can be feasible.
+    """
+    xl = np.array(xl, dtype=float)
+    t_min = model.t_lower_bound(xl[1])
+    if t_min > xu[0]:
+        raise ValueError(f"No feasible thickness: constraints require t >= {t_min:.3e} m "
+                         f"but the upper bound is {xu[0]:.3e} m")
+    xl[0] = max(xl[0], t_min)
+    return xl
+
+def membrane_setup(method="NSGA2", model_params=None, bounds=None, scalar_params=None,
+                   pop_size=100, n_gen=100, seed=1, load_profile=None, dt_hours=1.0, prefilter=True,
+                   memo=None, fidelity=None):
+    """
+    The run that run_optimization makes, unexecuted: (problem, algorithm,
+    termination, finalize), where finalize(res) post-processes the pymoo
+    Result (MOEA/D feasibility filter, else identity). Arguments as for
+    run_optimization; used to drive the algorithm step by step
+    (run_optimization_async).
     """
-    from pymoo.optimize import minimize
     from pymoo.termination import get_termination
     # Import algorithms from pymoo (latest versions)
     from pymoo.algorithms.moo.nsga2 import NSGA2
-    from pymoo.algorithms.moo.moead import MOEAD
     from pymoo.algorithms.moo.spea2 import SPEA2
-    
+    from utils.fidelity import MembraneScreening, fidelity_problem, full_fidelity_front
+    from utils.memo import memo_problem
+    from utils.optimization import moead_setup, moead_finalize
+
     # Create MembraneModel instance
     if model_params is None:
         model = MembraneModel()
@@ -101,8 +129,12 @@ def run_optimization(method="NSGA2", model_params=None, bounds=None,
     else:
         xl = np.array([bounds.get('t_lb', 50e-6), bounds.get('j_lb', 0.5)])
         xu = np.array([bounds.get('t_ub', 300e-6), bounds.get('j_ub', 3.0)])
+    if prefilter:
+        xl = tighten_bounds(model, xl, xu)
     
     # Choose problem type
+    if load_profile is not None and method in ["WeightedSum", "GoalSeeking"]:
+        raise ValueError("load_profile is only supported for the Pareto methods (NSGA2, MOEAD, SPEA2)")
     if method in ["WeightedSum", "GoalSeeking"]:
         # Scalarization transformation; use WeightedSumProblem or GoalSeekingProblem.
         if method == "WeightedSum":
@@ -119,15 +151,28 @@ def run_optimization(method="NSGA2", model_params=None, bounds=None,
             else:
                 goals = scalar_params["goals"]
             problem = GoalSeekingProblem(model=model, goals=goals, xl=xl, xu=xu)
+    elif load_profile is not None:
+        if isinstance(load_profile, str):
+            from utils.load_profile import read_load_profile
+            load_profile = read_load_profile(load_profile)
+        problem = LoadProfileProblem(model=model, load=load_profile, dt_hours=dt_hours, xl=xl, xu=xu)
     else:
         # Multiobjective problem
         problem = MembraneOptimizationProblem(model=model, xl=xl, xu=xu)
     
+    full = problem
+    problem = memo_problem(problem, memo)
+    if fidelity:
+        if method.upper() not in ("NSGA2", "SPEA2") or load_profile is not None:
+            raise ValueError("Multi-fidelity screening is only available for NSGA2 and SPEA2 without load_profile")
+        problem = fidelity_problem(problem, lambda n_grid: MembraneScreening(full, n_grid), fidelity, n_gen)
+
     # Select algorithm
+    if method.upper() == "MOEAD":
+        penalized, algorithm, termination = moead_setup(problem, pop_size, n_gen)
+        return penalized, algorithm, termination, lambda res: moead_finalize(res, problem)
     if method.upper() == "NSGA2":
         algorithm = NSGA2(pop_size=pop_size, seed=seed)
-    elif method.upper() == "MOEAD":
-        algorithm = MOEAD(pop_size=pop_size, seed=seed)
     elif method.upper() == "SPEA2":
         algorithm = SPEA2(pop_size=pop_size, seed=seed)
     else:
@@ -135,10 +180,130 @@ def run_optimization(method="NSGA2", model_params=None, bounds=None,
         algorithm = NSGA2(pop_size=pop_size, seed=seed)
     
     termination = get_termination("n_gen", n_gen)
+    if fidelity:
+        return problem, algorithm, termination, lambda res: full_fidelity_front(res, problem)
+    return problem, algorithm, termination, lambda res: res
+
+def run_optimization(method="NSGA2", model_params=None, bounds=None,
+                     scalar_params=None, pop_size=100, n_gen=100, seed=1,
+                     profile=False, profile_output=None,
+                     load_profile=None, dt_hours=1.0, prefilter=True, callback=None,
+                     checkpoint=None, checkpoint_interval=None, resume_from=None, memo=None, fidelity=None):
+    """
+    Run the optimization using pymoo.
+    
+    Parameters:
+      method: one of ["NSGA2", "MOEAD", "SPEA2", "WeightedSum", "GoalSeeking"]
+      model_params: dictionary of parameters for MembraneModel (if None, use defaults)
+      bounds: dictionary with keys 't_lb', 't_ub', 'j_lb', 'j_ub' (if None, use defaults)
+      scalar_params: dictionary for scalarization methods:
+           for WeightedSum, provide 'weights': list of 4 numbers,
+           for GoalSeeking, provide 'goals': list of 4 numbers.
+      pop_size: population size
+      n_gen: number of generations
+      seed: random seed
+      profile: if True, attach a RunProfile (utils/profiling.py) as res.profile
+      profile_output: optional path for a hot-path dump (.prof = cProfile, .html = pyinstrument)
+      load_profile: optional load time series (array or .npy/.parquet path, values = fraction
+           of rated load). Pareto methods then optimize [t, j_scale] on LoadProfileProblem and
+           'j_lb'/'j_ub' bound the rated current density.
+      dt_hours: length of one load profile step (h)
+      prefilter: raise the lower thickness bound to model.t_lower_bound(j_lb) before the
+           search, so no evaluations are spent on thicknesses that violate t_mech_min or
+           the lifetime constraint at every j
+      callback: optional callback(algorithm) called after every generation
+           (progress reporting and cancellation, see utils/jobs.py)
+      checkpoint: optional path; the algorithm state is saved there at most every
+           checkpoint_interval seconds (default 30, see utils/checkpoint.py)
+      resume_from: optional checkpoint path; the run continues where it stopped (the
+           other problem arguments are then taken from the checkpoint) and keeps
+           checkpointing to the same file unless checkpoint is given
+      memo: True or dict(resolution=..., max_size=...) to answer repeated designs from a
+           cache of evaluations (utils/memo.py); its statistics are returned as res.memo
+      fidelity: True or dict(promote=..., schedule=..., n_grid=...) (NSGA2, SPEA2) to screen
+           every population with a (t, j) lookup table of the objectives and evaluate only the
+           promoted share with the full model (utils/fidelity.py); the returned front is
+           full-fidelity and the evaluation / accuracy statistics are returned as res.fidelity
+      
+    Returns:
+      Optimization result from pymoo.optimize.minimize.
+    """
+    from pymoo.optimize import minimize
+    from utils.checkpoint import CHECKPOINT_INTERVAL, Checkpointer, load_checkpoint, resume_run
+    from utils.fidelity import MultiFidelityProblem, full_fidelity_front
+    from utils.memo import memo_stats
+    from utils.profiling import RunProfiler, minimize_hooks
+    from utils.seeds import lineage
+
+    profiler = RunProfiler(profile_output) if (profile or profile_output) else None
+    checkpointer = None
+    if checkpoint is not None or resume_from is not None:
+        if profiler is not None:
+            raise ValueError("Checkpointing is not available for profiled runs")
+        checkpointer = Checkpointer(checkpoint or resume_from, checkpoint_interval or CHECKPOINT_INTERVAL,
+                                    dict(method=method, seed=seed), callback)
+        callback = checkpointer
+    if resume_from is not None:
+        state = load_checkpoint(resume_from)
+        if state["meta"].get("method") != method:
+            raise ValueError(f"{resume_from} is a checkpoint of {state['meta'].get('method')}, not {method}")
+        checkpointer.meta = state["meta"]   # keep the seed of the original run
+        res, meta = resume_run(state, checkpointer)
+        if method.upper() == "MOEAD":
+            from utils.optimization import moead_finalize
+            res = moead_finalize(res, res.problem.base)
+        if isinstance(res.problem, MultiFidelityProblem):
+            res = full_fidelity_front(res, res.problem)
+            res.fidelity = res.problem.stats()
+        res.seed_lineage = lineage(meta.get("seed", seed))
+        res.checkpoint = dict(path=checkpointer.path, n_saved=checkpointer.n_saved,
+                              save_time=checkpointer.save_time, resumed_from=resume_from)
+        return res
+
+    t0 = time.perf_counter()
+    problem, algorithm, termination, finalize = membrane_setup(method, model_params, bounds, scalar_params,
+                                                               pop_size, n_gen, seed, load_profile, dt_hours,
+                                                               prefilter, memo, fidelity)
+    setup_time = time.perf_counter() - t0
     
-    res = minimize(problem,
-                   algorithm,
-                   termination,
-                   seed=seed,
-                   verbose=True)
+    with profiler.run() if profiler is not None else nullcontext():
+        res = minimize(problem,
+                       algorithm,
+                       termination,
+                       seed=seed,
+                       verbose=True,
+                       **minimize_hooks(profiler, callback))
+    res = finalize(res)
+    res.seed_lineage = lineage(seed)
+    if checkpointer is not None:
+        res.checkpoint = dict(path=checkpoint, n_saved=checkpointer.n_saved, save_time=checkpointer.save_time)
+    if fidelity:
+        res.fidelity = problem.stats()
+    if memo:
+        res.memo = memo_stats(problem)
+
+    if profiler is not None:
+        profiler.profile.add_phase("setup", setup_time)
+        res.profile = profiler.profile
     return res
+
+async def run_optimization_async(method="NSGA2", model_params=None, bounds=None,
+                                 scalar_params=None, pop_size=100, n_gen=100, seed=1,
+                                 load_profile=None, dt_hours=1.0, prefilter=True,
+                                 executor=None, chunk_size=None):
+    """
+    Asynchronous run_optimization (same arguments except profile/callback):
+    an async iterator of per-generation updates, dicts with n_gen, n_eval,
+    progress and the X, F of the current optimum; the last update also carries
+    the final pymoo Result under "result". Evaluations run on `executor`
+    (default: the shared process pool), in chunks of chunk_size rows if
+    given; see utils/async_optimization.py.
+    """
+    from utils.async_optimization import optimize_async
+
+    problem, algorithm, termination, finalize = membrane_setup(method, model_params, bounds, scalar_params,
+                                                               pop_size, n_gen, seed, load_profile, dt_hours,
+                                                               prefilter)
+    async for update in optimize_async(problem, algorithm, termination, seed=seed, finalize=finalize,
+                                       executor=executor, chunk_size=chunk_size):
+        yield update
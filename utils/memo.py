@@ -0,0 +1,280 @@
+# utils/memo.py
+"""
+Memoized problem evaluation keyed on quantized decision vectors.
+
+GA and NSGA2 keep producing children identical (or nearly identical) to
+designs already evaluated, in particular late in a run and with the small
+scalarization populations. MemoProblem wraps a problem (PEMProblem and its
+wrappers, MembraneOptimizationProblem, ...) and answers those from a cache:
+
+  - a decision vector is quantized per variable to steps of
+    resolution * (xu - xl), so designs closer than that share one entry and
+    get the outputs of the first of them that was evaluated (resolution=0
+    keys on the exact float values)
+  - QuantizedLRU holds the quantized keys, [F | G] rows and last-use ticks in
+    preallocated arrays (a hash of the key row -> slot dict is the only
+    Python-level index); when it is full the least recently used eighth is
+    evicted
+  - misses of a population are evaluated in one call to the wrapped problem,
+    duplicates within the population once
+
+    problem = MemoProblem(PEMProblem(**params), resolution=1e-6)
+    res = minimize(problem, NSGA2(pop_size=40), ("n_gen", 30))
+    problem.stats()   # lookups, hits, hit_rate, size
+
+Both run_optimization functions take memo=True or memo=dict(resolution=...,
+max_size=...) and return the statistics as res.memo.
+"""
+import numpy as np
+from pymoo.core.problem import ElementwiseProblem, Problem
+
+MEMO_RESOLUTION = 1e-6
+MEMO_SIZE = 50_000
+
+# odd 64-bit multipliers mixing the key columns into one hash
+_MIX = np.random.default_rng(0x5EED).integers(1, 2**63, size=64, dtype=np.uint64) | np.uint64(1)
+
+
+class QuantizedLRU:
+    """
+    Bounded least-recently-used map from quantized decision vectors to rows of
+    n_out floats, array-backed.
+
+    Parameters:
+      - xl, xu     : variable bounds (the quantization step is relative to them)
+      - n_out      : floats stored per entry
+      - resolution : quantization step as a fraction of each variable's range
+                     (0 = exact keys)
+      - max_size   : entries kept
+    """
+    def __init__(self, xl, xu, n_out, resolution=MEMO_RESOLUTION, max_size=MEMO_SIZE):
+        self.xl = np.asarray(xl, dtype=float)
+        span = np.asarray(xu, dtype=float) - self.xl
+        self.step = resolution * np.where(span > 0, span, 1.0)
+        self.resolution = resolution
+        self.max_size = max_size
+        n_var = len(self.xl)
+        if n_var > len(_MIX):
+            raise ValueError(f"At most {len(_MIX)} decision variables are supported")
+        size = min(1024, max_size)
+        self.keys = np.empty((size, n_var), dtype=np.int64)
+        self.values = np.empty((size, n_out))
+        self.hashes = np.empty(size, dtype=np.uint64)
+        self.used = np.zeros(size, dtype=np.int64)
+        self.index = {}
+        self.free = []
+        self.n_stored = 0
+        self.tick = 0
+        self.lookups = 0
+        self.hits = 0
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def hit_rate(self):
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def quantize(self, X):
+        """
+        int64 keys (n, n_var) and uint64 hashes (n,) of the rows of X.
+        """
+        X = np.asarray(X, dtype=float)
+        if self.resolution > 0:
+            keys = np.floor((X - self.xl) / self.step + 0.5).astype(np.int64)
+        else:
+            keys = np.ascontiguousarray(X).view(np.int64)
+        # unsigned products and sums wrap around modulo 2**64
+        hashes = keys.view(np.uint64) @ _MIX[:keys.shape[-1]]
+        return keys, hashes
+
+    def get(self, key, h):
+        """
+        Stored row of one key (hash h as int) or None.
+        """
+        slot = self.index.get(h)
+        if slot is None or not np.array_equal(self.keys[slot], key):
+            return None
+        self.tick += 1
+        self.used[slot] = self.tick
+        return self.values[slot]
+
+    def put(self, key, h, value):
+        """
+        Insert one row (see store).
+        """
+        if h in self.index:
+            return
+        if not self.free and self.n_stored >= self.max_size:
+            self._evict(max(1, self.max_size // 8))
+        if self.free:
+            slot = self.free.pop()
+        else:
+            slot = self.n_stored
+            self.n_stored += 1
+            self._reserve(self.n_stored)
+        self.keys[slot], self.values[slot], self.hashes[slot] = key, value, h
+        self.used[slot] = self.tick
+        self.index[h] = slot
+
+    def lookup(self, keys, hashes):
+        """
+        Stored rows for the keys (unset where missing) and the hit mask; marks
+        the hits as recently used.
+        """
+        self.tick += 1
+        slots = np.fromiter((self.index.get(h, -1) for h in hashes.tolist()), dtype=np.int64, count=len(hashes))
+        hit = slots >= 0
+        # a hash collision of two different keys counts as a miss
+        hit[hit] = np.all(self.keys[slots[hit]] == keys[hit], axis=1)
+        values = np.empty((len(keys), self.values.shape[1]))
+        values[hit] = self.values[slots[hit]]
+        self.used[slots[hit]] = self.tick
+        return values, hit
+
+    def store(self, keys, hashes, values):
+        """
+        Insert rows (keys with distinct hashes), evicting the least recently
+        used entries if the cache is full. A hash already stored for another
+        key (collision) is not cached.
+        """
+        new = np.fromiter((h not in self.index for h in hashes.tolist()), dtype=bool, count=len(hashes))
+        keys, hashes, values = keys[new][:self.max_size], hashes[new][:self.max_size], values[new][:self.max_size]
+        n = len(keys)
+        if n == 0:
+            return
+        capacity = len(self.free) + self.max_size - self.n_stored
+        if n > capacity:
+            self._evict(max(n - capacity, self.max_size // 8))
+        n_free = min(n, len(self.free))
+        slots = [self.free.pop() for _ in range(n_free)]
+        slots = np.array(slots + list(range(self.n_stored, self.n_stored + n - n_free)), dtype=np.int64)
+        self.n_stored += n - n_free
+        self._reserve(self.n_stored)
+        self.keys[slots], self.values[slots], self.hashes[slots] = keys, values, hashes
+        self.used[slots] = self.tick
+        self.index.update(zip(hashes.tolist(), slots.tolist()))
+
+    def _reserve(self, size):
+        if size > len(self.keys):
+            new = min(max(size, 2 * len(self.keys)), self.max_size)
+            self.keys, self.values = (np.resize(a, (new, a.shape[1])) for a in (self.keys, self.values))
+            self.hashes, self.used = (np.resize(a, new) for a in (self.hashes, self.used))
+
+    def _evict(self, n):
+        live = np.setdiff1d(np.arange(self.n_stored), self.free)
+        n = min(n, len(live))
+        if n == 0:
+            return
+        victims = live[np.argpartition(self.used[live], n - 1)[:n]]
+        for h in self.hashes[victims].tolist():
+            del self.index[h]
+        self.free.extend(victims.tolist())
+
+    def stats(self):
+        return dict(lookups=self.lookups, hits=self.hits, hit_rate=self.hit_rate, size=len(self))
+
+
+class MemoProblem(Problem):
+    """
+    Vectorized view of `base` whose evaluations go through a QuantizedLRU of
+    [F | G] rows. Attributes not defined here (material_names, eta_array,
+    ...) are those of base.
+    """
+    def __init__(self, base, resolution=MEMO_RESOLUTION, max_size=MEMO_SIZE):
+        if base.n_eq_constr:
+            raise ValueError("Equality constraints are not supported by MemoProblem")
+        super().__init__(n_var=base.n_var, n_obj=base.n_obj, n_ieq_constr=base.n_ieq_constr,
+                         xl=base.xl, xu=base.xu)
+        self.base = base
+        self.cache = QuantizedLRU(base.xl, base.xu, base.n_obj + base.n_ieq_constr, resolution, max_size)
+
+    def __getattr__(self, name):
+        if name.startswith("__") or name == "base":
+            raise AttributeError(name)
+        return getattr(self.base, name)
+
+    def _compute(self, X):
+        """
+        [F | G] rows of the wrapped problem for the rows of X.
+        """
+        if isinstance(self.base, ElementwiseProblem):
+            # row by row; like the vectorized case below this skips pymoo's
+            # evaluate machinery, MemoProblem.evaluate already went through it
+            out = np.empty((len(X), self.n_obj + self.n_ieq_constr))
+            for i, x in enumerate(X):
+                row = {}
+                self.base._evaluate(x, row)
+                out[i, :self.n_obj], out[i, self.n_obj:] = np.ravel(row["F"]), np.ravel(row["G"])
+            return out
+        res = {}
+        self.base._evaluate(X, res)
+        return np.column_stack([np.reshape(res["F"], (len(X), self.n_obj)),
+                                np.reshape(res["G"], (len(X), self.n_ieq_constr))])
+
+    def _evaluate(self, X, out, *args, **kwargs):
+        if np.ndim(X) == 1:
+            self._evaluate_one(X, out)
+            return
+        if len(X) == 1:   # MOEA/D asks for one design per step
+            self._evaluate_one(X[0], out)
+            out["F"], out["G"] = out["F"][None, :], out["G"][None, :]
+            return
+        cache = self.cache
+        keys, hashes = cache.quantize(X)
+        values, hit = cache.lookup(keys, hashes)
+        miss = np.flatnonzero(~hit)
+        n_computed = 0
+        if len(miss):
+            # designs repeated within the population are evaluated once
+            unique, first, inverse = np.unique(hashes[miss], return_index=True, return_inverse=True)
+            rows = miss[first]
+            computed = self._compute(X[rows])
+            cache.store(keys[rows], unique, computed)
+            values[miss] = computed[inverse.ravel()]
+            n_computed = len(rows)
+        cache.lookups += len(X)
+        cache.hits += len(X) - n_computed
+        out["F"] = values[:, :self.n_obj]
+        out["G"] = values[:, self.n_obj:]
+
+    def _evaluate_one(self, x, out):
+        # one design at a time (the scalarization problems): plain dict lookup
+        cache = self.cache
+        key, h = cache.quantize(x)
+        h = int(h)
+        value = cache.get(key, h)
+        cache.lookups += 1
+        if value is None:
+            value = self._compute(x[None, :])[0]
+            cache.put(key, h, value)
+        else:
+            cache.hits += 1
+        out["F"] = value[:self.n_obj].copy()
+        out["G"] = value[self.n_obj:].copy()
+
+    def stats(self):
+        """
+        lookups, hits, hit_rate and size of the cache.
+        """
+        return self.cache.stats()
+
+
+def memo_problem(problem, memo):
+    """
+    problem wrapped in a MemoProblem for a run_optimization `memo` argument
+    (True or a dict of MemoProblem options); problem itself if memo is falsy.
+    """
+    if not memo:
+        return problem
+    return MemoProblem(problem, **(memo if isinstance(memo, dict) else {}))
+
+
+def memo_stats(problem):
+    """
+    stats() of the MemoProblem in a chain of problem wrappers (`.base`), or
+    None if there is none.
+    """
+    while problem is not None and not isinstance(problem, MemoProblem):
+        problem = getattr(problem, "base", None)
+    return problem.stats() if problem is not None else None
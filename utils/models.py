@@ -1,7 +1,6 @@
 # models.py
 
 import numpy as np
-import math
 
 def cost_function(rho_cat, delta, eps, A_cell, c_cat):
     """
@@ -25,6 +24,25 @@ def cost_function(rho_cat, delta, eps, A_cell, c_cat):
     return mass_per_area * A_cell * c_cat
 
 
+def arrhenius_j0(j0_ref, T, T_ref, Eact=76000.0, R=8.314):
+    """
+    Arrhenius Temperature Scaling of the Exchange Current Density
+    -------------------------------------------------------------
+    j0(T) = j0_ref * exp(-Eact/R * (1/T - 1/T_ref))
+
+    Parameters:
+      - j0_ref (A/cm²_active): exchange current density at T_ref
+      - T      (K)           : temperature (scalar or array)
+      - T_ref  (K)           : reference temperature of j0_ref
+      - Eact   (J/mol)       : activation energy (76 kJ/mol, Crespi et al., 2023)
+      - R      (J/(mol*K))   : gas constant
+
+    Returns:
+      j0 (A/cm²_active) at T, broadcast over j0_ref, T and T_ref
+    """
+    return j0_ref * np.exp(-Eact / R * (1.0 / np.asarray(T, dtype=float) - 1.0 / T_ref))
+
+
 def eta_total(
     j,         # (A/cm²) operating current density
     j0,        # (A/cm²_active) exchange current density (active area basis)
@@ -41,7 +59,8 @@ def eta_total(
     alpha=0.5,  # (dimensionless) activation coefficient
     R = 8.314,  # (J/(mol*K)) gas constant  [J/(mol*K)]
       n=2, F=96500,      # n (dimensionless), F (C/mol)
-    
+    T_ref=None,  # (K) reference temperature of j0; None = j0 used as given
+    Eact=76000.0,  # (J/mol) activation energy of j0 (Crespi et al., 2023)
 ):
     """
     Total Overpotential Model (Simple Tafel + Simple Concentration)
@@ -82,16 +101,18 @@ def eta_total(
 
     Summation: η_total = η_act + η_conc
 
+    Temperature dependence
+    ----------------------
+    With T_ref given, j0 is the exchange current density at T_ref and is
+    scaled to T with arrhenius_j0(j0, T, T_ref, Eact, R) before use.
+
     Returns:
       eta (V) total
     """
     # 1) Tafel Activation
-    Eact= 76000 # activation energy (J/mol) (Crespi et al., 2023)
-    K_io = 2160000 # pre-exponential factor (A/cm2)
-    
-    jo= K_io*math.exp(Eact/(R*T))
-    #Pressure and Temperature dependence
-    #add eqns from notes
+    # Temperature dependence of j0 (Arrhenius, relative to T_ref)
+    if T_ref is not None:
+        j0 = arrhenius_j0(j0, T, T_ref, Eact, R)
     
     
     # j0_geo = j0 * S_cat * (1 - epsilon) * delta  # Exchange current density per geometric area
@@ -146,6 +167,57 @@ def eta_total(
     return eta_act + eta_conc
 
 
+def eta_total_array(
+    j,         # (A/cm²) operating current density
+    j0,        # (A/cm²_active) exchange current density (active area basis)
+    S_cat,     # (cm²_active/g) specific surface area
+    epsilon,   # (dimensionless) porosity
+    delta,     # (cm) thickness
+    T,         # (K) temperature
+    rho_cat,   # (g/cm³) catalyst density
+    C_bulk,    # (mol/cm³) bulk concentration
+    D,         # (cm²/s) diffusivity
+    tau,       # (dimensionless) tortuosity
+    alpha=0.5, R=8.314, n=2, F=96500,
+    T_ref=None, Eact=76000.0,
+):
+    """
+    Vectorized eta_total
+    --------------------
+    Same model and penalties as eta_total (1e6 if j0_geo <= 1e-15 or j/j0_geo <= 0,
+    eta_act + 1e6 if j >= j_lim or the log argument 1 - j/j_lim <= 1e-15), but all
+    arguments may be NumPy arrays and are broadcast against each other, e.g.
+    designs as (n, 1) columns and current densities as a (1, n_j) row give an
+    (n, n_j) map in one call. Nothing is printed for penalized entries.
+    T_ref/Eact apply the Arrhenius scaling of j0 as in eta_total, so a (1, n_T)
+    row of temperatures gives an (n, n_T) temperature map.
+
+    Returns:
+      eta (V), array of the broadcast shape
+    """
+    j, epsilon, delta = np.asarray(j, dtype=float), np.asarray(epsilon, dtype=float), np.asarray(delta, dtype=float)
+
+    # 1) Tafel Activation
+    if T_ref is not None:
+        j0 = arrhenius_j0(j0, T, T_ref, Eact, R)
+    L = rho_cat * delta * (1 - epsilon)
+    j0_geo = j0 * S_cat * L * (1 - epsilon)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        val = j / j0_geo
+        eta_act = (R * T / (alpha * n * F)) * np.log(val)
+    act_ok = (j0_geo > 1e-15) & (val > 0)
+
+    # 2) Concentration Overpotential
+    D_eff = (epsilon / tau) * D
+    j_lim = (n * F * D_eff * C_bulk) / delta
+    part = 1 - (j / j_lim)
+    conc_ok = (j_lim > j) & (j_lim > 0) & (part > 1e-15)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        eta_conc = np.where(conc_ok, (R * T) / (n * F) * np.log(np.where(conc_ok, part, 1.0)), 1e6)
+
+    return np.where(act_ok, eta_act + eta_conc, 1e6)
+
+
 #notes:
 # 1) Tafel Activation
 # 2) Concentration Overpotential
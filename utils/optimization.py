@@ -1,5 +1,11 @@
 # utils/optimization.py
 
+import hashlib
+import pickle
+import time
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
+
 import numpy as np
 
 # Pareto-based algorithms
@@ -9,12 +15,24 @@ from pymoo.algorithms.moo.moead import MOEAD
 
 # Single-objective GA
 from pymoo.algorithms.soo.nonconvex.ga import GA
+from pymoo.operators.sampling.rnd import FloatRandomSampling
 
 from pymoo.termination import get_termination
-from pymoo.core.problem import ElementwiseProblem
+from pymoo.core.population import Population
+from pymoo.core.problem import ElementwiseProblem, Problem
+from pymoo.core.repair import Repair
 from pymoo.optimize import minimize
+from pymoo.decomposition.pbi import PBI
+from pymoo.util.ref_dirs import get_reference_directions
+from pymoo.util.reference_direction import get_partition_closest_to_points
 
-from utils.models import cost_function, eta_total
+from utils.checkpoint import CHECKPOINT_INTERVAL, Checkpointer, load_checkpoint, resume_run
+from utils.fidelity import CatalystScreening, MultiFidelityProblem, fidelity_problem, full_fidelity_front
+from utils.memo import memo_problem, memo_stats
+from utils.models import cost_function, eta_total, eta_total_array
+from utils.profiling import RunProfiler, minimize_hooks
+from utils.seeds import DEFAULT_SEED, ENSEMBLE_STREAM, child_seed, lineage
+from utils.uncertainty import robust_statistic, sample_parameters
 
 ###############################################################################
 # PEMProblem with 21 + 1 (hard j_lim) constraints = 22 total
@@ -35,7 +53,22 @@ class PEMProblem(ElementwiseProblem):
       - Cathode (9 constraints)
       - Global (3 constraints)
       - Hard mass transport constraint: j <= j_lim_global (1 constraint)
+
+    short_circuit=True evaluates the cheap constraints (bounds, effective
+    surface, loading, j range and j_lim) first and skips both eta_total calls
+    for designs that already violate one of them. Those rows get
+    F1 = ETA_PENALTY and g_eta = 0: they stay infeasible, so pymoo still ranks
+    every feasible design ahead of them, and infeasible designs are compared
+    by the violation of the cheap constraints only. n_evaluated and
+    n_short_circuited count the evaluations.
+
+    T_ref makes the exchange current densities temperature dependent:
+    j0_a/j0_c are then taken at T_ref and scaled to T with the Arrhenius law
+    (activation energies Eact_a/Eact_c, see models.arrhenius_j0). With
+    T_ref=None (default) j0 is used as given.
     """
+    ETA_PENALTY = 1e6  # same penalty eta_total uses for invalid designs
+
     def __init__(self,
                  A_cell, j, R, T, alpha, n, F,
                  # Anode parameters
@@ -62,7 +95,10 @@ class PEMProblem(ElementwiseProblem):
                  # Global constraints
                  j_min, j_max,
                  # Total number of constraints: 9+9+3+1 = 22
-                 n_var=6, n_obj=2, n_constr=22):
+                 n_var=6, n_obj=2, n_constr=22,
+                 short_circuit=False,
+                 # Temperature dependence of j0
+                 T_ref=None, Eact_a=76000.0, Eact_c=76000.0):
         super().__init__(
             n_var=n_var,
             n_obj=n_obj,
@@ -114,6 +150,18 @@ class PEMProblem(ElementwiseProblem):
 
         self.j_min, self.j_max = j_min, j_max
 
+        self.T_ref = T_ref
+        self.Eact_a, self.Eact_c = Eact_a, Eact_c
+
+        self.short_circuit = short_circuit
+        self.n_evaluated = 0
+        self.n_short_circuited = 0
+
+    @property
+    def short_circuit_rate(self):
+        """Share of evaluations that skipped the overpotential model."""
+        return self.n_short_circuited / self.n_evaluated if self.n_evaluated else 0.0
+
     def _evaluate(self, x, out, *args, **kwargs):
         delta_a, eps_a, Scat_a, delta_c, eps_c, Scat_c = x
 
@@ -122,23 +170,6 @@ class PEMProblem(ElementwiseProblem):
         cost_c = cost_function(self.rho_cat_c, delta_c, eps_c, self.A_cell, self.c_cat_c)
         cost_total = cost_a + cost_c
 
-        # Calculate overpotential
-        eta_a = eta_total(
-            j=self.j, j0=self.j0_a, S_cat=Scat_a, epsilon=eps_a, delta=delta_a,
-            a=self.a_a, b=self.b_a, T=self.T, rho_cat=self.rho_cat_a,
-            C_bulk=self.C_bulk_a, D=self.D_a, tau=self.tau_a,
-            alpha=self.alpha, R=self.R, n=self.n, F=self.F
-        )
-        eta_c = eta_total(
-            j=self.j, j0=self.j0_c, S_cat=Scat_c, epsilon=eps_c, delta=delta_c,
-            a=self.a_c, b=self.b_c, T=self.T, rho_cat=self.rho_cat_c,
-            C_bulk=self.C_bulk_c, D=self.D_c, tau=self.tau_c,
-            alpha=self.alpha, R=self.R, n=self.n, F=self.F
-        )
-        eta_sum = eta_a + eta_c
-
-        out["F"] = [cost_total, eta_sum]
-
         # Build constraints
         G = []
         # --- Anode (9 constraints)
@@ -177,11 +208,9 @@ class PEMProblem(ElementwiseProblem):
               g_eff_c,
               g_Lc_min, g_Lc_max]
 
-        # --- Global constraints (3 constraints)
+        # --- Global constraints on j (g_eta follows once eta is known)
         g_j_min = self.j_min - self.j
         g_j_max = self.j - self.j_max
-        g_eta = eta_sum - self.eta_max
-        G += [g_j_min, g_j_max, g_eta]
 
         # --- Hard current transport constraint:
         # Compute limiting current for anode and cathode:
@@ -189,94 +218,886 @@ class PEMProblem(ElementwiseProblem):
         j_lim_c = (self.n * self.F * (eps_c / self.tau_c) * self.D_c * self.C_bulk_c) / (delta_c + 1e-15)
         j_lim_global = min(j_lim_a, j_lim_c)
         g_jlim = self.j - j_lim_global   # require j <= j_lim_global
+
+        self.n_evaluated += 1
+        if self.short_circuit and max(max(G), g_j_min, g_j_max, g_jlim) > 0:
+            # Already infeasible: skip the overpotential model
+            self.n_short_circuited += 1
+            eta_sum = self.ETA_PENALTY
+            g_eta = 0.0
+        else:
+            # Calculate overpotential
+            eta_a = eta_total(
+                j=self.j, j0=self.j0_a, S_cat=Scat_a, epsilon=eps_a, delta=delta_a,
+                a=self.a_a, b=self.b_a, T=self.T, rho_cat=self.rho_cat_a,
+                C_bulk=self.C_bulk_a, D=self.D_a, tau=self.tau_a,
+                alpha=self.alpha, R=self.R, n=self.n, F=self.F,
+                T_ref=self.T_ref, Eact=self.Eact_a
+            )
+            eta_c = eta_total(
+                j=self.j, j0=self.j0_c, S_cat=Scat_c, epsilon=eps_c, delta=delta_c,
+                a=self.a_c, b=self.b_c, T=self.T, rho_cat=self.rho_cat_c,
+                C_bulk=self.C_bulk_c, D=self.D_c, tau=self.tau_c,
+                alpha=self.alpha, R=self.R, n=self.n, F=self.F,
+                T_ref=self.T_ref, Eact=self.Eact_c
+            )
+            eta_sum = eta_a + eta_c
+            g_eta = eta_sum - self.eta_max
+
+        out["F"] = [cost_total, eta_sum]
+
+        # --- Global constraints (3 constraints)
+        G += [g_j_min, g_j_max, g_eta]
         G.append(g_jlim)
 
         out["G"] = G
 
+    # ------------------------------------------------------------------
+    # Vectorized helpers for batch problems built on top of PEMProblem
+    # ------------------------------------------------------------------
+    def cost_array(self, X, **overrides):
+        """
+        Total catalyst cost for a population X (n, 6) -> (n,)
+        rho_cat_a/c and c_cat_a/c may be overridden, e.g. with per-individual (n,) arrays.
+        """
+        X = np.asarray(X, dtype=float)
+        par = lambda name: overrides.get(name, getattr(self, name))
+        return (cost_function(par("rho_cat_a"), X[:, 0], X[:, 1], self.A_cell, par("c_cat_a"))
+                + cost_function(par("rho_cat_c"), X[:, 3], X[:, 4], self.A_cell, par("c_cat_c")))
+
+    def eta_array(self, X, j=None, **overrides):
+        """
+        Total overpotential (anode + cathode) for a population X (n, 6).
+
+        j and any model parameter given in overrides (T, T_ref, j0_a, rho_cat_a,
+        C_bulk_c, D_c, tau_a, ...) are broadcast against the (n, 1) design columns, so a
+        (1, m) row of values returns an (n, m) map. j defaults to self.j.
+        """
+        X = np.asarray(X, dtype=float)
+        par = lambda name: overrides.get(name, getattr(self, name))
+        j = self.j if j is None else j
+        T = par("T")
+        common = dict(alpha=self.alpha, R=self.R, n=self.n, F=self.F, T_ref=par("T_ref"))
+        eta_a = eta_total_array(j, par("j0_a"), X[:, 2:3], X[:, 1:2], X[:, 0:1], T, par("rho_cat_a"),
+                                par("C_bulk_a"), par("D_a"), par("tau_a"), Eact=par("Eact_a"), **common)
+        eta_c = eta_total_array(j, par("j0_c"), X[:, 5:6], X[:, 4:5], X[:, 3:4], T, par("rho_cat_c"),
+                                par("C_bulk_c"), par("D_c"), par("tau_c"), Eact=par("Eact_c"), **common)
+        return eta_a + eta_c
+
+    def design_constraints(self, X, **overrides):
+        """
+        The 18 anode and cathode constraints of _evaluate for a population X (n, 6) -> (n, 18)
+        rho_cat_a/c may be overridden, e.g. with per-individual (n,) arrays.
+        """
+        X = np.asarray(X, dtype=float)
+        par = lambda name: overrides.get(name, getattr(self, name))
+        cols = []
+        electrodes = (
+            (X[:, 0], X[:, 1], X[:, 2], self.eps_a_min, self.eps_a_max, self.delta_a_min, self.delta_a_max,
+             self.Scat_a_min, self.Scat_a_max, self.SA_a_min, par("rho_cat_a"), self.L_a_min, self.L_a_max),
+            (X[:, 3], X[:, 4], X[:, 5], self.eps_c_min, self.eps_c_max, self.delta_c_min, self.delta_c_max,
+             self.Scat_c_min, self.Scat_c_max, self.SA_c_min, par("rho_cat_c"), self.L_c_min, self.L_c_max),
+        )
+        for delta, eps, Scat, eps_min, eps_max, d_min, d_max, s_min, s_max, SA_min, rho, L_min, L_max in electrodes:
+            L = rho * delta * (1.0 - eps)
+            cols += [eps_min - eps, eps - eps_max,
+                     d_min - delta, delta - d_max,
+                     s_min - Scat, Scat - s_max,
+                     SA_min - Scat * (1.0 - eps) * delta,
+                     L_min - L, L - L_max]
+        return np.column_stack(cols)
+
+    def limiting_current(self, X, **overrides):
+        """
+        Global limiting current density min(j_lim_a, j_lim_c) for a population X (n, 6) -> (n,)
+
+        Overrides (D_a, tau_c, C_bulk_c, ...) broadcast against the (n, 1)
+        design columns as in eta_array; a (1, m) row returns an (n, m) map.
+        """
+        X = np.asarray(X, dtype=float)
+        par = lambda name: overrides.get(name, getattr(self, name))
+        j_lim_a = (self.n * self.F * (X[:, 1:2] / par("tau_a")) * par("D_a") * par("C_bulk_a")) / (X[:, 0:1] + 1e-15)
+        j_lim_c = (self.n * self.F * (X[:, 4:5] / par("tau_c")) * par("D_c") * par("C_bulk_c")) / (X[:, 3:4] + 1e-15)
+        j_lim = np.minimum(j_lim_a, j_lim_c)
+        return j_lim[:, 0] if j_lim.shape[1] == 1 else j_lim
+
+    def temperature_map(self, X, T_grid, **overrides):
+        """
+        Temperature sensitivity of a set of designs X (n, 6), e.g. a Pareto set,
+        in one (n x n_T) broadcast call.
+
+        j0 follows the Arrhenius law with reference T_ref (self.T if T_ref is
+        None), so the map also covers problems set up without T_ref.
+        Per-design material parameters (j0_a, Eact_a, rho_cat_a, ... as (n,)
+        arrays) may be given as overrides, see MaterialChoiceProblem.temperature_map.
+
+        Returns a dict:
+          - T        : (n_T,) temperatures (K)
+          - eta      : (n, n_T) total overpotential (V)
+          - feasible : (n, n_T) design constraints, eta <= eta_max and j <= j_lim all met
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        T_grid = np.asarray(T_grid, dtype=float).ravel()
+        T_ref = self.T if self.T_ref is None else self.T_ref
+        columns = {name: np.asarray(value, dtype=float)[:, None] for name, value in overrides.items()}
+        eta = self.eta_array(X, T=T_grid[None, :], T_ref=T_ref, **columns)
+        static_ok = ((self.design_constraints(X, **overrides) <= 0).all(axis=1)
+                     & (self.j_min <= self.j) & (self.j <= self.j_max)
+                     & (self.j <= self.limiting_current(X)))
+        return dict(T=T_grid, eta=eta, feasible=static_ok[:, None] & (eta <= self.eta_max))
+
+
+###############################################################################
+# Temperature as a decision variable
+###############################################################################
+class TemperatureProblem(Problem):
+    """
+    Catalyst layer problem with the operating temperature as a 7th decision variable:
+      x = [delta_a, eps_a, S_cat_a, delta_c, eps_c, S_cat_c, T]
+
+    The population is evaluated in one vectorized call with j0 scaled to each
+    individual's T (Arrhenius, reference T_ref of the base problem, or its T
+    if T_ref is None). Objectives and the 22 constraints are those of PEMProblem.
+
+    Parameters:
+      - base     : PEMProblem providing the model parameters and design bounds
+      - T_bounds : (T_min, T_max) in K
+    """
+    def __init__(self, base, T_bounds):
+        xl = np.append(base.xl, T_bounds[0])
+        xu = np.append(base.xu, T_bounds[1])
+        super().__init__(n_var=base.n_var + 1, n_obj=base.n_obj, n_constr=base.n_constr, xl=xl, xu=xu)
+        self.base = base
+        self.T_ref = base.T if base.T_ref is None else base.T_ref
+
+    def _evaluate(self, X, out, *args, **kwargs):
+        single = np.ndim(X) == 1
+        X = np.atleast_2d(X)
+        p = self.base
+        Xd, T = X[:, :p.n_var], X[:, p.n_var]
+
+        eta = p.eta_array(Xd, T=T[:, None], T_ref=self.T_ref)[:, 0]
+        n = len(X)
+        G = np.column_stack([
+            p.design_constraints(Xd),
+            np.full(n, p.j_min - p.j),
+            np.full(n, p.j - p.j_max),
+            eta - p.eta_max,
+            p.j - p.limiting_current(Xd),
+        ])
+        F = np.column_stack([p.cost_array(Xd), eta])
+
+        if single:
+            F, G = F[0], G[0]
+        out["F"] = F
+        out["G"] = G
+
+
+###############################################################################
+# Catalyst choice as integer decision variables
+###############################################################################
+class IntegerRepair(Repair):
+    """
+    Rounds the given columns of the offspring to integers within the problem
+    bounds (the rest stays continuous).
+    """
+    def __init__(self, columns):
+        super().__init__()
+        self.columns = list(columns)
+
+    def _do(self, problem, X, **kwargs):
+        X = np.array(X, dtype=float)
+        cols = self.columns
+        # a value on a half-integer bound (e.g. n - 0.5) may round outside it
+        X[:, cols] = np.clip(np.round(X[:, cols]), np.ceil(problem.xl[cols]), np.floor(problem.xu[cols]))
+        return X
+
+
+class MaterialChoiceProblem(Problem):
+    """
+    Catalyst layer problem with the catalyst materials as integer decision variables:
+      x = [delta_a, eps_a, S_cat_a, delta_c, eps_c, S_cat_c, i_a, i_c]
+    where i_a / i_c index the rows of the anode / cathode material tables
+    (structured arrays, see utils/catalysts.py).
+
+    Material properties (rho_cat, c_cat, j0, Eact) are gathered per individual
+    with integer indexing, so one vectorized evaluation covers every material
+    combination in the population. Objectives and the 22 constraints are those
+    of PEMProblem. Non-integer indices are rounded; run the algorithm with
+    IntegerRepair(problem.integer_vars) to keep the population on integers.
+
+    Parameters:
+      - base           : PEMProblem providing the operating parameters and design bounds
+      - anode_table    : anode materials (catalyst_table("anode"))
+      - cathode_table  : cathode materials (catalyst_table("cathode"))
+    """
+    def __init__(self, base, anode_table, cathode_table):
+        # each index owns a unit-wide interval, so rounding gives every material the same
+        # share of sampled / mutated values (bounds [0, n-1] halve it for the first and last)
+        xl = np.append(base.xl, [-0.5, -0.5])
+        xu = np.append(base.xu, [len(anode_table) - 0.5, len(cathode_table) - 0.5])
+        super().__init__(n_var=base.n_var + 2, n_obj=base.n_obj, n_constr=base.n_constr, xl=xl, xu=xu)
+        self.base = base
+        self.anode_table = anode_table
+        self.cathode_table = cathode_table
+        self.integer_vars = [base.n_var, base.n_var + 1]
+
+    def material_indices(self, X):
+        X = np.atleast_2d(X)
+        i_a = np.clip(np.round(X[:, self.integer_vars[0]]), 0, len(self.anode_table) - 1).astype(int)
+        i_c = np.clip(np.round(X[:, self.integer_vars[1]]), 0, len(self.cathode_table) - 1).astype(int)
+        return i_a, i_c
+
+    def material_names(self, X):
+        """
+        (anode, cathode) material names of every row of X.
+        """
+        i_a, i_c = self.material_indices(X)
+        return list(zip(self.anode_table["name"][i_a], self.cathode_table["name"][i_c]))
+
+    def temperature_map(self, X, T_grid):
+        """
+        PEMProblem.temperature_map of designs X (n, 8) with each row's own
+        anode and cathode material.
+        """
+        X = np.atleast_2d(X)
+        i_a, i_c = self.material_indices(X)
+        mat_a = self.anode_table[i_a]
+        mat_c = self.cathode_table[i_c]
+        return self.base.temperature_map(X[:, :self.base.n_var], T_grid,
+                                         j0_a=mat_a["j0"], j0_c=mat_c["j0"], Eact_a=mat_a["Eact"],
+                                         Eact_c=mat_c["Eact"], rho_cat_a=mat_a["rho_cat"],
+                                         rho_cat_c=mat_c["rho_cat"])
+
+    def _evaluate(self, X, out, *args, **kwargs):
+        single = np.ndim(X) == 1
+        X = np.atleast_2d(X)
+        p = self.base
+        Xd = X[:, :p.n_var]
+        i_a, i_c = self.material_indices(X)
+        mat_a = self.anode_table[i_a]
+        mat_c = self.cathode_table[i_c]
+        rho = dict(rho_cat_a=mat_a["rho_cat"], rho_cat_c=mat_c["rho_cat"])
+
+        cost = p.cost_array(Xd, c_cat_a=mat_a["c_cat"], c_cat_c=mat_c["c_cat"], **rho)
+        eta = p.eta_array(Xd, j0_a=mat_a["j0"][:, None], j0_c=mat_c["j0"][:, None],
+                          Eact_a=mat_a["Eact"][:, None], Eact_c=mat_c["Eact"][:, None],
+                          rho_cat_a=rho["rho_cat_a"][:, None], rho_cat_c=rho["rho_cat_c"][:, None])[:, 0]
+        n = len(X)
+        G = np.column_stack([
+            p.design_constraints(Xd, **rho),
+            np.full(n, p.j_min - p.j),
+            np.full(n, p.j - p.j_max),
+            eta - p.eta_max,
+            p.j - p.limiting_current(Xd),
+        ])
+        F = np.column_stack([cost, eta])
+
+        if single:
+            F, G = F[0], G[0]
+        out["F"] = F
+        out["G"] = G
+
+
+def repair_kwargs(problem):
+    """
+    Algorithm keyword arguments that keep the integer variables of a problem
+    (its `integer_vars`, e.g. MaterialChoiceProblem) on integer values.
+    """
+    columns = getattr(problem, "integer_vars", None)
+    return dict(repair=IntegerRepair(columns)) if columns else {}
+
+
+###############################################################################
+# Robust optimization over an ensemble of uncertain parameters
+###############################################################################
+class RobustProblem(Problem):
+    """
+    Catalyst layer problem under parameter uncertainty.
+
+    Each design is evaluated over a fixed ensemble of parameter draws in one
+    broadcast (pop x n_samples) call and the overpotential objective becomes
+    a robust statistic of the ensemble (utils/uncertainty.py). The ensemble
+    is drawn once when the problem is built (common random numbers): every
+    generation sees the same draws, so the objective is deterministic.
+
+    Parameters:
+      - base      : PEMProblem providing the nominal parameters and bounds
+      - uncertain : dict parameter name -> (distribution, p1, p2), e.g.
+                    {"D_c": ("loguniform", 2e-6, 2e-4), "j0_a": ("loguniform", 1e-4, 1e-1)};
+                    any parameter of eta_array/limiting_current (D_*, tau_*,
+                    C_bulk_*, j0_*, T, ...)
+      - n_samples : ensemble size
+      - sampler   : "sobol" (quasi-Monte Carlo) or "mc"
+      - measure   : "mean", "mean_std" (mean + k*std), "cvar" (mean of the worst
+                    1-alpha tail) or "worst"
+      - seed      : seed of the ensemble (run_optimization: the ENSEMBLE_STREAM
+                    child of the run seed unless given)
+
+    Cost is deterministic. Constraints keep the 22-column layout of
+    PEMProblem; the eta and j_lim constraints use the same robust statistic
+    of eta_k - eta_max and j - j_lim_k over the ensemble.
+    """
+    def __init__(self, base, uncertain, n_samples=64, sampler="sobol", measure="mean_std",
+                 k=1.0, alpha=0.9, seed=1):
+        super().__init__(n_var=base.n_var, n_obj=base.n_obj, n_constr=base.n_constr, xl=base.xl, xu=base.xu)
+        self.base = base
+        self.uncertain = dict(uncertain)
+        self.seed = seed
+        self.samples = sample_parameters(self.uncertain, n_samples, sampler, seed)
+        self.measure, self.k, self.alpha = measure, k, alpha
+
+    def ensemble(self, X):
+        """
+        eta (n, n_samples) and j_lim (n, n_samples) of designs X over the ensemble.
+        """
+        X = np.atleast_2d(X)
+        draws = {name: values[None, :] for name, values in self.samples.items()}
+        eta = self.base.eta_array(X, **draws)
+        j_lim = self.base.limiting_current(X, **draws)
+        if j_lim.ndim == 1:   # no uncertain parameter affects j_lim: one (n,) column
+            j_lim = j_lim[:, None]
+        return eta, np.broadcast_to(j_lim, eta.shape)
+
+    def statistic(self, values):
+        return robust_statistic(values, self.measure, self.k, self.alpha)
+
+    def _evaluate(self, X, out, *args, **kwargs):
+        single = np.ndim(X) == 1
+        X = np.atleast_2d(X)
+        p = self.base
+
+        eta, j_lim = self.ensemble(X)
+        n = len(X)
+        G = np.column_stack([
+            p.design_constraints(X),
+            np.full(n, p.j_min - p.j),
+            np.full(n, p.j - p.j_max),
+            self.statistic(eta - p.eta_max),
+            self.statistic(p.j - j_lim),
+        ])
+        F = np.column_stack([p.cost_array(X), self.statistic(eta)])
+
+        if single:
+            F, G = F[0], G[0]
+        out["F"] = F
+        out["G"] = G
+
+
+###############################################################################
+# Polarization curve: each design evaluated over a vector of j values
+###############################################################################
+class PolarizationProblem(Problem):
+    """
+    Catalyst layer problem evaluated over a set of operating points.
+
+    Every design in the population is evaluated at all current densities in
+    j_points in one broadcast (pop x n_j) call, using the parameters of the
+    wrapped PEMProblem.
+
+    Parameters:
+      - base      : PEMProblem providing the model parameters and bounds
+      - j_points  : (n_j,) current densities (A/cm²), e.g. a polarization curve
+      - weights   : (n_j,) weight of each point, e.g. hours per year in a duty
+                    cycle; uniform if None
+      - objective : "overpotential" -> F1 = weighted mean of eta_a + eta_c (V)
+                    "energy"        -> F1 = sum_k w_k * j_k * eta_k * A_cell, the
+                                       overpotential loss (W, or Wh if the
+                                       weights are hours)
+
+    Constraints keep the 22-column layout of PEMProblem, evaluated at the
+    extreme operating points: j_min <= min(j), max(j) <= j_max,
+    max_k eta_k <= eta_max and max(j) <= j_lim.
+    """
+    def __init__(self, base, j_points, weights=None, objective="overpotential"):
+        super().__init__(n_var=base.n_var, n_obj=base.n_obj, n_constr=base.n_constr, xl=base.xl, xu=base.xu)
+        if objective not in ("overpotential", "energy"):
+            raise ValueError(f"Unknown polarization objective: {objective}")
+        self.base = base
+        self.j_points = np.asarray(j_points, dtype=float).ravel()
+        w = np.ones_like(self.j_points) if weights is None else np.asarray(weights, dtype=float).ravel()
+        if w.shape != self.j_points.shape:
+            raise ValueError("weights must have one entry per j point")
+        self.weights = w
+        self.objective = objective
+
+    def _evaluate(self, X, out, *args, **kwargs):
+        # single decision vectors are accepted too (scalarization wrappers, create_full_dataframe)
+        single = np.ndim(X) == 1
+        X = np.atleast_2d(X)
+        p = self.base
+
+        cost = p.cost_array(X)
+        eta = p.eta_array(X, j=self.j_points[None, :])            # (pop, n_j)
+        if self.objective == "overpotential":
+            f_eta = eta @ self.weights / self.weights.sum()
+        else:
+            f_eta = eta @ (self.weights * self.j_points) * p.A_cell
+
+        n = len(X)
+        G = np.column_stack([
+            p.design_constraints(X),
+            np.full(n, p.j_min - self.j_points.min()),
+            np.full(n, self.j_points.max() - p.j_max),
+            eta.max(axis=1) - p.eta_max,
+            self.j_points.max() - p.limiting_current(X),
+        ])
+        F = np.column_stack([cost, f_eta])
+
+        if single:
+            F, G = F[0], G[0]
+        out["F"] = F
+        out["G"] = G
+
+
 ###############################################################################
 # Scalarization: Weighted Sum & Goal Seeking
 ###############################################################################
-def weighted_sum_optimization(base_problem, w1=0.5, w2=0.5):
-    class WeightedSumProblem(ElementwiseProblem):
-        def __init__(self, p, w1, w2):
-            super().__init__(
-                n_var=p.n_var,
-                n_obj=1,
-                n_constr=p.n_constr,
-                xl=p.xl,
-                xu=p.xu
-            )
-            self.base = p
-            self.w1 = w1
-            self.w2 = w2
-
-        def _evaluate(self, x, out, *args, **kwargs):
-            out_mo = {}
-            self.base._evaluate(x, out_mo, *args, **kwargs)
-            cost = out_mo["F"][0]
-            eta = out_mo["F"][1]
-            f = self.w1 * cost + self.w2 * eta
-            out["F"] = [f]
-            out["G"] = out_mo["G"]
-
-    prob = WeightedSumProblem(base_problem, w1, w2)
-    algo = GA(pop_size=30)
-    term = get_termination("n_gen", 30)
-    return minimize(prob, algo, term, seed=1, verbose=False)
-
-
-def goal_seeking_optimization(base_problem, goals=(10.0, 0.5)):
-    class GoalProblem(ElementwiseProblem):
-        def __init__(self, p, goals):
-            super().__init__(
-                n_var=p.n_var,
-                n_obj=p.n_obj,
-                n_constr=p.n_constr,
-                xl=p.xl,
-                xu=p.xu
-            )
-            self.base = p
-            self.c_goal, self.eta_goal = goals
-
-        def _evaluate(self, x, out, *args, **kwargs):
-            out_mo = {}
-            self.base._evaluate(x, out_mo, *args, **kwargs)
-            cost = out_mo["F"][0]
-            eta = out_mo["F"][1]
-            f = (cost - self.c_goal)**2 + (eta - self.eta_goal)**2
-            out["F"] = [f]
-            out["G"] = out_mo["G"]
-
-    prob = GoalProblem(base_problem, goals)
-    algo = GA(pop_size=30)
-    term = get_termination("n_gen", 30)
-    return minimize(prob, algo, term, seed=1, verbose=False)
+SCALAR_POP_SIZE = 30
+SCALAR_N_GEN = 30
+RESTART_N_GEN = 10        # generations of a run seeded from an archive
+ARCHIVE_SIZE = 100_000    # rows kept by an EvaluationArchive (oldest overwritten)
+
+
+class EvaluationArchive:
+    """
+    Raw objectives (cost, eta) and constraints of every design evaluated by a
+    scalarized problem, in preallocated arrays that grow up to max_size rows
+    (then the oldest rows are overwritten).
+
+    The weights and goals only enter the scalarization, so after a change of
+    w1 or of the goals the archived designs are re-ranked without evaluating
+    the model again (rank / best), and the next run starts from the best of
+    them (weighted_sum_setup / goal_seeking_setup with archive=...).
+
+    `key` identifies the base problem (see run_optimization); an archive is
+    only reused for the same key.
+    """
+    def __init__(self, n_var, n_obj, n_constr, key=None, max_size=ARCHIVE_SIZE):
+        self.key = key
+        self.max_size = max_size
+        size = min(256, max_size)
+        self.X = np.empty((size, n_var))
+        self.F = np.empty((size, n_obj))
+        self.G = np.empty((size, n_constr))
+        self.n_added = 0
+
+    def __len__(self):
+        return min(self.n_added, self.max_size)
+
+    def add(self, x, F, G):
+        i = self.n_added % self.max_size
+        if i >= len(self.X):
+            size = min(2 * len(self.X), self.max_size)
+            self.X, self.F, self.G = (np.resize(a, (size, a.shape[1])) for a in (self.X, self.F, self.G))
+        self.X[i], self.F[i], self.G[i] = x, F, G
+        self.n_added += 1
+
+    def rank(self, scalarize):
+        """
+        Archive rows ordered best first under scalarize(F) -> f: feasible rows
+        by f, then infeasible rows by their constraint violation.
+        """
+        n = len(self)
+        f = scalarize(self.F[:n])
+        cv = np.sum(np.maximum(self.G[:n], 0.0), axis=1)
+        return np.lexsort((f, cv))
+
+    def best(self, scalarize, n=1):
+        """
+        X, F (raw), G of the n best distinct archived designs under scalarize.
+        """
+        order = self.rank(scalarize)
+        _, first = np.unique(self.X[order], axis=0, return_index=True)
+        rows = order[np.sort(first)[:n]]
+        return self.X[rows], self.F[rows], self.G[rows]
+
+
+class ScalarizedProblem(ElementwiseProblem, ABC):
+    """
+    Single objective scalarize(cost, eta) of a two-objective base problem, with
+    its constraints. Every evaluation is recorded in `archive` if given.
+    Subclasses define scalarize.
+    """
+    def __init__(self, p, archive=None):
+        super().__init__(
+            n_var=p.n_var,
+            n_obj=1,
+            n_constr=p.n_constr,
+            xl=p.xl,
+            xu=p.xu
+        )
+        self.base = p
+        self.archive = archive
+
+    @abstractmethod
+    def scalarize(self, F):
+        """
+        Scalar objective of raw objective rows F (n, 2) -> (n,).
+        """
+
+    def _evaluate(self, x, out, *args, **kwargs):
+        out_mo = {}
+        self.base._evaluate(x, out_mo, *args, **kwargs)
+        F = np.asarray(out_mo["F"], dtype=float).ravel()
+        out["F"] = [self.scalarize(F[None, :])[0]]
+        out["G"] = out_mo["G"]
+        if self.archive is not None:
+            self.archive.add(x, F, np.ravel(out_mo["G"]))
+
+
+class WeightedSumProblem(ScalarizedProblem):
+    """
+    w1 * cost + w2 * eta of a two-objective base problem, with its constraints.
+    """
+    def __init__(self, p, w1, w2, archive=None):
+        super().__init__(p, archive)
+        self.w1 = w1
+        self.w2 = w2
+
+    def scalarize(self, F):
+        return self.w1 * F[:, 0] + self.w2 * F[:, 1]
+
+
+class GoalProblem(ScalarizedProblem):
+    """
+    Squared distance of (cost, eta) to the goals (c_goal, eta_goal), with the
+    constraints of the base problem.
+    """
+    def __init__(self, p, goals, archive=None):
+        super().__init__(p, archive)
+        self.c_goal, self.eta_goal = goals
+
+    def scalarize(self, F):
+        return (F[:, 0] - self.c_goal)**2 + (F[:, 1] - self.eta_goal)**2
+
+
+def _scalar_algorithm(prob, base_problem):
+    """
+    GA and termination of a scalarized run. With a non-empty archive the
+    initial population is the best archived designs under the problem's
+    scalarization (already evaluated, topped up with random designs) and the
+    run is shortened to RESTART_N_GEN generations.
+    """
+    archive = prob.archive
+    if archive is None or len(archive) == 0:
+        return GA(pop_size=SCALAR_POP_SIZE, **repair_kwargs(base_problem)), get_termination("n_gen", SCALAR_N_GEN)
+    X, F, G = archive.best(prob.scalarize, SCALAR_POP_SIZE)
+    pop = Population.new(X=X, F=prob.scalarize(F)[:, None], G=G, H=np.zeros((len(X), 0)))
+    pop.apply(lambda ind: ind.evaluated.update(("F", "G", "H")))
+    if len(pop) < SCALAR_POP_SIZE:
+        pop = Population.merge(pop, FloatRandomSampling()(prob, SCALAR_POP_SIZE - len(pop)))
+    algo = GA(pop_size=SCALAR_POP_SIZE, sampling=pop, **repair_kwargs(base_problem))
+    return algo, get_termination("n_gen", RESTART_N_GEN)
+
+
+def weighted_sum_setup(base_problem, w1=0.5, w2=0.5, archive=None):
+    """
+    Problem, algorithm and termination of a weighted-sum run (restarted from
+    `archive`, an EvaluationArchive, if it holds evaluations).
+    """
+    prob = WeightedSumProblem(base_problem, w1, w2, archive)
+    algo, term = _scalar_algorithm(prob, base_problem)
+    return prob, algo, term
+
+
+def weighted_sum_optimization(base_problem, w1=0.5, w2=0.5, profiler=None, callback=None, seed=DEFAULT_SEED,
+                              archive=None):
+    prob, algo, term = weighted_sum_setup(base_problem, w1, w2, archive)
+    return minimize(prob, algo, term, seed=seed, verbose=False, **minimize_hooks(profiler, callback))
+
+
+def goal_seeking_setup(base_problem, goals=(10.0, 0.5), archive=None):
+    """
+    Problem, algorithm and termination of a goal-seeking run (restarted from
+    `archive`, an EvaluationArchive, if it holds evaluations).
+    """
+    prob = GoalProblem(base_problem, goals, archive)
+    algo, term = _scalar_algorithm(prob, base_problem)
+    return prob, algo, term
+
+
+def goal_seeking_optimization(base_problem, goals=(10.0, 0.5), profiler=None, callback=None, seed=DEFAULT_SEED,
+                              archive=None):
+    prob, algo, term = goal_seeking_setup(base_problem, goals, archive)
+    return minimize(prob, algo, term, seed=seed, verbose=False, **minimize_hooks(profiler, callback))
 
 ###############################################################################
 # Pareto-based: NSGA2, MOEA/D, SPEA2
 ###############################################################################
-def multiobjective_optimization(base_problem, method, pop_size=40, n_gen=30):
-    if method == "NSGA2":
-        alg = NSGA2(pop_size=pop_size)
-    elif method == "MOEA/D":
-        alg = MOEAD(pop_size=pop_size, n_neighbors=15, decomposition="pbi")
-    elif method == "SPEA2":
-        alg = SPEA2(pop_size=pop_size)
+class PenaltyProblem(Problem):
+    """
+    Unconstrained view of a constrained problem: F + penalty * CV for every
+    objective, where CV is the summed positive constraint violation.
+    """
+    def __init__(self, base, penalty=1e3):
+        super().__init__(n_var=base.n_var, n_obj=base.n_obj, n_constr=0, xl=base.xl, xu=base.xu)
+        self.base = base
+        self.penalty = penalty
+
+    def _evaluate(self, X, out, *args, **kwargs):
+        out_base = self.base.evaluate(X, return_values_of=["F", "G"], return_as_dictionary=True)
+        CV = np.sum(np.maximum(out_base["G"], 0.0), axis=1)
+        out["F"] = out_base["F"] + self.penalty * CV[:, None]
+
+
+def moead_setup(base_problem, pop_size=40, n_gen=30):
+    """
+    Penalized problem, MOEA/D algorithm and termination; see moead_optimization.
+    """
+    n_partitions = get_partition_closest_to_points(pop_size, base_problem.n_obj)
+    ref_dirs = get_reference_directions("uniform", base_problem.n_obj, n_partitions=n_partitions)
+    alg = MOEAD(ref_dirs=ref_dirs, n_neighbors=min(15, len(ref_dirs)), decomposition=PBI(),
+                **repair_kwargs(base_problem))
+    term = get_termination("n_gen", n_gen)
+    return PenaltyProblem(base_problem), alg, term
+
+
+def moead_finalize(res, base_problem):
+    """
+    Re-evaluate the final MOEA/D solutions on the constrained base problem and
+    keep the feasible ones (X/F/G are None if there are none).
+    """
+    if res.X is not None:
+        X = np.atleast_2d(res.X)
+        out = base_problem.evaluate(X, return_values_of=["F", "G"], return_as_dictionary=True)
+        feasible = np.all(out["G"] <= 0, axis=1)
+        if np.any(feasible):
+            res.X, res.F, res.G = X[feasible], out["F"][feasible], out["G"][feasible]
+        else:
+            res.X, res.F, res.G = None, None, None
+    return res
+
+
+def moead_optimization(base_problem, pop_size=40, n_gen=30, seed=DEFAULT_SEED, verbose=False, profiler=None, callback=None):
+    """
+    MOEA/D on a constrained problem.
+
+    pymoo's MOEAD needs explicit reference directions and does not accept
+    constraints, so the constraint violation is folded into the objectives as a
+    penalty during the search. The final solutions are re-evaluated on the
+    base problem and only the feasible ones are returned (X/F are None if
+    there are none, like the other algorithms).
+    """
+    prob, alg, term = moead_setup(base_problem, pop_size, n_gen)
+    res = minimize(prob, alg, term, seed=seed, verbose=verbose,
+                   **minimize_hooks(profiler, callback))
+    return moead_finalize(res, base_problem)
+
+
+def multiobjective_setup(base_problem, method, pop_size=40, n_gen=30):
+    """
+    Problem, algorithm and termination of an NSGA2 or SPEA2 run (MOEA/D: moead_setup).
+    """
+    repair = repair_kwargs(base_problem)
+    if method == "SPEA2":
+        alg = SPEA2(pop_size=pop_size, **repair)
     else:
-        alg = NSGA2(pop_size=pop_size)
+        alg = NSGA2(pop_size=pop_size, **repair)
     term = get_termination("n_gen", n_gen)
-    return minimize(base_problem, alg, term, seed=1, verbose=False)
+    return base_problem, alg, term
+
+
+def multiobjective_optimization(base_problem, method, pop_size=40, n_gen=30, profiler=None, callback=None,
+                                n_islands=1, seed=DEFAULT_SEED):
+    """
+    NSGA2, SPEA2 or MOEA/D on base_problem. n_islands > 1 runs NSGA2 as an
+    island model with pop_size split over that many processes (utils/islands.py),
+    each island on its own seed stream under `seed`.
+    """
+    if n_islands > 1:
+        if method != "NSGA2":
+            raise ValueError(f"The island model is only available for NSGA2, not {method}")
+        if profiler is not None or callback is not None:
+            raise ValueError("Profiling and generation callbacks are not available for island runs")
+        from utils.islands import island_nsga2
+        return island_nsga2(base_problem, n_islands, pop_size, n_gen, seed=seed,
+                            algorithm_kwargs=repair_kwargs(base_problem))
+    if method == "MOEA/D":
+        return moead_optimization(base_problem, pop_size, n_gen, seed=seed, profiler=profiler, callback=callback)
+    prob, alg, term = multiobjective_setup(base_problem, method, pop_size, n_gen)
+    return minimize(prob, alg, term, seed=seed, verbose=False, **minimize_hooks(profiler, callback))
+
+
+def optimization_setup(base_problem, category, method, scalar_params=None, pop_size=40, n_gen=30):
+    """
+    The run that run_optimization makes for category/method, unexecuted:
+    (problem, algorithm, termination, finalize), where finalize(res)
+    post-processes the pymoo Result (MOEA/D feasibility filter, else identity).
+    Used to drive the algorithm step by step (run_optimization_async).
+    """
+    scalar_params = scalar_params or {}
+    if category == "Scalarization":
+        if method == "Weighted Sum":
+            setup = weighted_sum_setup(base_problem, scalar_params.get("w1", 0.5), scalar_params.get("w2", 0.5))
+        elif method == "Goal Seeking":
+            setup = goal_seeking_setup(base_problem, scalar_params.get("goals", (10.0, 0.5)))
+        else:
+            raise ValueError(f"Unknown scalarization method: {method}")
+        return (*setup, lambda res: res)
+    if method == "MOEA/D":
+        return (*moead_setup(base_problem, pop_size, n_gen), lambda res: moead_finalize(res, base_problem))
+    return (*multiobjective_setup(base_problem, method, pop_size, n_gen), lambda res: res)
 
 ###############################################################################
 # Master run_optimization
 ###############################################################################
+def problem_key(kwargs):
+    """
+    Hash of the problem arguments of run_optimization (what build_problem
+    gets), identifying the evaluations an EvaluationArchive holds.
+    """
+    return hashlib.sha256(pickle.dumps(sorted(kwargs.items()), pickle.HIGHEST_PROTOCOL)).hexdigest()[:16]
+
+
+def build_problem(T_bounds=None, catalyst_tables=None, robust=None, j_points=None, j_weights=None,
+                  polarization_objective="overpotential", **kwargs):
+    """
+    The problem run_optimization optimizes: a PEMProblem built from kwargs,
+    wrapped for at most one of robust / catalyst_tables / T_bounds / j_points
+    (see run_optimization).
+    """
+    base_problem = PEMProblem(**kwargs)
+    if sum(v is not None for v in (T_bounds, j_points, catalyst_tables, robust)) > 1:
+        raise ValueError("Only one of T_bounds, j_points, catalyst_tables and robust can be given")
+    if robust is not None:
+        base_problem = RobustProblem(base_problem, **robust)
+    if catalyst_tables is not None:
+        base_problem = MaterialChoiceProblem(base_problem, *catalyst_tables)
+    if T_bounds is not None:
+        base_problem = TemperatureProblem(base_problem, T_bounds)
+    if j_points is not None:
+        base_problem = PolarizationProblem(base_problem, j_points, j_weights, polarization_objective)
+    return base_problem
+
+
+def seed_ensemble(kwargs, seed):
+    """
+    run_optimization kwargs with the robust ensemble seeded from the run seed:
+    robust["seed"] defaults to child_seed(seed, *ENSEMBLE_STREAM), so
+    another run seed also draws another ensemble.
+    """
+    robust = kwargs.get("robust")
+    if robust is None or "seed" in robust:
+        return kwargs
+    return dict(kwargs, robust=dict(robust, seed=child_seed(seed, *ENSEMBLE_STREAM)))
+
+
+def run_lineage(res, seed):
+    """
+    res.seed_lineage (lineage(seed) unless the run set one), plus the seed of
+    the robust ensemble if res.problem has one.
+    """
+    seeds = getattr(res, "seed_lineage", None) or lineage(seed)
+    robust = unwrap_problem(res.problem, "uncertain")
+    return seeds if robust is None else dict(seeds, ensemble=robust.seed)
+
+
+def unwrap_problem(problem, attr):
+    """
+    The first problem in a chain of wrappers (`.base`: PenaltyProblem,
+    MemoProblem, TemperatureProblem, ...) that has `attr`, or None.
+    """
+    while problem is not None and not hasattr(problem, attr):
+        problem = getattr(problem, "base", None)
+    return problem
+
+
+def _resume_optimization(path, category, method, checkpointer):
+    """
+    Continue the checkpointed run at path (see run_optimization).
+    """
+    state = load_checkpoint(path)
+    meta = state["meta"]
+    if (meta.get("category"), meta.get("method")) != (category, method):
+        raise ValueError(f"{path} is a checkpoint of {meta.get('category')} / {meta.get('method')}, "
+                         f"not {category} / {method}")
+    checkpointer.meta = meta   # keep the seed of the original run
+    res, _ = resume_run(state, checkpointer)
+    if method == "MOEA/D":
+        res = moead_finalize(res, res.problem.base)
+    if isinstance(res.problem, MultiFidelityProblem):
+        res = full_fidelity_front(res, res.problem)
+        res.fidelity = res.problem.stats()
+    res.seed_lineage = run_lineage(res, meta.get("seed", DEFAULT_SEED))
+    res.checkpoint = dict(path=checkpointer.path, n_saved=checkpointer.n_saved, save_time=checkpointer.save_time,
+                          resumed_from=path)
+    return res
+
+
 def run_optimization(category, method, **kwargs):
     """
     Creates a fresh PEMProblem (22 constraints total) and runs the selected optimization.
     For scalarization, only Weighted Sum and Goal Seeking are available.
     For Pareto-based, NSGA2, MOEA/D, and SPEA2 are available.
+
+    j_points (with optional j_weights and polarization_objective "overpotential"
+    or "energy") evaluates every design over that set of current densities
+    instead of the single j, see PolarizationProblem.
+
+    T_bounds=(T_min, T_max) adds the operating temperature as a 7th decision
+    variable with Arrhenius-scaled j0, see TemperatureProblem. T_ref, Eact_a
+    and Eact_c are passed on to PEMProblem.
+
+    catalyst_tables=(anode_table, cathode_table) makes the catalyst materials
+    integer decision variables over those tables (utils/catalysts.py), see
+    MaterialChoiceProblem; the rho_cat/c_cat/j0 arguments are then ignored.
+
+    robust=dict(uncertain=..., n_samples=..., measure=...) optimizes a robust
+    statistic of the overpotential over a parameter ensemble, see RobustProblem.
+
+    With profile=True the result carries a RunProfile as `res.profile`
+    (per-generation evaluation/survival/mating/overhead times and eval counts,
+    see utils/profiling.py). profile_output="run.prof" (cProfile) or
+    "run.html" (pyinstrument) additionally dumps a hot-path profile.
+
+    callback(algorithm), if given, is called after every generation (progress
+    reporting and cancellation of background jobs, see utils/jobs.py).
+
+    n_islands=K (NSGA2 only) evolves K sub-populations of pop_size / K in
+    separate processes with periodic migration and returns their merged
+    front, see utils/islands.py.
+
+    seed (default 1) seeds the run; parallel parts (islands) and the robust
+    ensemble (unless robust["seed"] is given) get child seed streams of it
+    (utils/seeds.py). The result carries `res.seed_lineage`.
+
+    checkpoint="run.ckpt" saves the algorithm state at most every
+    checkpoint_interval seconds (default 30, see utils/checkpoint.py);
+    resume_from="run.ckpt" continues such a run where it stopped (the problem
+    arguments are then taken from the checkpoint) and keeps checkpointing to
+    the same file unless checkpoint is given.
+
+    Scalarization runs return the raw (cost, eta) of all their evaluations as
+    `res.archive` (EvaluationArchive). Passing it back as archive=... after
+    only w1/w2 or the goals changed re-ranks those evaluations and restarts
+    the GA from the best of them (RESTART_N_GEN generations instead of
+    SCALAR_N_GEN); an archive of other problem arguments is ignored.
+
+    memo=True (or dict(resolution=..., max_size=...)) answers repeated designs
+    from a cache of evaluations keyed on quantized decision vectors, see
+    utils/memo.py; its lookups, hits and hit_rate are returned as `res.memo`.
+
+    fidelity=True (or dict(promote=..., schedule=..., n_grid=...); NSGA2 and
+    SPEA2 on a plain PEMProblem) screens every population with a lookup-table
+    model of the overpotential and evaluates only the promoted share of it
+    with the full model; the returned front is full-fidelity. Evaluation
+    counts, times and screening errors are returned as `res.fidelity`, see
+    utils/fidelity.py.
     """
     scalar_params = kwargs.pop("scalar_params", {})
+    archive = kwargs.pop("archive", None)
+    memo = kwargs.pop("memo", None)
+    fidelity = kwargs.pop("fidelity", None)
+    profile = kwargs.pop("profile", False)
+    profile_output = kwargs.pop("profile_output", None)
+    callback = kwargs.pop("callback", None)
+    n_islands = kwargs.pop("n_islands", 1)
+    seed = kwargs.pop("seed", DEFAULT_SEED)
+    kwargs = seed_ensemble(kwargs, seed)
+    checkpoint = kwargs.pop("checkpoint", None)
+    checkpoint_interval = kwargs.pop("checkpoint_interval", CHECKPOINT_INTERVAL)
+    resume_from = kwargs.pop("resume_from", None)
     if category == "Pareto-based":
         pop_size = kwargs.pop("pop_size", 40)
         n_gen = kwargs.pop("n_gen", 30)
@@ -284,17 +1105,91 @@ def run_optimization(category, method, **kwargs):
         pop_size = None
         n_gen = None
 
-    base_problem = PEMProblem(**kwargs)
+    profiler = RunProfiler(profile_output) if (profile or profile_output) else None
 
-    if category == "Scalarization":
-        if method == "Weighted Sum":
-            w1 = scalar_params.get("w1", 0.5)
-            w2 = scalar_params.get("w2", 0.5)
-            return weighted_sum_optimization(base_problem, w1, w2)
-        elif method == "Goal Seeking":
-            goals = scalar_params.get("goals", (10.0, 0.5))
-            return goal_seeking_optimization(base_problem, goals)
+    if checkpoint is not None or resume_from is not None:
+        if profiler is not None or n_islands > 1:
+            raise ValueError("Checkpointing is not available for profiled or island runs")
+        checkpointer = Checkpointer(checkpoint or resume_from, checkpoint_interval,
+                                    dict(category=category, method=method, seed=seed), callback)
+        if resume_from is not None:
+            return _resume_optimization(resume_from, category, method, checkpointer)
+        callback = checkpointer
+    if memo and n_islands > 1:
+        raise ValueError("The evaluation memo is not available for island runs")
+    if category == "Scalarization" and n_islands > 1:
+        raise ValueError(f"The island model is only available for NSGA2, not {method}")
+
+    t0 = time.perf_counter()
+    pem = build_problem(**kwargs)
+    base_problem = memo_problem(pem, memo)
+    if fidelity:
+        if category != "Pareto-based" or method not in ("NSGA2", "SPEA2") or n_islands > 1:
+            raise ValueError("Multi-fidelity screening is only available for NSGA2 and SPEA2 without islands")
+        if type(pem) is not PEMProblem:
+            raise ValueError("Multi-fidelity screening is not available with T_bounds, j_points, "
+                             "catalyst_tables or robust")
+        base_problem = fidelity_problem(base_problem, lambda n_grid: CatalystScreening(pem, n_grid), fidelity, n_gen)
+    setup_time = time.perf_counter() - t0
+
+    with profiler.run() if profiler is not None else nullcontext():
+        if category == "Scalarization":
+            key = problem_key(kwargs)
+            if archive is None or archive.key != key:
+                archive = EvaluationArchive(base_problem.n_var, base_problem.n_obj, base_problem.n_constr, key)
+            if method == "Weighted Sum":
+                w1 = scalar_params.get("w1", 0.5)
+                w2 = scalar_params.get("w2", 0.5)
+                res = weighted_sum_optimization(base_problem, w1, w2, profiler=profiler, callback=callback,
+                                                seed=seed, archive=archive)
+            elif method == "Goal Seeking":
+                goals = scalar_params.get("goals", (10.0, 0.5))
+                res = goal_seeking_optimization(base_problem, goals, profiler=profiler, callback=callback,
+                                                seed=seed, archive=archive)
+            else:
+                raise ValueError(f"Unknown scalarization method: {method}")
+            res.archive = archive
         else:
-            raise ValueError(f"Unknown scalarization method: {method}")
-    else:
-        return multiobjective_optimization(base_problem, method, pop_size, n_gen)
+            res = multiobjective_optimization(base_problem, method, pop_size, n_gen, profiler=profiler,
+                                              callback=callback, n_islands=n_islands, seed=seed)
+
+    res.seed_lineage = run_lineage(res, seed)
+    if checkpoint is not None:
+        res.checkpoint = dict(path=checkpoint, n_saved=callback.n_saved, save_time=callback.save_time)
+    if fidelity:
+        res = full_fidelity_front(res, base_problem)
+        res.fidelity = base_problem.stats()
+    if memo:
+        res.memo = memo_stats(base_problem)
+    if profiler is not None:
+        profiler.profile.add_phase("setup", setup_time)
+        res.profile = profiler.profile
+    return res
+
+
+async def run_optimization_async(category, method, executor=None, chunk_size=None, **kwargs):
+    """
+    Asynchronous run_optimization (same arguments except profile/callback):
+    an async iterator of per-generation updates, dicts with n_gen, n_eval,
+    progress and the X, F of the current optimum; the last update also carries
+    the final pymoo Result under "result". Population evaluations run on
+    `executor` (default: the shared bounded process pool of
+    utils/async_optimization.py), split into chunks of chunk_size rows if
+    given. Leaving the loop early or cancelling the consuming task stops the run.
+
+        async for update in run_optimization_async("Pareto-based", "NSGA2", **params):
+            ...
+    """
+    from utils.async_optimization import optimize_async
+    scalar_params = kwargs.pop("scalar_params", None)
+    pop_size = kwargs.pop("pop_size", 40)
+    n_gen = kwargs.pop("n_gen", 30)
+    seed = kwargs.pop("seed", DEFAULT_SEED)
+    base_problem = build_problem(**seed_ensemble(kwargs, seed))
+    problem, algorithm, termination, finalize = optimization_setup(base_problem, category, method, scalar_params,
+                                                                   pop_size, n_gen)
+    async for update in optimize_async(problem, algorithm, termination, seed=seed, finalize=finalize,
+                                       executor=executor, chunk_size=chunk_size):
+        if "result" in update:
+            update["result"].seed_lineage = run_lineage(update["result"], seed)
+        yield update
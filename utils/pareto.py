@@ -0,0 +1,178 @@
+# utils/pareto.py
+"""
+Pareto filtering of large objective sets (all objectives minimized).
+
+  - pareto_mask_2d   : O(n log n) sort-and-sweep for two objectives
+  - pareto_mask      : any number of objectives, sum-ordered block filtering
+  - ParetoArchive    : streaming front, fed chunk by chunk with bounded memory
+  - pareto_indices   : chunked filter of an (optionally memory-mapped) array
+  - nondominated_ranks : front number of every point (non-dominated sorting)
+
+Identical points do not dominate each other, so duplicates on the front are all kept.
+"""
+import numpy as np
+
+
+def pareto_mask_2d(F):
+    """
+    Boolean mask of the non-dominated rows of F (n, 2).
+
+    Rows are sorted by (f0, f1); a row is non-dominated if its f1 is below
+    the smallest f1 of all rows before it. Exact duplicates share the status
+    of the first row of their group.
+    """
+    F = np.asarray(F, dtype=float)
+    n = len(F)
+    if n == 0:
+        return np.zeros(0, dtype=bool)
+    order = np.lexsort((F[:, 1], F[:, 0]))
+    f0, f1 = F[order, 0], F[order, 1]
+
+    prev_min = np.empty(n)
+    prev_min[0] = np.inf
+    np.minimum.accumulate(f1[:-1], out=prev_min[1:])
+    keep = f1 < prev_min
+
+    # duplicates of a kept row are kept as well
+    new_group = np.ones(n, dtype=bool)
+    new_group[1:] = (f0[1:] != f0[:-1]) | (f1[1:] != f1[:-1])
+    group_start = np.maximum.accumulate(np.where(new_group, np.arange(n), 0))
+    keep = keep[group_start]
+
+    mask = np.zeros(n, dtype=bool)
+    mask[order] = keep
+    return mask
+
+
+def _dominated_by(T, B):
+    """
+    Mask of the rows of B (b, m) dominated by at least one row of T (t, m).
+    Built objective by objective on (b, t) arrays to avoid (b, t, m) temporaries.
+    """
+    le = T[None, :, 0] <= B[:, 0, None]
+    lt = T[None, :, 0] < B[:, 0, None]
+    for k in range(1, T.shape[1]):
+        le &= T[None, :, k] <= B[:, k, None]
+        lt |= T[None, :, k] < B[:, k, None]
+    return (le & lt).any(axis=1)
+
+
+def _front_blocks(F, block_size=2048, tile_size=512):
+    """
+    Indices of the non-dominated rows of F (n, m) for any m.
+
+    Rows are visited in blocks of increasing objective sum. A row can only be
+    dominated by rows with a smaller sum, so each block is checked against the
+    front found so far (tile by tile, dropping dominated rows as soon as they
+    are found) and then against itself; its survivors extend the front and
+    are never removed again. Memory stays at O(block_size * tile_size * m).
+    """
+    order = np.argsort(F.sum(axis=1), kind="stable")
+    front = np.empty((0, F.shape[1]))
+    front_idx = []
+    for start in range(0, len(F), block_size):
+        idx = order[start:start + block_size]
+        B = F[idx]
+        for t in range(0, len(front), tile_size):
+            dominated = _dominated_by(front[t:t + tile_size], B)
+            if dominated.any():
+                B, idx = B[~dominated], idx[~dominated]
+                if len(B) == 0:
+                    break
+        if len(B) > 1:
+            dominated = _dominated_by(B, B)
+            B, idx = B[~dominated], idx[~dominated]
+        if len(B):
+            front = np.vstack([front, B])
+            front_idx.append(idx)
+    if not front_idx:
+        return np.zeros(0, dtype=np.intp)
+    return np.sort(np.concatenate(front_idx))
+
+
+def pareto_mask(F, block_size=2048):
+    """
+    Boolean mask of the non-dominated rows of F (n, m).
+
+    Two objectives use the O(n log n) sweep; more objectives use sum-ordered
+    block filtering (_front_blocks), whose cost grows with n times the front
+    size and whose memory is bounded by the block and tile sizes.
+    """
+    F = np.asarray(F, dtype=float)
+    n = len(F)
+    if n == 0:
+        return np.zeros(0, dtype=bool)
+    if F.shape[1] == 1:
+        return F[:, 0] == F[:, 0].min()
+    if F.shape[1] == 2:
+        return pareto_mask_2d(F)
+    mask = np.zeros(n, dtype=bool)
+    mask[_front_blocks(F, block_size)] = True
+    return mask
+
+
+class ParetoArchive:
+    """
+    Non-dominated front of a stream of objective chunks.
+
+    Each add() filters the incoming chunk, merges it with the current front
+    and filters again, so memory is bounded by the chunk plus the front. Row
+    indices are counted over everything added so far; optional X rows (and
+    any other per-row payload) are kept alongside.
+    """
+    def __init__(self):
+        self.F = None
+        self.X = None
+        self.index = np.zeros(0, dtype=np.int64)
+        self.n_seen = 0
+
+    def add(self, F, X=None):
+        F = np.atleast_2d(np.asarray(F, dtype=float))
+        chunk_idx = np.arange(self.n_seen, self.n_seen + len(F))
+        self.n_seen += len(F)
+        local = pareto_mask(F)
+        F, chunk_idx = F[local], chunk_idx[local]
+        X = None if X is None else np.asarray(X)[local]
+
+        if self.F is None:
+            self.F, self.X, self.index = F, X, chunk_idx
+            return self
+        F_all = np.vstack([self.F, F])
+        keep = pareto_mask(F_all)
+        self.F = F_all[keep]
+        self.index = np.concatenate([self.index, chunk_idx])[keep]
+        if self.X is not None and X is not None:
+            self.X = np.concatenate([self.X, X])[keep]
+        return self
+
+    def __len__(self):
+        return 0 if self.F is None else len(self.F)
+
+
+def pareto_indices(F, chunk_size=100_000):
+    """
+    Sorted row indices of the non-dominated rows of a possibly huge F, read
+    chunk_size rows at a time (F may be an np.memmap or any array-like that
+    supports slicing).
+    """
+    archive = ParetoArchive()
+    for start in range(0, len(F), chunk_size):
+        archive.add(np.asarray(F[start:start + chunk_size]))
+    return np.sort(archive.index)
+
+
+def nondominated_ranks(F):
+    """
+    Front number (0 = non-dominated) of every row of F, by peeling off
+    successive fronts with pareto_mask.
+    """
+    F = np.asarray(F, dtype=float)
+    ranks = np.full(len(F), -1, dtype=int)
+    remaining = np.arange(len(F))
+    rank = 0
+    while len(remaining):
+        mask = pareto_mask(F[remaining])
+        ranks[remaining[mask]] = rank
+        remaining = remaining[~mask]
+        rank += 1
+    return ranks
@@ -0,0 +1,223 @@
+# utils/profiling.py
+"""
+Per-phase timing of optimization runs.
+
+A RunProfiler is handed to pymoo through ``minimize(..., **profiler.hooks())``:
+its evaluator times every problem evaluation, the survival and mating operators
+of the algorithm are wrapped with timers on first use, and its callback closes
+one record per generation. The resulting RunProfile is attached to the result
+object as ``res.profile``.
+"""
+import cProfile
+import os
+import time
+from contextlib import contextmanager
+
+from pymoo.core.callback import Callback
+from pymoo.core.evaluator import Evaluator
+
+
+class RunProfile:
+    """
+    Timings of one optimization run.
+
+    Attributes:
+      - generations : list of dicts, one per generation, with keys
+            n_gen, n_eval, eval_time, survival_time, mating_time,
+            overhead_time (everything else the algorithm did) and total_time (s)
+      - phases      : dict phase name -> seconds, e.g. "setup", "optimize", "render"
+      - hot_path    : path of the cProfile/pyinstrument dump, if one was written
+    """
+    def __init__(self):
+        self.generations = []
+        self.phases = {}
+        self.hot_path = None
+
+    def add_phase(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Time the body of a with-block as phase `name`.
+        """
+        t0 = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.add_phase(name, time.perf_counter() - t0)
+
+    def totals(self):
+        """
+        Sums over all generations.
+        """
+        keys = ["n_eval", "eval_time", "survival_time", "mating_time", "overhead_time", "total_time"]
+        return {k: sum(g[k] for g in self.generations) for k in keys}
+
+    def summary(self):
+        """
+        Flat dict of totals, the number of generations and the timed phases.
+        """
+        out = dict(n_gen=len(self.generations), **self.totals())
+        out.update({f"{name}_time": t for name, t in self.phases.items()})
+        if self.hot_path is not None:
+            out["hot_path"] = self.hot_path
+        return out
+
+    def to_dataframe(self):
+        import pandas as pd
+        return pd.DataFrame(self.generations)
+
+    def to_dict(self):
+        return dict(generations=self.generations, phases=self.phases, hot_path=self.hot_path)
+
+
+class _TimedOperator:
+    """
+    Forwards to a pymoo operator (survival, mating) and books the time spent in do().
+    """
+    def __init__(self, operator, profiler, key):
+        self._operator = operator
+        self._profiler = profiler
+        self._key = key
+
+    def do(self, *args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return self._operator.do(*args, **kwargs)
+        finally:
+            self._profiler.current[self._key] += time.perf_counter() - t0
+
+    def __getattr__(self, name):
+        return getattr(self._operator, name)
+
+
+class ProfilingEvaluator(Evaluator):
+    """
+    Evaluator that books evaluation time and counts into the profiler.
+    """
+    def __init__(self, profiler, **kwargs):
+        super().__init__(**kwargs)
+        self.profiler = profiler
+
+    def eval(self, problem, pop, **kwargs):
+        algorithm = kwargs.get("algorithm")
+        if algorithm is not None:
+            self.profiler.instrument(algorithm)
+        n_before = self.n_eval
+        t0 = time.perf_counter()
+        try:
+            return super().eval(problem, pop, **kwargs)
+        finally:
+            self.profiler.current["eval_time"] += time.perf_counter() - t0
+            self.profiler.current["n_eval"] += self.n_eval - n_before
+
+
+class ProfilingCallback(Callback):
+    """
+    Closes one generation record each time the algorithm advances.
+    """
+    def __init__(self, profiler, callback=None):
+        super().__init__()
+        self.profiler = profiler
+        self.callback = callback
+
+    def notify(self, algorithm):
+        self.profiler.end_generation(algorithm.n_iter)
+        if self.callback is not None:
+            self.callback(algorithm)
+
+
+class RunProfiler:
+    """
+    Collects a RunProfile while pymoo runs.
+
+    Parameters:
+      - output : optional path for a hot-path dump of the whole run. ``*.html``
+                 is written with pyinstrument (if installed), anything else is a
+                 cProfile stats file readable with pstats/snakeviz.
+    """
+    def __init__(self, output=None):
+        self.profile = RunProfile()
+        self.output = output
+        self.current = None
+        self._instrumented = set()
+        self._reset()
+
+    def _reset(self):
+        self.current = dict(n_eval=0, eval_time=0.0, survival_time=0.0, mating_time=0.0)
+        self._t_gen = time.perf_counter()
+
+    def hooks(self, callback=None):
+        """
+        Keyword arguments for pymoo's minimize(); `callback` is chained if given.
+        """
+        return dict(evaluator=ProfilingEvaluator(self), callback=ProfilingCallback(self, callback))
+
+    def instrument(self, algorithm):
+        if id(algorithm) in self._instrumented:
+            return
+        self._instrumented.add(id(algorithm))
+        for attr, key in (("survival", "survival_time"), ("mating", "mating_time")):
+            operator = getattr(algorithm, attr, None)
+            if operator is not None and not isinstance(operator, _TimedOperator):
+                setattr(algorithm, attr, _TimedOperator(operator, self, key))
+
+    def end_generation(self, n_gen):
+        total = time.perf_counter() - self._t_gen
+        rec = dict(n_gen=n_gen, **self.current)
+        rec["overhead_time"] = max(total - rec["eval_time"] - rec["survival_time"] - rec["mating_time"], 0.0)
+        rec["total_time"] = total
+        self.profile.generations.append(rec)
+        self._reset()
+
+    @contextmanager
+    def run(self):
+        """
+        Wrap the minimize() call: times the "optimize" phase and writes the hot-path dump.
+        """
+        self._reset()
+        sampler = self._start_sampler()
+        try:
+            with self.profile.phase("optimize"):
+                yield self
+        finally:
+            self._stop_sampler(sampler)
+
+    def _start_sampler(self):
+        if self.output is None:
+            return None
+        if self.output.endswith(".html"):
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                self.output = os.path.splitext(self.output)[0] + ".prof"
+            else:
+                sampler = Profiler()
+                sampler.start()
+                return sampler
+        sampler = cProfile.Profile()
+        sampler.enable()
+        return sampler
+
+    def _stop_sampler(self, sampler):
+        if sampler is None:
+            return
+        if isinstance(sampler, cProfile.Profile):
+            sampler.disable()
+            sampler.dump_stats(self.output)
+        else:
+            sampler.stop()
+            with open(self.output, "w") as f:
+                f.write(sampler.output_html())
+        self.profile.hot_path = self.output
+
+
+def minimize_hooks(profiler, callback=None):
+    """
+    minimize() keyword arguments for an optional profiler and an optional
+    per-generation callback(algorithm).
+    """
+    if profiler is not None:
+        return profiler.hooks(callback)
+    return dict(callback=callback) if callback is not None else {}
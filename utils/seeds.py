@@ -0,0 +1,85 @@
+# utils/seeds.py
+"""
+Seed management for parallel and batched runs.
+
+A run is given one root seed. Every parallel unit (island, co-evolution
+task, sweep point, Monte Carlo ensemble) gets its own stream derived with
+NumPy's SeedSequence from the root seed and its position, e.g. (island,),
+(epoch, collaborator, block) or ENSEMBLE_STREAM:
+
+    child_seed(seed, k)  ==  SeedSequence(seed, spawn_key=(k,)) -> 32-bit seed
+
+(the same child SeedSequence.spawn() returns). A child seed depends only on
+the root seed and the position, never on the number of workers or the order
+in which tasks finish, so a whole sweep is bit-reproducible.
+
+The root run itself uses the root seed unchanged (seed=1 reproduces the
+results from before seed streams existed). Results carry their lineage as
+`res.seed_lineage`, see lineage().
+"""
+
+import numpy as np
+
+DEFAULT_SEED = 1
+# stream of a run's Monte Carlo parameter ensemble (RobustProblem), out of the
+# index ranges used by islands, sweep points and co-evolution tasks
+ENSEMBLE_STREAM = (2**31 - 1,)
+
+
+def child_seed(seed, *path):
+    """
+    Integer seed (for pymoo / np.random.seed) of the stream at position
+    `path` under the root seed; no path returns the root seed itself.
+    """
+    if not path:
+        return int(seed)
+    state = np.random.SeedSequence(int(seed), spawn_key=tuple(int(i) for i in path)).generate_state(1, np.uint32)
+    return int(state[0])
+
+
+def child_seeds(seed, n, *path):
+    """
+    Seeds of the n children (path + (0,)) ... (path + (n - 1,)).
+    """
+    return [child_seed(seed, *path, i) for i in range(n)]
+
+
+def lineage(seed, *path, **children):
+    """
+    Seed lineage stored with a result: the root seed, the position of this
+    stream and the seed actually used, plus optional lists of child seeds
+    (e.g. islands=[...]).
+    """
+    entry = dict(root=int(seed), spawn_key=[int(i) for i in path], seed=child_seed(seed, *path))
+    entry.update(children)
+    return entry
+
+
+def _run_point(func, point, seed, index):
+    result = func(point, seed=child_seed(seed, index))
+    if hasattr(result, "__dict__"):
+        result.seed_lineage = lineage(seed, index)
+    return result
+
+
+def run_sweep(func, points, seed=DEFAULT_SEED, n_workers=1):
+    """
+    Evaluate func(point, seed=child_seed(seed, i)) for every point i, in
+    n_workers processes of the shared pool (shared_executor in
+    utils/async_optimization.py; 1 = in this process). func must be
+    picklable (a module-level function) when n_workers > 1.
+
+    Returns:
+      list of dict(point, seed_lineage, result) in the order of points; the
+      results are identical for any n_workers.
+    """
+    points = list(points)
+    if n_workers > 1:
+        from utils.async_optimization import shared_executor
+        pool = shared_executor(n_workers)
+        futures = [pool.submit(_run_point, func, point, seed, i) for i, point in enumerate(points)]
+        results = [future.result() for future in futures]
+    else:
+        results = [_run_point(func, point, seed, i) for i, point in enumerate(points)]
+    return [dict(point=point, seed_lineage=lineage(seed, i), result=result)
+            for i, (point, result) in enumerate(zip(points, results))]
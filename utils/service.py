@@ -0,0 +1,371 @@
+# utils/service.py
+"""
+Local HTTP optimization service for dashboards outside Streamlit.
+
+    python -m utils.service --port 8765
+
+Endpoints (JSON request body, Pareto front as an Arrow IPC stream):
+
+  POST /optimize/catalyst   {"category": "Pareto-based", "method": "NSGA2",
+                             "pop_size": 40, "n_gen": 30, "scalar_params": {...},
+                             "params": {PEMProblem / build_problem arguments, seed, memo,
+                                        fidelity, n_islands <= MAX_ISLANDS}}
+  POST /optimize/membrane   {"method": "NSGA2", "model_params": {...}, "bounds": {...},
+                             "pop_size": 100, "n_gen": 100, "seed": 1, ...}
+  GET  /health              {"status": "ok", "cached": n, "in_flight": n}
+
+The front is a table with columns x0.. (decision variables) and f0..
+(objectives); the schema metadata holds kind, method, key, n_eval and the
+seed lineage (JSON, see utils/seeds.py). The X-Cache response header says
+how the request was served:
+
+  - miss      : this request ran the optimization
+  - coalesced : an identical request was already running, its result is shared
+  - hit       : served from the result cache (LRU of the encoded fronts)
+
+Identical means the same canonical parameter hash (sorted keys, numbers
+compared as floats). Optimizations run on the shared process pool of
+utils/async_optimization.py, so the server threads stay responsive and the
+number of concurrent runs is bounded. Unknown or reserved arguments are
+rejected with 400 before anything runs. OptimizationClient talks to the
+service with urllib only.
+"""
+import argparse
+import hashlib
+import inspect
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pyarrow as pa
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+KINDS = ("catalyst", "membrane")
+MAX_EVALUATIONS = 200_000
+# island processes a single request may start (each is a process of its own)
+MAX_ISLANDS = 4
+CACHE_SIZE = 128
+
+# run_optimization arguments a request may not set (files, hooks, non-JSON tables)
+_RESERVED = ("profile", "profile_output", "callback", "catalyst_tables", "load_profile", "archive",
+             "checkpoint", "resume_from")
+_MEMBRANE_ARGS = ("method", "model_params", "bounds", "scalar_params", "pop_size", "n_gen", "seed",
+                  "dt_hours", "prefilter")
+# catalyst run_optimization options accepted in "params" besides the problem arguments
+_CATALYST_OPTIONS = ("seed", "memo", "fidelity", "n_islands")
+
+
+def _canonical(obj):
+    if isinstance(obj, dict):
+        return {str(k): _canonical(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_canonical(v) for v in obj]
+    if isinstance(obj, (int, float)) and not isinstance(obj, bool):
+        return float(obj)
+    return obj
+
+
+def request_key(kind, request):
+    """
+    Hash of a request: identical parameter sets (key order and 1 vs 1.0 aside)
+    give the same key.
+    """
+    text = json.dumps([kind, _canonical(request)], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(text.encode()).hexdigest()[:32]
+
+
+@lru_cache(maxsize=None)
+def _catalyst_params():
+    """
+    (allowed, required) names of a catalyst request's "params": the
+    PEMProblem and build_problem arguments plus _CATALYST_OPTIONS, and the
+    PEMProblem arguments without a default.
+    """
+    from utils.optimization import PEMProblem, build_problem
+    names, required = set(_CATALYST_OPTIONS), set()
+    for func in (PEMProblem.__init__, build_problem):
+        for name, p in inspect.signature(func).parameters.items():
+            if name == "self" or p.kind in (p.VAR_POSITIONAL, p.VAR_KEYWORD):
+                continue
+            names.add(name)
+            if func is PEMProblem.__init__ and p.default is p.empty:
+                required.add(name)
+    return frozenset(names), frozenset(required)
+
+
+def _check_request(kind, request):
+    if kind not in KINDS:
+        raise ValueError(f"Unknown problem kind: {kind}")
+    if not isinstance(request, dict):
+        raise ValueError("The request body must be a JSON object")
+    params = request.get("params", {}) if kind == "catalyst" else request
+    reserved = [k for k in _RESERVED if k in params]
+    if reserved:
+        raise ValueError(f"Not allowed in a service request: {', '.join(reserved)}")
+    if kind == "membrane":
+        unknown = sorted(set(request) - set(_MEMBRANE_ARGS))
+        if unknown:
+            raise ValueError(f"Unknown membrane arguments: {', '.join(unknown)}")
+    else:
+        if not isinstance(params, dict):
+            raise ValueError("params must be a JSON object")
+        allowed, required = _catalyst_params()
+        unknown = sorted(set(params) - allowed - set(_RESERVED))
+        if unknown:
+            raise ValueError(f"Unknown catalyst parameters: {', '.join(unknown)}")
+        missing = sorted(required - set(params))
+        if missing:
+            raise ValueError(f"Missing catalyst parameters: {', '.join(missing)}")
+    pop_size = int(request.get("pop_size", 40 if kind == "catalyst" else 100))
+    n_gen = int(request.get("n_gen", 30 if kind == "catalyst" else 100))
+    n_islands = int(params.get("n_islands", 1)) if kind == "catalyst" else 1
+    if not 1 <= n_islands <= MAX_ISLANDS:
+        raise ValueError(f"n_islands must be between 1 and {MAX_ISLANDS} in a service request, got {n_islands}")
+    n_eval = pop_size * n_gen
+    if n_eval > MAX_EVALUATIONS:
+        raise ValueError(f"pop_size * n_gen = {n_eval} exceeds the service limit of {MAX_EVALUATIONS}")
+
+
+def solve(kind, request):
+    """
+    Run the optimization of a request (in a pool worker); returns
+    (X, F, n_eval, seed_lineage) with X and F as 2-D arrays (0 rows if
+    nothing feasible).
+    """
+    if kind == "catalyst":
+        from utils.optimization import run_optimization
+        category = request.get("category", "Pareto-based")
+        kwargs = dict(request.get("params", {}))
+        if category == "Pareto-based":
+            kwargs.update(pop_size=request.get("pop_size", 40), n_gen=request.get("n_gen", 30))
+        res = run_optimization(category, request.get("method", "NSGA2"),
+                               scalar_params=request.get("scalar_params", {}), **kwargs)
+    else:
+        from utils.membrane_optimization import run_optimization
+        res = run_optimization(**request)
+    problem = res.problem
+    if res.X is None:
+        X, F = np.empty((0, problem.n_var)), np.empty((0, problem.n_obj))
+    else:
+        X = np.asarray(res.X, dtype=float).reshape(-1, problem.n_var)
+        F = np.asarray(res.F, dtype=float).reshape(len(X), -1)
+    n_eval = res.algorithm.evaluator.n_eval if res.algorithm is not None else 0
+    return X, F, int(n_eval), getattr(res, "seed_lineage", None)
+
+
+def front_to_arrow(X, F, metadata=None):
+    """
+    Arrow IPC stream bytes of a front: columns x0.., f0.., string metadata.
+    """
+    columns = {f"x{i}": X[:, i] for i in range(X.shape[1])}
+    columns.update({f"f{i}": F[:, i] for i in range(F.shape[1])})
+    table = pa.table(columns)
+    table = table.replace_schema_metadata({k: str(v) for k, v in (metadata or {}).items()})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def read_front(data):
+    """
+    pyarrow.Table of an Arrow IPC stream returned by the service.
+    """
+    return pa.ipc.open_stream(data).read_all()
+
+
+class OptimizationService:
+    """
+    Request coalescing and result cache around solve().
+
+    Parameters:
+      - executor   : concurrent.futures executor running solve (default: the
+                     shared process pool of utils/async_optimization.py)
+      - cache_size : number of encoded fronts kept (least recently used dropped)
+    """
+    def __init__(self, executor=None, cache_size=CACHE_SIZE):
+        if executor is None:
+            from utils.async_optimization import shared_executor
+            executor = shared_executor()
+        self.executor = executor
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.in_flight = {}
+        self.lock = threading.Lock()
+
+    def optimize(self, kind, request):
+        """
+        Arrow bytes of the front for a request and how it was served
+        ("miss", "coalesced" or "hit"). Failures are raised to every waiting
+        caller and are not cached.
+        """
+        _check_request(kind, request)
+        key = request_key(kind, request)
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                return self.cache[key], "hit"
+            future = self.in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self.in_flight[key] = Future()
+        if not leader:
+            return future.result(), "coalesced"
+
+        try:
+            t0 = time.perf_counter()
+            X, F, n_eval, seeds = self.executor.submit(solve, kind, request).result()
+            method = request.get("method", "NSGA2")
+            data = front_to_arrow(X, F, dict(kind=kind, method=method, key=key, n_eval=n_eval,
+                                             seconds=round(time.perf_counter() - t0, 3),
+                                             seed_lineage=json.dumps(seeds)))
+        except BaseException as e:
+            with self.lock:
+                del self.in_flight[key]
+            future.set_exception(e)
+            raise
+        with self.lock:
+            self.cache[key] = data
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+            del self.in_flight[key]
+        future.set_result(data)
+        return data, "miss"
+
+    def stats(self):
+        with self.lock:
+            return dict(status="ok", cached=len(self.cache), in_flight=len(self.in_flight))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, code, body, content_type, headers=None):
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, code, obj):
+        self._send(code, json.dumps(obj).encode(), "application/json")
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, self.server.service.stats())
+        else:
+            self._send_json(404, dict(error=f"Not found: {self.path}"))
+
+    def do_POST(self):
+        prefix = "/optimize/"
+        if not self.path.startswith(prefix):
+            self._send_json(404, dict(error=f"Not found: {self.path}"))
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            data, served = self.server.service.optimize(self.path[len(prefix):], request)
+        except ValueError as e:   # includes malformed JSON
+            self._send_json(400, dict(error=str(e)))
+        except Exception as e:
+            self._send_json(500, dict(error=f"{type(e).__name__}: {e}"))
+        else:
+            self._send(200, data, ARROW_STREAM, {"X-Cache": served})
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(host="127.0.0.1", port=8765, service=None, quiet=False):
+    """
+    ThreadingHTTPServer serving `service` (a new OptimizationService if None);
+    port 0 picks a free port (server.server_address[1]).
+    """
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.service = service if service is not None else OptimizationService()
+    server.quiet = quiet
+    return server
+
+
+def start_server(host="127.0.0.1", port=0, service=None, quiet=True):
+    """
+    Serve in a background thread (for scripts and tests); returns the server,
+    stop it with server.shutdown().
+    """
+    server = make_server(host, port, service, quiet)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class OptimizationClient:
+    """
+    Client of the service (urllib only).
+
+        client = OptimizationClient("http://127.0.0.1:8765")
+        front, served = client.optimize_catalyst(params, method="NSGA2", pop_size=40, n_gen=30)
+        df = front.to_pandas()
+    """
+    def __init__(self, url="http://127.0.0.1:8765", timeout=600):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _post(self, path, request):
+        req = urllib.request.Request(self.url + path, data=json.dumps(request).encode(), method="POST",
+                                     headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                return read_front(resp.read()), resp.headers.get("X-Cache")
+        except urllib.error.HTTPError as e:
+            message = json.loads(e.read() or b"{}").get("error", e.reason)
+            raise RuntimeError(f"HTTP {e.code}: {message}") from None
+
+    def optimize_catalyst(self, params, category="Pareto-based", method="NSGA2", **options):
+        """
+        Front of run_optimization(category, method, **params) for a PEMProblem
+        parameter set; options: pop_size, n_gen, scalar_params.
+        Returns (pyarrow.Table, "miss" | "coalesced" | "hit").
+        """
+        return self._post("/optimize/catalyst", dict(options, category=category, method=method, params=params))
+
+    def optimize_membrane(self, method="NSGA2", model_params=None, **options):
+        """
+        Front of membrane_optimization.run_optimization for a MembraneModel
+        parameter set; options: bounds, pop_size, n_gen, seed, ...
+        Returns (pyarrow.Table, "miss" | "coalesced" | "hit").
+        """
+        return self._post("/optimize/membrane", dict(options, method=method, model_params=model_params or {}))
+
+    def health(self):
+        with urllib.request.urlopen(self.url + "/health", timeout=self.timeout) as resp:
+            return json.loads(resp.read())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local HTTP optimization service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE)
+    args = parser.parse_args(argv)
+    server = make_server(args.host, args.port, OptimizationService(cache_size=args.cache_size))
+    print(f"Serving on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
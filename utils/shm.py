@@ -0,0 +1,198 @@
+# utils/shm.py
+"""
+Shared-memory transport for evaluating populations in worker processes.
+
+Sending X to a process pool and F/G back pickles every array each
+generation (and, with run_in_executor/submit, the problem as well). Here the
+problem is sent once, when the workers start, and batches go through a ring
+of slots in one multiprocessing.shared_memory block:
+
+  - SharedRing            : n_slots slots of max_rows rows, each row holding
+                            the decision vector and the outputs [F | G]
+  - SharedMemoryEvaluator : worker processes attached to the ring; the parent
+                            writes X into a free slot and queues only
+                            (slot, n_rows), a worker evaluates the slot's X
+                            view in place and writes F and G into the same slot
+  - SharedMemoryProblem   : pymoo Problem evaluating through an evaluator, so
+                            any algorithm can use it
+
+    with SharedMemoryEvaluator(PEMProblem(**params), n_workers=4) as evaluator:
+        res = minimize(SharedMemoryProblem(evaluator), NSGA2(pop_size=400), ("n_gen", 50))
+
+Works for any problem with objectives and inequality constraints
+(PEMProblem and its wrappers, MembraneOptimizationProblem, ...).
+"""
+import queue
+import traceback
+from collections import deque
+from multiprocessing import shared_memory
+
+import numpy as np
+from pymoo.core.problem import Problem
+
+from utils.async_optimization import spawn_context
+
+
+class SharedRing:
+    """
+    n_slots x max_rows rows of (n_in + n_out) float64 in one shared-memory
+    block. Create it in the parent (name=None), attach in workers by name.
+    """
+    def __init__(self, n_slots, max_rows, n_in, n_out, name=None):
+        self.n_slots, self.max_rows, self.n_in, self.n_out = n_slots, max_rows, n_in, n_out
+        shape = (n_slots, max_rows, n_in + n_out)
+        size = int(np.prod(shape)) * 8
+        self.shm = shared_memory.SharedMemory(name=name, create=name is None, size=size)
+        self.owner = name is None
+        self.data = np.ndarray(shape, dtype=np.float64, buffer=self.shm.buf)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def layout(self):
+        return self.n_slots, self.max_rows, self.n_in, self.n_out
+
+    def x(self, slot, n_rows):
+        return self.data[slot, :n_rows, :self.n_in]
+
+    def out(self, slot, n_rows):
+        return self.data[slot, :n_rows, self.n_in:]
+
+    def close(self):
+        self.data = None   # drop the view before the buffer is released
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _evaluate_slot(problem, ring, slot, n_rows):
+    """
+    Evaluate the X rows of a slot in place and write [F | G] into the slot.
+    """
+    out = problem.evaluate(ring.x(slot, n_rows), return_values_of=["F", "G"], return_as_dictionary=True)
+    dest = ring.out(slot, n_rows)
+    dest[:, :problem.n_obj] = np.reshape(out["F"], (n_rows, problem.n_obj))
+    if problem.n_ieq_constr:
+        dest[:, problem.n_obj:] = np.reshape(out["G"], (n_rows, problem.n_ieq_constr))
+
+
+def _worker(problem, name, layout, tasks, done):
+    """
+    Worker process: evaluate slots until a None task arrives.
+    """
+    ring = SharedRing(*layout, name=name)
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            try:
+                _evaluate_slot(problem, ring, *task)
+                done.put((task[0], None))
+            except Exception:
+                done.put((task[0], traceback.format_exc(limit=5)))
+    finally:
+        ring.close()
+
+
+class SharedMemoryEvaluator:
+    """
+    Pool of worker processes evaluating a problem through a SharedRing.
+
+    Parameters:
+      - problem   : pymoo problem (pickled once per worker)
+      - n_workers : worker processes
+      - max_rows  : rows per slot (larger batches are split into several slots)
+      - n_slots   : slots in the ring (default 2 * n_workers, so the parent can
+                    fill the next slot while the workers evaluate)
+
+    evaluate(X) returns (F, G) as new arrays. Close with close() or use it as a
+    context manager.
+    """
+    def __init__(self, problem, n_workers=2, max_rows=1024, n_slots=None):
+        if problem.n_eq_constr:
+            raise ValueError("Equality constraints are not supported by the shared-memory transport")
+        self.problem = problem
+        self.n_workers = n_workers
+        self.ring = SharedRing(n_slots or 2 * n_workers, max_rows, problem.n_var,
+                               problem.n_obj + problem.n_ieq_constr)
+        ctx = spawn_context()
+        self.tasks, self.done = ctx.Queue(), ctx.Queue()
+        self.procs = [ctx.Process(target=_worker, args=(problem, self.ring.name, self.ring.layout(),
+                                                        self.tasks, self.done), daemon=True)
+                      for _ in range(n_workers)]
+        for proc in self.procs:
+            proc.start()
+
+    def _result(self):
+        while True:
+            try:
+                return self.done.get(timeout=1.0)
+            except queue.Empty:
+                dead = [proc.exitcode for proc in self.procs if proc.exitcode is not None]
+                if dead:
+                    raise RuntimeError(f"A shared-memory worker exited with code {dead[0]}")
+
+    def evaluate(self, X, chunk_size=None):
+        """
+        F (n, n_obj) and G (n, n_ieq_constr) of the rows of X, split into
+        chunks of at most chunk_size rows (default: one per worker).
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        n = len(X)
+        n_obj = self.problem.n_obj
+        step = min(chunk_size or -(-n // self.n_workers), self.ring.max_rows) if n else 1
+        chunks = deque((start, min(start + step, n)) for start in range(0, n, step))
+        free = deque(range(self.ring.n_slots))
+        pending = {}
+        out = np.empty((n, self.ring.n_out))
+        errors = []
+        while chunks or pending:
+            while chunks and free:
+                slot = free.popleft()
+                start, stop = pending[slot] = chunks.popleft()
+                self.ring.x(slot, stop - start)[:] = X[start:stop]
+                self.tasks.put((slot, stop - start))
+            slot, error = self._result()
+            start, stop = pending.pop(slot)
+            if error is not None:
+                errors.append(error)
+                chunks.clear()   # let the queued chunks finish, send no more
+            else:
+                out[start:stop] = self.ring.out(slot, stop - start)
+            free.append(slot)
+        if errors:
+            raise RuntimeError(f"Evaluation failed in a shared-memory worker:\n{errors[0]}")
+        return out[:, :n_obj], out[:, n_obj:]
+
+    def close(self):
+        for _ in self.procs:
+            self.tasks.put(None)
+        for proc in self.procs:
+            proc.join(timeout=10)
+            if proc.is_alive():
+                proc.terminate()
+        self.ring.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SharedMemoryProblem(Problem):
+    """
+    The evaluator's problem as a vectorized pymoo Problem evaluated by the
+    workers of a SharedMemoryEvaluator. `base` is the original problem.
+    """
+    def __init__(self, evaluator, chunk_size=None):
+        p = evaluator.problem
+        super().__init__(n_var=p.n_var, n_obj=p.n_obj, n_ieq_constr=p.n_ieq_constr, xl=p.xl, xu=p.xu)
+        self.base = p
+        self.evaluator = evaluator
+        self.chunk_size = chunk_size
+
+    def _evaluate(self, X, out, *args, **kwargs):
+        out["F"], out["G"] = self.evaluator.evaluate(X, self.chunk_size)
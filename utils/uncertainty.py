@@ -0,0 +1,78 @@
+# utils/uncertainty.py
+"""
+Parameter ensembles and robust statistics for optimization under uncertainty.
+
+A parameter spec maps a model parameter name to its distribution:
+  ("uniform", low, high)
+  ("loguniform", low, high)      for parameters uncertain by orders of magnitude
+  ("lognormal", median, sigma)   sigma of ln(value)
+  ("normal", mean, std)
+"""
+import numpy as np
+from scipy.stats import norm, qmc
+
+DISTRIBUTIONS = ("uniform", "loguniform", "lognormal", "normal")
+
+
+def sample_parameters(spec, n_samples=64, sampler="sobol", seed=1):
+    """
+    Draw an ensemble of parameter values.
+
+    Parameters:
+      - spec      : dict name -> (distribution, p1, p2), see module docstring
+      - n_samples : ensemble size (use a power of 2 for "sobol")
+      - sampler   : "sobol" (scrambled Sobol quasi-Monte Carlo) or "mc" (plain Monte Carlo)
+      - seed      : seed of the draws; the same seed gives the same ensemble
+
+    Returns:
+      dict name -> (n_samples,) array
+    """
+    names = list(spec)
+    if sampler == "sobol":
+        U = qmc.Sobol(d=len(names), scramble=True, seed=seed).random(n_samples)
+    elif sampler == "mc":
+        U = np.random.default_rng(seed).random((n_samples, len(names)))
+    else:
+        raise ValueError(f"Unknown sampler: {sampler}")
+    # keep the inverse CDFs finite
+    U = np.clip(U, 1e-12, 1.0 - 1e-12)
+
+    samples = {}
+    for k, name in enumerate(names):
+        dist, p1, p2 = spec[name]
+        u = U[:, k]
+        if dist == "uniform":
+            samples[name] = p1 + (p2 - p1) * u
+        elif dist == "loguniform":
+            samples[name] = np.exp(np.log(p1) + (np.log(p2) - np.log(p1)) * u)
+        elif dist == "lognormal":
+            samples[name] = p1 * np.exp(p2 * norm.ppf(u))
+        elif dist == "normal":
+            samples[name] = p1 + p2 * norm.ppf(u)
+        else:
+            raise ValueError(f"Unknown distribution for {name}: {dist}")
+    return samples
+
+
+def robust_statistic(values, measure="mean_std", k=1.0, alpha=0.9):
+    """
+    Reduce an ensemble of values (n, n_samples) along the samples -> (n,).
+
+    measure:
+      - "mean"     : mean
+      - "mean_std" : mean + k * std
+      - "cvar"     : conditional value at risk, the mean of the worst (largest)
+                     (1 - alpha) share of the samples
+      - "worst"    : maximum
+    """
+    values = np.asarray(values, dtype=float)
+    if measure == "mean":
+        return values.mean(axis=1)
+    if measure == "mean_std":
+        return values.mean(axis=1) + k * values.std(axis=1)
+    if measure == "cvar":
+        n_tail = max(1, int(np.ceil((1.0 - alpha) * values.shape[1])))
+        return np.partition(values, -n_tail, axis=1)[:, -n_tail:].mean(axis=1)
+    if measure == "worst":
+        return values.max(axis=1)
+    raise ValueError(f"Unknown robust measure: {measure}")
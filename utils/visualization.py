@@ -1,7 +1,13 @@
 # utils/visualization.py
 
+import numpy as np
 import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
+
+# Rows sent to the browser per plot; larger tables are reduced server-side
+# (decimate / density_plot), so the payload does not grow with the archive.
+MAX_PLOT_POINTS = 5000
 
 def create_dataframe(X, F, var_names=None, obj_names=None):
     """
@@ -22,40 +28,222 @@ def create_dataframe(X, F, var_names=None, obj_names=None):
         df[name] = F[:, j]
     return df
 
-def scatter_matrix_plot(df, dimensions=None, color=None):
+def decimate(df, max_points=MAX_PLOT_POINTS, objectives=None, seed=1):
+    """
+    At most max_points rows of df for plotting.
+
+    If objective columns (minimized) are given, the non-dominated rows are kept
+    first (evenly spaced along the first objective if there are more than
+    max_points of them); the remaining budget is a seeded random sample of the
+    other rows. Row order is preserved.
+    """
+    n = len(df)
+    if n <= max_points:
+        return df
+    rng = np.random.default_rng(seed)
+    keep = np.zeros(n, dtype=bool)
+    if objectives:
+        from utils.pareto import pareto_mask
+        F = df[list(objectives)].to_numpy(dtype=float)
+        front = np.flatnonzero(pareto_mask(F))
+        if len(front) > max_points:
+            front = front[np.argsort(F[front, 0], kind="stable")]
+            front = front[np.linspace(0, len(front) - 1, max_points).round().astype(int)]
+        keep[front] = True
+    rest = np.flatnonzero(~keep)
+    n_fill = max_points - int(keep.sum())
+    if n_fill > 0:
+        keep[rng.choice(rest, size=min(n_fill, len(rest)), replace=False)] = True
+    return df.iloc[np.flatnonzero(keep)]
+
+def density_grid(x, y, bins=200, bounds=None, weights=None):
+    """
+    Binned 2D counts (or sums of weights) of the points (x, y) with np.histogram2d;
+    bounds is ((x_min, x_max), (y_min, y_max)), default the data range.
+    Returns (H, x_centers, y_centers) with H indexed [y, x] for plotting.
+    """
+    H, xe, ye = np.histogram2d(np.asarray(x, dtype=float), np.asarray(y, dtype=float),
+                               bins=bins, range=bounds, weights=weights)
+    return H.T, 0.5 * (xe[1:] + xe[:-1]), 0.5 * (ye[1:] + ye[:-1])
+
+def density_plot(df, x, y, bins=200, objectives=None, max_points=1000):
+    """
+    Datashader-style view of a large table: the (log) point density of x vs. y
+    on a bins x bins grid, with the non-dominated rows of the objective columns
+    (decimated to max_points) drawn on top as a WebGL scatter. The payload is
+    bins² cells plus at most max_points markers, whatever the table size.
+    """
+    H, xc, yc = density_grid(df[x], df[y], bins=bins)
+    fig = go.Figure(go.Heatmap(z=np.log10(1.0 + H), x=xc, y=yc, colorscale="Viridis",
+                               colorbar=dict(title="log10(1 + count)")))
+    if objectives:
+        from utils.pareto import pareto_mask
+        front = df[pareto_mask(df[list(objectives)].to_numpy(dtype=float))]
+        front = decimate(front, max_points)
+        fig.add_trace(go.Scattergl(x=front[x], y=front[y], mode="markers", name="Pareto front",
+                                   marker=dict(color="red", size=4)))
+    fig.update_layout(xaxis_title=x, yaxis_title=y, title=f"Density of {y} vs. {x}")
+    return fig
+
+def scatter_matrix_plot(df, dimensions=None, color=None, max_points=MAX_PLOT_POINTS, objectives=None):
     """
-    Plotly scatter matrix.
+    Plotly scatter matrix (WebGL splom).
     dimensions: columns to include
     color: column name for coloring points
+    max_points, objectives: row reduction, see decimate
     """
     if dimensions is None:
         dimensions = df.columns
-    fig = px.scatter_matrix(df, dimensions=dimensions, color=color)
+    fig = px.scatter_matrix(decimate(df, max_points, objectives), dimensions=dimensions, color=color)
     return fig
 
-def parallel_coordinates_plot(df, dimensions=None, color=None):
+def parallel_coordinates_plot(df, dimensions=None, color=None, max_points=MAX_PLOT_POINTS, objectives=None):
     """
-    Plotly parallel coordinates plot.
+    Plotly parallel coordinates plot (WebGL), rows reduced with decimate.
     """
     if dimensions is None:
         dimensions = df.columns
-    fig = px.parallel_coordinates(df, dimensions=dimensions, color=color)
+    fig = px.parallel_coordinates(decimate(df, max_points, objectives), dimensions=dimensions, color=color)
     return fig
 
-def heatmap_plot(df, x_var, y_var, z_var):
+HEATMAP_AGGREGATES = ("mean", "min", "max", "count", "feasible")
+
+class HeatmapBins:
+    """
+    Running aggregate of z over a fixed bins x bins grid of (x, y).
+
+    add() can be called chunk by chunk (e.g. Parquet record batches); each
+    call is linear in the chunk size. Rows with NaN in x, y or z and rows
+    outside the grid range are skipped.
+
+    Parameters:
+      - x_range, y_range : (lo, hi) of the grid
+      - bins             : bins per axis (int or (nx, ny))
+    """
+    def __init__(self, x_range, y_range, bins=50):
+        self.nx, self.ny = (bins, bins) if np.isscalar(bins) else bins
+        self.x_edges = np.linspace(*x_range, self.nx + 1)
+        self.y_edges = np.linspace(*y_range, self.ny + 1)
+        size = self.nx * self.ny
+        self.count = np.zeros(size)
+        self.sum = np.zeros(size)
+        self.min = np.full(size, np.inf)
+        self.max = np.full(size, -np.inf)
+        self.n_feasible = np.zeros(size)
+
+    def _cell(self, values, edges, n):
+        span = edges[-1] - edges[0]
+        idx = ((values - edges[0]) * (n / span if span > 0 else 0.0)).astype(np.int64)
+        # the upper edge belongs to the last bin, as in np.histogram2d; rounding can also
+        # give n for values a few ulp below it
+        return np.clip(idx, 0, n - 1)
+
+    def add(self, x, y, z):
+        x, y, z = (np.asarray(v, dtype=float) for v in (x, y, z))
+        ok = ~(np.isnan(x) | np.isnan(y) | np.isnan(z))
+        ok &= (x >= self.x_edges[0]) & (x <= self.x_edges[-1]) & (y >= self.y_edges[0]) & (y <= self.y_edges[-1])
+        x, y, z = x[ok], y[ok], z[ok]
+        cell = self._cell(y, self.y_edges, self.ny) * self.nx + self._cell(x, self.x_edges, self.nx)
+        size = self.nx * self.ny
+        self.count += np.bincount(cell, minlength=size)
+        self.sum += np.bincount(cell, weights=z, minlength=size)
+        self.n_feasible += np.bincount(cell, weights=(z <= 0), minlength=size)
+        np.minimum.at(self.min, cell, z)
+        np.maximum.at(self.max, cell, z)
+        return self
+
+    def result(self, agg="mean"):
+        """
+        Grid (ny, nx) of the aggregate, NaN in empty cells. "feasible" is the
+        fraction of rows with z <= 0 (z = constraint value or violation).
+        """
+        empty = self.count == 0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if agg == "mean":
+                Z = self.sum / self.count
+            elif agg == "min":
+                Z = self.min.copy()
+            elif agg == "max":
+                Z = self.max.copy()
+            elif agg == "count":
+                Z = self.count.copy()
+            elif agg == "feasible":
+                Z = self.n_feasible / self.count
+            else:
+                raise ValueError(f"Unknown heatmap aggregate: {agg}")
+        if agg != "count":
+            Z[empty] = np.nan
+        return Z.reshape(self.ny, self.nx)
+
+    def centers(self):
+        return 0.5 * (self.x_edges[1:] + self.x_edges[:-1]), 0.5 * (self.y_edges[1:] + self.y_edges[:-1])
+
+def _parquet_bins(path, x_var, y_var, z_var, bins, batch_size=1 << 20):
     """
-    Heatmap using pivot_table to aggregate z_var over x_var,y_var
+    HeatmapBins of a Parquet file, read three columns at a time in record
+    batches. The grid range comes from the row-group statistics when the
+    file has them, otherwise from a first pass over x and y.
     """
-    pivot_df = df.pivot_table(index=y_var, columns=x_var, values=z_var, aggfunc='mean')
-    fig = px.imshow(pivot_df, aspect='auto', color_continuous_scale='Viridis', 
-                    labels=dict(color=z_var), title=f"Heatmap of {z_var}")
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+    pf = pq.ParquetFile(path, memory_map=True)
+    names = pf.schema_arrow.names
+    ranges = []
+    for var in (x_var, y_var):
+        col = names.index(var)
+        stats = [pf.metadata.row_group(g).column(col).statistics for g in range(pf.metadata.num_row_groups)]
+        if stats and all(st is not None and st.has_min_max for st in stats):
+            ranges.append((min(st.min for st in stats), max(st.max for st in stats)))
+        else:
+            lo_hi = [pc.min_max(b.column(0)) for b in pf.iter_batches(batch_size, columns=[var])]
+            ranges.append((min(r["min"].as_py() for r in lo_hi), max(r["max"].as_py() for r in lo_hi)))
+    acc = HeatmapBins(ranges[0], ranges[1], bins)
+    for batch in pf.iter_batches(batch_size, columns=[x_var, y_var, z_var]):
+        acc.add(*(batch.column(k).to_numpy(zero_copy_only=False) for k in range(3)))
+    return acc
+
+def _is_grid(col, bins):
+    """
+    True if the column has at most `bins` distinct values; a sample is checked
+    first so continuous columns are rejected without hashing every row.
+    """
+    return col.head(10_000).nunique() <= bins and col.nunique() <= bins
+
+def heatmap_plot(df, x_var, y_var, z_var, bins=50, agg="mean"):
+    """
+    Heatmap of z_var over x_var, y_var.
+
+    Axes with at most `bins` distinct values (parameter grids) are pivoted
+    exactly with pivot_table. Continuous axes are bucketed into a bins x bins
+    grid with HeatmapBins (linear time); agg is one of HEATMAP_AGGREGATES.
+
+    df may also be the path of a Parquet file; then only the three columns
+    are read, in record batches, and the binned path is always used.
+    """
+    if isinstance(df, str):
+        acc = _parquet_bins(df, x_var, y_var, z_var, bins)
+    elif agg in ("mean", "min", "max", "count") and _is_grid(df[x_var], bins) and _is_grid(df[y_var], bins):
+        pivot_df = df.pivot_table(index=y_var, columns=x_var, values=z_var, aggfunc=agg)
+        fig = px.imshow(pivot_df, aspect='auto', color_continuous_scale='Viridis', origin='lower',
+                        labels=dict(color=z_var), title=f"Heatmap of {z_var}")
+        return fig
+    else:
+        x, y = df[x_var].to_numpy(dtype=float), df[y_var].to_numpy(dtype=float)
+        acc = HeatmapBins((np.nanmin(x), np.nanmax(x)), (np.nanmin(y), np.nanmax(y)), bins)
+        acc.add(x, y, df[z_var].to_numpy(dtype=float))
+    xc, yc = acc.centers()
+    label = z_var if agg == "mean" else f"{agg}({z_var})"
+    fig = px.imshow(acc.result(agg), x=xc, y=yc, aspect='auto', color_continuous_scale='Viridis', origin='lower',
+                    labels=dict(x=x_var, y=y_var, color=label), title=f"Heatmap of {label}")
     return fig
 
-def glyph_plot(df, x, y, size_col=None, color_col=None):
+def glyph_plot(df, x, y, size_col=None, color_col=None, max_points=MAX_PLOT_POINTS, objectives=None):
     """
-    Scatter plot as a 'glyph' plot with size and color encodings.
+    Scatter plot as a 'glyph' plot with size and color encodings (WebGL),
+    rows reduced with decimate.
     """
-    fig = px.scatter(df, x=x, y=y, size=size_col, color=color_col, 
+    df = decimate(df, max_points, objectives)
+    fig = px.scatter(df, x=x, y=y, size=size_col, color=color_col, render_mode="webgl",
                      title="Glyph Plot", hover_data=df.columns)
     return fig
 
@@ -103,20 +291,67 @@ def create_full_dataframe(problem, X, F):
     
     return pd.concat([df_vars, df_objs, df_cons], axis=1)
 
-def design_space_scatter_matrix(df, dimensions=None, color=None):
+def compute_hypervolume(F, ref_point=(1e5,1e5)):
     """
-    Create a scatter matrix plot of the given DataFrame.
+    Hypervolume of the objective set F (minimization) w.r.t. ref_point.
+    F is reduced to its non-dominated rows with utils.pareto first, so large
+    archives do not go through pymoo's quadratic non-dominated sort.
     """
-    if dimensions is None:
-        dimensions = df.columns
-    fig = px.scatter_matrix(df, dimensions=dimensions, color=color)
-    return fig
+    from pymoo.indicators.hv import Hypervolume
+    from utils.pareto import pareto_mask
+    if F is None or len(F)==0:
+        return None
+    F = np.asarray(F, dtype=float)
+    hv = Hypervolume(ref_point=ref_point, nds=False)
+    return hv.do(F[pareto_mask(F)])
 
-def design_space_parallel_coordinates(df, dimensions=None, color=None):
+def compute_c_metric(F, F2=None):
     """
-    Create a parallel coordinates plot of the given DataFrame.
+    Coverage (C-metric) C(F, F2): the fraction of points in F2 that are weakly
+    dominated by at least one point in F. F is compared with itself if F2 is None.
     """
-    if dimensions is None:
-        dimensions = df.columns
-    fig = px.parallel_coordinates(df, dimensions=dimensions, color=color)
+    if F is None or len(F)==0:
+        return None
+    if F2 is None:
+        F2=F
+    F = np.asarray(F, dtype=float)
+    F2 = np.asarray(F2, dtype=float)
+    covered = np.zeros(len(F2), dtype=bool)
+    for a in F:
+        covered |= np.all(a <= F2, axis=1)
+    return covered.mean()
+
+def compute_euclidean_distance(F, reference=(0,0)):
+    """
+    Mean Euclidean distance of the rows of F to a reference point.
+    """
+    if F is None or len(F)==0:
+        return None
+    dists = np.linalg.norm(F - np.array(reference), axis=1)
+    return np.mean(dists)
+
+def design_space_scatter_matrix(df, dimensions=None, color=None, max_points=MAX_PLOT_POINTS, objectives=None):
+    """
+    Create a scatter matrix plot of the given DataFrame (at most max_points
+    rows, Pareto-aware if objectives are given, see decimate).
+    """
+    return scatter_matrix_plot(df, dimensions, color, max_points, objectives)
+
+def design_space_parallel_coordinates(df, dimensions=None, color=None, max_points=MAX_PLOT_POINTS, objectives=None):
+    """
+    Create a parallel coordinates plot of the given DataFrame (at most
+    max_points rows, see decimate).
+    """
+    return parallel_coordinates_plot(df, dimensions, color, max_points, objectives)
+
+def run_profile_plot(profile):
+    """
+    Stacked bar chart of the per-generation times of a RunProfile
+    (evaluation, survival, mating and remaining algorithm overhead).
+    """
+    df = profile.to_dataframe()
+    parts = ["eval_time", "survival_time", "mating_time", "overhead_time"]
+    long_df = df.melt(id_vars="n_gen", value_vars=parts, var_name="phase", value_name="seconds")
+    fig = px.bar(long_df, x="n_gen", y="seconds", color="phase",
+                 title="Time per generation", labels={"n_gen": "Generation"})
     return fig